@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DishCategory, Dish, UserProfile, Order, OrderItem, Review, Coupon, Table, OperatingHours, Reservation
+from .models import DishCategory, Dish, UserProfile, Order, OrderItem, Review, Coupon, Table, OperatingHours, Reservation, OutboundEmail
 
 @admin.register(DishCategory)
 class DishCategoryAdmin(admin.ModelAdmin):
@@ -11,6 +11,9 @@ class DishAdmin(admin.ModelAdmin):
     list_display = ('name', 'category', 'price', 'spiciness', 'is_featured', 'has_nuts', 'is_vegetarian')
     list_filter = ('category', 'spiciness', 'is_featured', 'has_nuts', 'is_vegetarian')
     search_fields = ('name', 'description')
+    # შეფასებების აგრეგატები ავტომატურად ითვლება, ხელით არ უნდა შეიცვალოს
+    readonly_fields = ('rating_sum', 'rating_count', 'rating_1_count', 'rating_2_count',
+                       'rating_3_count', 'rating_4_count', 'rating_5_count')
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -62,4 +65,11 @@ class ReservationAdmin(admin.ModelAdmin):
     list_filter = ('status', 'table', 'start_time')
     search_fields = ('user__username', 'table__name')
 
-    date_hierarchy = 'start_time'
\ No newline at end of file
+    date_hierarchy = 'start_time'
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'recipients')
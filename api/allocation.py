@@ -0,0 +1,100 @@
+import random
+import time
+
+from django.db import OperationalError, transaction
+
+from .models import Reservation, Table
+from .occupancy import load_occupancy, local_dates, schedules_for
+
+# რამდენჯერ ვცდი თავიდან, თუ ბაზამ პარალელური ტრანზაქციის გამო ჩაწერა უარყო
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = 0.05
+
+
+def fitting_tables(party_size):
+    # ყველა აქტიური მაგიდა, რომელიც ეტევა სტუმრებს; ჯერ ყველაზე პატარა (best fit), შემდეგ id
+    return Table.objects.filter(is_active=True, capacity__gte=party_size).order_by('capacity', 'id')
+
+
+# რომელი მაგიდებია დაკავებული [start, end) შუალედში
+# ჯერ TableOccupancy-ის overlap_mask-ით: სლოტების საზღვრებზე გასწორებული მოთხოვნისთვის პასუხი ზუსტია,
+# სხვა შემთხვევაში ნულოვანი გადაკვეთა მაინც ნიშნავს, რომ მაგიდა თავისუფალია. დანარჩენ
+# მაგიდებს (და ძველი ბადით დათვლილ ჩანაწერებს) ვამოწმებ ჩვეულებრივი range query-ით.
+def busy_tables(tables, start_datetime, end_datetime):
+    table_ids = [table.id for table in tables]
+    dates = local_dates(start_datetime, end_datetime)
+    schedule = schedules_for(dates)[dates[0]] if len(dates) == 1 else None
+    # ბადის გარეთ მყოფი ჯავშნები ნიღბებში არ ჩანს, ამიტომ ასეთ მოთხოვნას პირდაპირ ვამოწმებ
+    if schedule is None or not (schedule.open_datetime <= start_datetime and end_datetime <= schedule.grid_end):
+        return _busy_tables_from_reservations(table_ids, start_datetime, end_datetime)
+
+    request_mask = schedule.overlap_mask(start_datetime, end_datetime)
+    exact = schedule.is_exact(start_datetime, end_datetime)
+    occupancy = load_occupancy(table_ids, dates[0], dates[0])
+
+    busy, uncertain = set(), []
+    for table_id in table_ids:
+        row = occupancy.get((table_id, dates[0]))
+        if row is not None and not schedule.matches(row):
+            uncertain.append(table_id)
+        elif row is None or not row.overlap_mask & request_mask:
+            continue
+        elif exact:
+            busy.add(table_id)
+        else:
+            uncertain.append(table_id)
+
+    if uncertain:
+        busy |= _busy_tables_from_reservations(uncertain, start_datetime, end_datetime)
+    return busy
+
+
+def _busy_tables_from_reservations(table_ids, start_datetime, end_datetime):
+    return set(Reservation.objects.filter(
+        table_id__in=table_ids,
+        status='Confirmed',
+        start_time__lt=end_datetime,
+        end_time__gt=start_datetime
+    ).values_list('table_id', flat=True))
+
+
+def _allocate_once(user, party_size, start_datetime, end_datetime, on_allocated):
+    with transaction.atomic():
+        # მაგიდებს ვბლოკავ ყოველთვის ერთი და იმავე თანმიმდევრობით, რომ deadlock არ მოხდეს.
+        # SQLite-ზე select_for_update არაფერს აკეთებს, მაგრამ იქ ჩაწერა თავისთავად სერიულია:
+        # თუ სხვა ტრანზაქციამ ჩვენს წაკითხვის შემდეგ ჩაწერა, ჩვენი INSERT OperationalError-ს მიიღებს.
+        tables = list(fitting_tables(party_size).select_for_update())
+
+        busy_table_ids = busy_tables(tables, start_datetime, end_datetime)
+
+        for table in tables:
+            if table.id in busy_table_ids:
+                continue
+
+            reservation = Reservation.objects.create(
+                user=user,
+                table=table,
+                party_size=party_size,
+                start_time=start_datetime,
+                end_time=end_datetime,
+                status='Confirmed'
+            )
+            if on_allocated:
+                on_allocated(reservation)
+            return reservation
+
+    return None
+
+
+# ჯავშნის შექმნა პირველ თავისუფალ შესაფერის მაგიდაზე
+# აბრუნებს Reservation-ს ან None-ს, თუ ყველა შესაფერისი მაგიდა დაკავებულია.
+# on_allocated იძახება იმავე ტრანზაქციაში (მაგ. დადასტურების იმეილისთვის)
+def allocate_table(user, party_size, start_datetime, end_datetime, on_allocated=None):
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return _allocate_once(user, party_size, start_datetime, end_datetime, on_allocated)
+        except OperationalError:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            # ვიცდი ცოტა ხანს (jitter-ით), რომ პარალელური მოთხოვნები ერთდროულად არ დაბრუნდნენ
+            time.sleep(RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # სიგნალების რეგისტრაცია
+        from . import signals  # noqa: F401
+        from django.db.backends.signals import connection_created
+        from .metrics import install_query_counter
+
+        connection_created.connect(install_query_counter, dispatch_uid='api.metrics.install_query_counter')
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.authtoken.models import Token
+
+from .serializers import LoginCredentialsSerializer, UserSerializer
+from .views import queue_welcome_email
+
+
+# ლოგინის და რეგისტრაციის async ვერსიები ASGI-სთვის (config/asgi.py)
+# პაროლის ჰეშირება (PBKDF2) CPU-ს მძიმე სამუშაოა, ამიტომ ის event loop-ში კი არა,
+# შეზღუდული ზომის thread pool-ში სრულდება - ასე ლოგინების ნაკადი სხვა მოთხოვნებს არ აჩერებს.
+
+_password_executor = None
+_password_executor_lock = threading.Lock()
+
+
+def get_password_executor():
+    global _password_executor
+    if _password_executor is None:
+        with _password_executor_lock:
+            if _password_executor is None:
+                _password_executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHER_WORKERS,
+                    thread_name_prefix='password-hasher',
+                )
+    return _password_executor
+
+
+async def run_password_hasher(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_executor(), partial(func, *args))
+
+
+def parse_json_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@transaction.atomic
+def create_user_with_token(username, email, password_hash):
+    # მომხმარებელი, ტოკენი და მისალმების იმეილი ერთ ტრანზაქციაში
+    user = User(
+        username=User.normalize_username(username),
+        email=User.objects.normalize_email(email),
+        password=password_hash,
+    )
+    user.save()
+    token = Token.objects.create(user=user)
+    queue_welcome_email(user)
+    return user, token
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLoginView(View):
+
+    async def post(self, request, *args, **kwargs):
+        data = parse_json_body(request)
+        if data is None:
+            return JsonResponse({"detail": "JSON parse error."}, status=400)
+
+        # ველების ვალიდაცია ბაზას არ ეხება, ამიტომ პირდაპირ event loop-ში სრულდება
+        serializer = LoginCredentialsSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+        email = serializer.validated_data['email']
+        password = serializer.validated_data['password']
+
+        # მომხმარებელს ერთხელ ვეძებ (authenticate() მას მეორედ აღარ ეძებს)
+        user = await User.objects.filter(email=email).afirst()
+        if user is None:
+            # ჰეშს მაინც ვითვლი, რომ პასუხის დროით არ გამოჩნდეს, არსებობს თუ არა ეს იმეილი
+            await run_password_hasher(make_password, password)
+            is_valid = False
+        else:
+            is_valid = await run_password_hasher(user.check_password, password) and user.is_active
+
+        if not is_valid:
+            return JsonResponse(
+                {"non_field_errors": [LoginCredentialsSerializer.INVALID_CREDENTIALS_MESSAGE]}, status=400
+            )
+
+        token, created = await Token.objects.aget_or_create(user=user)
+        return JsonResponse({
+            'token': token.key,
+            'user_id': user.id,
+            'username': user.username
+        }, status=200)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncRegisterView(View):
+
+    async def post(self, request, *args, **kwargs):
+        data = parse_json_body(request)
+        if data is None:
+            return JsonResponse({"detail": "JSON parse error."}, status=400)
+
+        # UserSerializer-ის unique ვალიდატორები ბაზას ეკითხებიან
+        serializer = UserSerializer(data=data)
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=400)
+        validated = serializer.validated_data
+
+        password_hash = await run_password_hasher(make_password, validated['password'])
+        try:
+            user, token = await sync_to_async(create_user_with_token)(
+                validated['username'], validated['email'], password_hash
+            )
+        except IntegrityError:
+            # პარალელურმა მოთხოვნამ იგივე username/email ახლახანს დაიკავა
+            return JsonResponse({"username": ["A user with that username or email already exists."]}, status=400)
+
+        return JsonResponse({
+            'id': user.id,
+            'username': user.username,
+            'email': user.email
+        }, status=201)
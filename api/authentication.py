@@ -0,0 +1,105 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+# Token -> User ქეში, რომ ყოველ მოთხოვნაზე Token + User JOIN query არ გაეშვას
+# ნაგულისხმევად ინახება პროცესის მეხსიერებაში (LRU + TTL). თუ settings.TOKEN_AUTH_CACHE['BACKEND']-ში
+# მითითებულია Django cache-ის alias (მაგ. Redis), ყველა worker პროცესი ერთ საერთო ქეშს იყენებს.
+class TokenCache:
+    key_prefix = 'auth:token:'
+
+    def __init__(self):
+        self._entries = OrderedDict()  # key -> (expires_at, user, token)
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    @property
+    def options(self):
+        return settings.TOKEN_AUTH_CACHE
+
+    @property
+    def shared(self):
+        alias = self.options.get('BACKEND')
+        return caches[alias] if alias else None
+
+    def get(self, key):
+        shared = self.shared
+        if shared is not None:
+            return shared.get(self.key_prefix + key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user, token = entry
+            if expires_at < time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+        # ყოველ მოთხოვნას თავისი ასლი, რომ ერთმა მოთხოვნამ მეორის user ობიექტი არ შეცვალოს
+        return copy.copy(user), token
+
+    def set(self, key, user, token):
+        timeout = self.options['TTL']
+        shared = self.shared
+        if shared is not None:
+            shared.set(self.key_prefix + key, (user, token), timeout)
+            return
+
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + timeout, copy.copy(user), token)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.options['MAX_SIZE']:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, key):
+        shared = self.shared
+        if shared is not None:
+            shared.delete(self.key_prefix + key)
+        with self._lock:
+            self._discard(key)
+
+    def invalidate_user(self, user_id):
+        # მომხმარებლის ყველა ტოკენი (პაროლის შეცვლა, დეაქტივაცია)
+        keys = set(Token.objects.filter(user_id=user_id).values_list('key', flat=True))
+        with self._lock:
+            keys |= self._keys_by_user.get(user_id, set())
+        for key in keys:
+            self.invalidate(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            user_keys = self._keys_by_user.get(entry[1].pk)
+            if user_keys is not None:
+                user_keys.discard(key)
+                if not user_keys:
+                    del self._keys_by_user[entry[1].pk]
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        # ქეშში არ არის - ჩვეულებრივი შემოწმება ბაზაში (არასწორ ან არააქტიურ ტოკენზე აქ ვარდება exception)
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return user, token
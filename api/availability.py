@@ -0,0 +1,128 @@
+import datetime
+
+from django.utils import timezone
+
+from .models import Reservation, Table
+from .occupancy import SLOT_MINUTES, load_occupancy, schedules_for
+
+# თვის ხედისთვის საკმარისია, უფრო დიდ დიაპაზონს არ ვითვლი ერთ მოთხოვნაზე
+MAX_RANGE_DAYS = 31
+
+
+# ხელმისაწვდომობის გამოთვლა რამდენიმე მაგიდისთვის და რამდენიმე დღისთვის
+# მონაცემთა ბაზას ვეკითხები სამჯერ (მაგიდები, სამუშაო საათები, TableOccupancy), ასე რომ
+# თითოეული მაგიდისა და დღისთვის დაკავებული სლოტების bitmask (Python int) უკვე მზადაა.
+# თუ ჩანაწერი ძველი ბადით დაითვალა (სამუშაო საათები შეიცვალა), ამ მაგიდებისთვის
+# ჯავშნებს ერთი query-ით ვკითხულობ და ნიღბებს ადგილზე ვაგროვებ.
+class AvailabilityEngine:
+
+    def __init__(self, start_date, end_date, tables=None, party_size=None, now=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.now = now or timezone.now()
+
+        if tables is None:
+            tables = Table.objects.filter(is_active=True)
+            if party_size:
+                tables = tables.filter(capacity__gte=party_size)
+        self.tables = sorted(tables, key=lambda table: (table.capacity, table.id))
+
+        dates = [start_date + datetime.timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+        schedules = schedules_for(dates)
+        self.days = [schedules[date] for date in dates]
+
+        self.busy = {table.id: [0] * len(self.days) for table in self.tables}
+        self._load_occupancy()
+
+    def _load_occupancy(self):
+        if not self.tables:
+            return
+
+        stale_table_ids = set()
+        occupancy = load_occupancy(list(self.busy), self.start_date, self.end_date)
+        for (table_id, date), row in occupancy.items():
+            index = (date - self.start_date).days
+            schedule = self.days[index]
+            if schedule is None:
+                continue
+            if schedule.matches(row):
+                self.busy[table_id][index] = row.busy_mask
+            else:
+                stale_table_ids.add(table_id)
+
+        if stale_table_ids:
+            self._load_reservations(stale_table_ids)
+
+    def _load_reservations(self, table_ids):
+        open_days = [schedule for schedule in self.days if schedule and schedule.slot_count]
+        if not open_days:
+            return
+
+        range_start = open_days[0].open_datetime
+        range_end = open_days[-1].close_datetime
+        for table_id in table_ids:
+            self.busy[table_id] = [0] * len(self.days)
+        reservations = Reservation.objects.filter(
+            table_id__in=table_ids,
+            status='Confirmed',
+            start_time__lt=range_end,
+            end_time__gt=range_start,
+        ).order_by('start_time').values_list('table_id', 'start_time', 'end_time')
+
+        for table_id, start, end in reservations:
+            table_busy = self.busy[table_id]
+            first_day = max((timezone.localtime(start).date() - self.start_date).days, 0)
+            last_day = min((timezone.localtime(end).date() - self.start_date).days, len(self.days) - 1)
+            for index in range(first_day, last_day + 1):
+                schedule = self.days[index]
+                if schedule:
+                    table_busy[index] |= schedule.busy_mask(start, end)
+
+    def free_mask(self, table_id, index):
+        schedule = self.days[index]
+        if schedule is None:
+            return 0
+        # წარსული სლოტები (დღევანდელი და უკვე გასული დღეების) არ არის ხელმისაწვდომი
+        return schedule.full_mask & ~self.busy[table_id][index] & ~schedule.past_mask(self.now)
+
+    def slots(self, table_id, index):
+        # ძველი ფორმატი: [{"time": "HH:MM", "available": bool}, ...]
+        schedule = self.days[index]
+        free = self.free_mask(table_id, index)
+        return [
+            {"time": schedule.slot_time(slot).strftime('%H:%M'), "available": bool(free >> slot & 1)}
+            for slot in range(schedule.slot_count)
+        ]
+
+    def bitmap(self, table_id, index):
+        # კომპაქტური ფორმა: თითო სიმბოლო თითო სლოტზე, '1' — თავისუფალი, '0' — დაკავებული
+        schedule = self.days[index]
+        free = self.free_mask(table_id, index)
+        return format(free, 'b').zfill(schedule.slot_count)[::-1] if schedule.slot_count else ''
+
+    def as_dict(self):
+        days = []
+        for index, schedule in enumerate(self.days):
+            date = self.start_date + datetime.timedelta(days=index)
+            if schedule is None:
+                days.append({"date": date.isoformat(), "closed": True})
+                continue
+            days.append({
+                "date": date.isoformat(),
+                "closed": False,
+                "open": schedule.hours.open_time.strftime('%H:%M'),
+                "close": schedule.hours.close_time.strftime('%H:%M'),
+                "slot_count": schedule.slot_count,
+                "tables": {str(table.id): self.bitmap(table.id, index) for table in self.tables},
+            })
+
+        return {
+            "start": self.start_date.isoformat(),
+            "end": self.end_date.isoformat(),
+            "slot_minutes": SLOT_MINUTES,
+            "tables": [
+                {"id": table.id, "name": table.name, "capacity": table.capacity}
+                for table in self.tables
+            ],
+            "days": days,
+        }
@@ -0,0 +1,225 @@
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+from .images import build_srcset
+from .models import Dish, OrderItem, Review
+from .serializers import DishSerializer, OrderItemSerializer, OrderSerializer, ReservationSerializer
+
+# "კომპილირებული" სერიალიზატორები მხოლოდ წასაკითხი სიებისთვის (მენიუ, ისტორიები)
+# მოდელის ობიექტების და DRF-ის ველების get_attribute-ის ნაცვლად პასუხს პირდაპირ .values()-ის
+# სტრიქონებიდან ვაგებ. ველების სია და რიგი აღებულია შესაბამისი DRF სერიალიზატორიდან, ხოლო
+# ჩვეულებრივი სვეტები იმავე ველის to_representation-ით გარდაიქმნება, ამიტომ შედეგი ბაიტ-ბაიტ
+# ემთხვევა (იხ. CompiledSerializerTests). დანარჩენი ველებისთვის (კავშირები, property-ები) კლასს
+# აქვს get_<ველი>(row) მეთოდი. settings.COMPILED_SERIALIZERS = False აბრუნებს DRF-ის სერიალიზატორებს.
+
+# ეს ველები ბაზის მნიშვნელობას უცვლელად აბრუნებენ, ამიტომ to_representation-ს საერთოდ არ ვიძახებ
+PASSTHROUGH_FIELDS = (
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+# ჩადგმული სერიალიზატორები, მეთოდები და property-ები get_<ველი> მეთოდს საჭიროებენ
+UNSUPPORTED_FIELDS = (serializers.BaseSerializer, serializers.SerializerMethodField, serializers.ReadOnlyField)
+
+# DRF ველს გამოტოვებს, თუ მისი source-ის გზაზე None შეხვდა (მაგ. წაშლილი კერძის dish.name)
+SKIP = object()
+
+IMAGE_STORAGE = Dish._meta.get_field('image').storage
+SPICINESS_DISPLAY = {value: str(label) for value, label in Dish.SPICINESS_CHOICES}
+
+
+def enabled():
+    return settings.COMPILED_SERIALIZERS
+
+
+def converter(column, to_representation):
+    # Serializer.to_representation-ის მსგავსად None ველის გარდაქმნის გარეშე რჩება
+    def convert(row):
+        value = row[column]
+        return None if value is None else to_representation(value)
+    return convert
+
+
+class CompiledSerializer:
+    serializer_class = None
+    model = None
+    # სვეტები, რომლებიც get_<ველი> მეთოდებს სჭირდებათ
+    extra_columns = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.request = self.context.get('request')
+        # get_<ველი> მეთოდები ამ ობიექტზე მიბმული, დანარჩენი accessor-ები უკვე row -> მნიშვნელობაა
+        self.accessors = [
+            (name, getattr(self, accessor) if isinstance(accessor, str) else accessor)
+            for name, accessor in self.compile()[0]
+        ]
+
+    @classmethod
+    def compile(cls):
+        # ველების accessor-ები და .values()-ის სვეტები ერთხელ, კლასზე ინახება
+        compiled = cls.__dict__.get('_compiled')
+        if compiled is not None:
+            return compiled
+
+        accessors = []
+        columns = []
+        for name, field in cls.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if hasattr(cls, f'get_{name}'):
+                accessors.append((name, f'get_{name}'))
+                continue
+            if '.' in field.source or field.source == '*' or isinstance(field, UNSUPPORTED_FIELDS):
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} needs get_{name}(row) for {cls.serializer_class.__name__}.{name}."
+                )
+            column = cls.model._meta.get_field(field.source).attname
+            columns.append(column)
+            if isinstance(field, PASSTHROUGH_FIELDS):
+                accessors.append((name, itemgetter(column)))
+            else:
+                accessors.append((name, converter(column, field.to_representation)))
+
+        compiled = cls._compiled = (tuple(accessors), tuple(dict.fromkeys([*columns, *cls.extra_columns])))
+        return compiled
+
+    @classmethod
+    def columns(cls):
+        return cls.compile()[1]
+
+    def to_representation(self, row):
+        data = {}
+        for name, accessor in self.accessors:
+            value = accessor(row)
+            if value is not SKIP:
+                data[name] = value
+        return data
+
+    def prepare(self, rows):
+        # დამატებითი მონაცემები ყველა სტრიქონისთვის ერთად (მაგ. შეკვეთის ნივთები)
+        pass
+
+    def serialize_rows(self, rows):
+        self.prepare(rows)
+        return [self.to_representation(row) for row in rows]
+
+    def serialize(self, queryset):
+        return self.serialize_rows(list(queryset.values(*self.columns())))
+
+    def image_url(self, name):
+        # DRF-ის ImageField: ცარიელზე None, request-ით აბსოლუტური ბმული
+        if not name:
+            return None
+        url = IMAGE_STORAGE.url(name)
+        return self.request.build_absolute_uri(url) if self.request is not None else url
+
+
+class CompiledDishSerializer(CompiledSerializer):
+    serializer_class = DishSerializer
+    model = Dish
+    extra_columns = (
+        'category__name', 'image', 'image_derivatives', 'spiciness', 'rating_sum', 'rating_count',
+        *Dish.RATING_HISTOGRAM_FIELDS.values(),
+    )
+
+    def get_category(self, row):
+        return row['category__name']
+
+    def get_image(self, row):
+        return self.image_url(row['image'])
+
+    def get_image_srcset(self, row):
+        return build_srcset(row['image_derivatives'])
+
+    def get_spiciness_display(self, row):
+        spiciness = row['spiciness']
+        return SPICINESS_DISPLAY.get(spiciness, str(spiciness))
+
+    def get_average_rating(self, row):
+        if row['rating_count']:
+            return round(row['rating_sum'] / row['rating_count'], 1)
+        return 0
+
+    def get_review_count(self, row):
+        return row['rating_count']
+
+    def get_rating_histogram(self, row):
+        return {star: row[field] for star, field in Dish.RATING_HISTOGRAM_FIELDS.items()}
+
+
+class CompiledOrderItemSerializer(CompiledSerializer):
+    serializer_class = OrderItemSerializer
+    model = OrderItem
+    extra_columns = ('order_id', 'dish__name', 'dish__image', 'dish__image_derivatives', 'dish__price')
+
+    # dish.price-ის ფორმატირება იმავე DecimalField-ით, რაც DRF-ის სერიალიზატორშია
+    dish_price = staticmethod(OrderItemSerializer().fields['dish_price'].to_representation)
+
+    def __init__(self, context=None):
+        super().__init__(context)
+        self.reviewed_dish_ids = set()
+
+    def get_dish_name(self, row):
+        return row['dish__name'] if row['dish_id'] else SKIP
+
+    def get_dish_image(self, row):
+        return self.image_url(row['dish__image']) if row['dish_id'] else SKIP
+
+    def get_dish_image_srcset(self, row):
+        return build_srcset(row['dish__image_derivatives']) if row['dish_id'] else None
+
+    def get_dish_price(self, row):
+        return self.dish_price(row['dish__price']) if row['dish_id'] else SKIP
+
+    def get_is_reviewed(self, row):
+        return bool(row['dish_id']) and row['dish_id'] in self.reviewed_dish_ids
+
+
+class CompiledOrderSerializer(CompiledSerializer):
+    serializer_class = OrderSerializer
+    model = OrderSerializer.Meta.model
+    extra_columns = ('user_id', 'coupon_id', 'coupon__code', 'coupon__discount_percent')
+
+    def prepare(self, rows):
+        # ნივთები ყველა შეკვეთისთვის ერთი query-ით (როგორც prefetch_related)
+        # და შეფასებული კერძები მხოლოდ ამ ნივთებს შორის (იხ. OrderItemSerializer.get_is_reviewed)
+        self.items_serializer = CompiledOrderItemSerializer(self.context)
+        self.items = {row['id']: [] for row in rows}
+        if not rows:
+            return
+        item_rows = OrderItem.objects.filter(order_id__in=list(self.items)).values(*self.items_serializer.columns())
+        for item in item_rows:
+            self.items[item['order_id']].append(item)
+
+        dish_ids = {item['dish_id'] for items in self.items.values() for item in items if item['dish_id']}
+        user_ids = {row['user_id'] for row in rows}
+        self.reviewed = {
+            user_id: set(Review.objects.filter(user_id=user_id, dish_id__in=dish_ids).values_list('dish_id', flat=True))
+            for user_id in user_ids
+        }
+
+    def get_coupon(self, row):
+        if row['coupon_id'] is None:
+            return None
+        return {'code': row['coupon__code'], 'discount_percent': row['coupon__discount_percent']}
+
+    def get_items(self, row):
+        self.items_serializer.reviewed_dish_ids = self.reviewed[row['user_id']]
+        return [self.items_serializer.to_representation(item) for item in self.items[row['id']]]
+
+
+class CompiledReservationSerializer(CompiledSerializer):
+    serializer_class = ReservationSerializer
+    model = ReservationSerializer.Meta.model
+    extra_columns = ('table__id', 'table__name', 'table__capacity')
+
+    def get_table(self, row):
+        # TableSerializer-ის ველები
+        return {'id': row['table__id'], 'name': row['table__name'], 'capacity': row['table__capacity']}
@@ -0,0 +1,136 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import multiprocessing
+import threading
+
+from PIL import Image, ImageOps
+
+
+# კერძის სურათის შემცირებული ვარიანტები
+# thumb - კალათისთვის, card - მენიუს ბარათისთვის, full - დეტალური ხედისთვის
+DERIVATIVE_WIDTHS = {
+    'thumb': 160,
+    'card': 480,
+    'full': 1200,
+}
+DERIVATIVE_DIR = 'derivatives'
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+
+# ვარიანტების ფაილების სახელის საფუძველი: foo.jpg -> foo_jpg, რომ იმავე საქაღალდეში foo.jpg-მ და
+# foo.png-მ ერთმანეთის ვარიანტები არ გადააწერონ
+def derivative_basename(filename):
+    stem, extension = os.path.splitext(filename)
+    return f"{stem}_{extension.lstrip('.').lower()}" if extension else stem
+
+
+# ეს ფუნქცია სრულდება ცალკე პროცესში, ამიტომ Django-ზე არ არის დამოკიდებული
+def render_derivatives(media_root, image_name):
+    source_path = os.path.join(media_root, image_name)
+    directory, filename = os.path.split(image_name)
+    stem, extension = os.path.splitext(filename)
+    basename = derivative_basename(filename)
+    output_dir = os.path.join(directory, DERIVATIVE_DIR)
+    os.makedirs(os.path.join(media_root, output_dir), exist_ok=True)
+
+    derivatives = {}
+    with Image.open(source_path) as original:
+        original = ImageOps.exif_transpose(original)
+        image_format = original.format or ('PNG' if extension.lower() == '.png' else 'JPEG')
+        if image_format not in ('PNG', 'JPEG'):
+            image_format, extension = 'PNG', '.png'
+
+        for size, width in DERIVATIVE_WIDTHS.items():
+            image = original.copy()
+            # არ ვადიდებ სურათს, მხოლოდ ვამცირებ
+            if image.width > width:
+                height = round(image.height * width / image.width)
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+
+            src_name = f"{output_dir}/{basename}_{size}{extension.lower()}"
+            webp_name = f"{output_dir}/{basename}_{size}.webp"
+            if image_format == 'JPEG':
+                image.convert('RGB').save(os.path.join(media_root, src_name), 'JPEG',
+                                          quality=JPEG_QUALITY, optimize=True, progressive=True)
+            else:
+                image.save(os.path.join(media_root, src_name), 'PNG', optimize=True)
+            image.save(os.path.join(media_root, webp_name), 'WEBP', quality=WEBP_QUALITY, method=4)
+
+            derivatives[size] = {'width': image.width, 'src': src_name, 'webp': webp_name}
+    return derivatives
+
+
+def build_srcset(derivatives):
+    # აბრუნებს srcset-ის სტრიქონებს, რომლებიც პირდაპირ <img>/<source> ტეგში ჩაისმება
+    if not derivatives:
+        return None
+    from django.core.files.storage import default_storage
+
+    variants = sorted(derivatives.values(), key=lambda variant: variant['width'])
+    return {
+        'srcset': ', '.join(f"{default_storage.url(v['src'])} {v['width']}w" for v in variants),
+        'webp': ', '.join(f"{default_storage.url(v['webp'])} {v['width']}w" for v in variants),
+    }
+
+
+def derivative_files(derivatives):
+    return {name for variant in (derivatives or {}).values() for name in (variant['src'], variant['webp'])}
+
+
+def delete_derivatives(derivatives, keep=None):
+    # ძველი სურათის ვარიანტების ფაილები; keep-ში არსებულ (ახლად შენახულ) ფაილებს არ ვშლი
+    from django.core.files.storage import default_storage
+
+    for name in sorted(derivative_files(derivatives) - derivative_files(keep)):
+        default_storage.delete(name)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    # პროცესების pool, რომ ადმინში სურათის ატვირთვამ მოთხოვნა არ დაბლოკოს
+    global _executor
+    if _executor is None:
+        from django.conf import settings
+
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+    return _executor
+
+
+def store_derivatives(dish_id, image_name, stale_derivatives, future):
+    from django.db import connection
+    from .menu_cache import bump_menu_version
+    from .models import Dish
+
+    try:
+        derivatives = future.result()
+    except Exception as e:
+        print(f"Error generating image derivatives for dish {dish_id}: {e}")
+        return
+    try:
+        # update() სიგნალებს არ იწვევს; ვამოწმებ, რომ სურათი ამასობაში არ შეცვლილა
+        updated = Dish.objects.filter(pk=dish_id, image=image_name).update(image_derivatives=derivatives)
+        if updated:
+            bump_menu_version()
+            # წინა სურათის ვარიანტები მხოლოდ ახლების შენახვის შემდეგ, რომ მენიუს ბმულები არ გაწყდეს
+            delete_derivatives(stale_derivatives, keep=derivatives)
+    finally:
+        # callback სრულდება executor-ის ნაკადში, ამიტომ კავშირს აქვე ვხურავ
+        connection.close()
+
+
+def schedule_derivatives(dish_id, image_name, stale_derivatives=None):
+    from django.conf import settings
+
+    future = get_executor().submit(render_derivatives, str(settings.MEDIA_ROOT), image_name)
+    future.add_done_callback(partial(store_derivatives, dish_id, image_name, stale_derivatives))
+    return future
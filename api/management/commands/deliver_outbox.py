@@ -0,0 +1,101 @@
+import datetime
+import time
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import OutboundEmail
+
+
+class Command(BaseCommand):
+    help = "Delivers pending OutboundEmail rows in batches over one reused SMTP connection, with retries and backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--max-attempts', type=int, default=5,
+                            help="After this many failures a message is marked as failed.")
+        parser.add_argument('--backoff', type=int, default=30,
+                            help="Base retry delay in seconds; doubles after every failed attempt.")
+        parser.add_argument('--max-backoff', type=int, default=3600)
+        parser.add_argument('--lease', type=int, default=300,
+                            help="Seconds a claimed batch is hidden from other workers.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting when the queue is empty.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Polling interval for --loop, in seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = self.deliver_batch(options)
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}.")
+            # სავსე batch-ის შემდეგ მაშინვე ვიღებ შემდეგს
+            if sent + failed >= options['batch_size']:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def claim_batch(self, options):
+        now = timezone.now()
+        with transaction.atomic():
+            # select_for_update(skip_locked) PostgreSQL-ზე პარალელურ worker-ებს ერთი და იგივე ჩანაწერის აღებას უკრძალავს;
+            # next_attempt_at-ის გადაწევა კი lease-ია, რომელიც SQLite-ზეც მუშაობს
+            ids = list(
+                OutboundEmail.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', next_attempt_at__lte=now)
+                .order_by('next_attempt_at')
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            OutboundEmail.objects.filter(id__in=ids).update(
+                next_attempt_at=now + datetime.timedelta(seconds=options['lease'])
+            )
+        return list(OutboundEmail.objects.filter(id__in=ids))
+
+    def deliver_batch(self, options):
+        messages = self.claim_batch(options)
+        if not messages:
+            return 0, 0
+
+        sent = failed = 0
+        processed = set()
+        connection = get_connection()
+        try:
+            # ერთი SMTP კავშირი მთელი batch-ისთვის
+            connection.open()
+            for message in messages:
+                try:
+                    EmailMessage(
+                        message.subject, message.body, message.from_email, message.recipients, connection=connection
+                    ).send()
+                except Exception as e:
+                    self.mark_failed(message, e, options)
+                    failed += 1
+                else:
+                    message.status = 'sent'
+                    message.sent_at = timezone.now()
+                    message.last_error = ''
+                    sent += 1
+                processed.add(message.id)
+        except Exception as e:
+            # კავშირი ვერ გაიხსნა - ყველა დარჩენილი შეტყობინება retry-ზე გადადის
+            for message in messages:
+                if message.id not in processed:
+                    self.mark_failed(message, e, options)
+                    failed += 1
+        finally:
+            connection.close()
+
+        OutboundEmail.objects.bulk_update(
+            messages, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+        return sent, failed
+
+    def mark_failed(self, message, error, options):
+        message.attempts += 1
+        message.last_error = str(error)
+        if message.attempts >= options['max_attempts']:
+            message.status = 'failed'
+        else:
+            delay = min(options['backoff'] * 2 ** (message.attempts - 1), options['max_backoff'])
+            message.next_attempt_at = timezone.now() + datetime.timedelta(seconds=delay)
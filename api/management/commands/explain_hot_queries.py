@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from api.models import Order, OrderItem, Reservation, Review, Table
+
+
+class Command(BaseCommand):
+    help = "Prints the database query plan (EXPLAIN / EXPLAIN QUERY PLAN) for the API's hot lookup queries."
+
+    def hot_queries(self):
+        # მნიშვნელობები მხოლოდ გეგმისთვისაა საჭირო, ამიტომ ცარიელ ბაზაზეც მუშაობს
+        user_id = User.objects.values_list('id', flat=True).first() or 0
+        table_id = Table.objects.values_list('id', flat=True).first() or 0
+        dish_id = OrderItem.objects.values_list('dish_id', flat=True).first() or 0
+        order_id = Order.objects.values_list('id', flat=True).first() or 0
+        now = timezone.now()
+
+        return [
+            ("Cart lookup (Order user + pending)",
+             Order.objects.filter(user_id=user_id, status='pending')),
+            ("Order history (user + completed, newest first)",
+             Order.objects.filter(user_id=user_id, status='completed').order_by('-created_at')),
+            ("Cart item get_or_create (OrderItem order + dish)",
+             OrderItem.objects.filter(order_id=order_id, dish_id=dish_id)),
+            ("Purchase check before review (OrderItem dish + order user/status)",
+             OrderItem.objects.filter(order__user_id=user_id, order__status='completed', dish_id=dish_id)),
+            ("Duplicate review check (Review user + dish)",
+             Review.objects.filter(user_id=user_id, dish_id=dish_id)),
+            ("Reservation conflict check (table + Confirmed + time range)",
+             Reservation.objects.filter(table_id=table_id, status='Confirmed', start_time__lt=now, end_time__gt=now)),
+            ("Active reservations (user + end_time)",
+             Reservation.objects.filter(user_id=user_id, status='Confirmed', end_time__gte=now).order_by('start_time')),
+        ]
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Database vendor: {connection.vendor}\n")
+        for title, queryset in self.hot_queries():
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('')
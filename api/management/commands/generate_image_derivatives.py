@@ -0,0 +1,51 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.images import delete_derivatives, render_derivatives
+from api.menu_cache import bump_menu_version
+from api.models import Dish
+
+
+class Command(BaseCommand):
+    help = "Generates resized and WebP derivatives for existing Dish images in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.IMAGE_DERIVATIVE_WORKERS,
+                            help="Number of worker processes.")
+        parser.add_argument('--force', action='store_true',
+                            help="Regenerate derivatives even for dishes that already have them.")
+
+    def handle(self, *args, **options):
+        dishes = Dish.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['force']:
+            dishes = dishes.filter(image_derivatives={})
+        dishes = list(dishes.only('id', 'image', 'image_derivatives'))
+        if not dishes:
+            self.stdout.write("Nothing to do.")
+            return
+
+        media_root = str(settings.MEDIA_ROOT)
+        updated = []
+        with ProcessPoolExecutor(max_workers=options['workers'],
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [(dish, executor.submit(render_derivatives, media_root, dish.image.name)) for dish in dishes]
+            stale = []
+            for dish, future in futures:
+                try:
+                    derivatives = future.result()
+                except Exception as e:
+                    self.stderr.write(f"{dish.image.name}: {e}")
+                    continue
+                stale.append((dish.image_derivatives, derivatives))
+                dish.image_derivatives = derivatives
+                updated.append(dish)
+
+        Dish.objects.bulk_update(updated, ['image_derivatives'], batch_size=200)
+        bump_menu_version()
+        # --force-ით ძველი სახელებით შენახული ვარიანტები აღარ გამოიყენება
+        for previous, derivatives in stale:
+            delete_derivatives(previous, keep=derivatives)
+        self.stdout.write(self.style.SUCCESS(f"Generated derivatives for {len(updated)} of {len(dishes)} dishes."))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from api.models import Dish, Review
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the stored rating sum/count/histogram on every Dish from the Review table."
+
+    def handle(self, *args, **options):
+        stars = Dish.RATING_HISTOGRAM_FIELDS
+        # ერთი query-ით ვითვლი ყველა კერძის აგრეგატს
+        rows = Review.objects.values('dish_id').annotate(
+            total=Sum('rating'),
+            count=Count('id'),
+            **{field: Count('id', filter=Q(rating=star)) for star, field in stars.items()}
+        )
+        aggregates = {row['dish_id']: row for row in rows}
+
+        fields = ['rating_sum', 'rating_count', *stars.values()]
+        dishes = list(Dish.objects.only('id', *fields))
+        for dish in dishes:
+            row = aggregates.get(dish.id, {})
+            dish.rating_sum = row.get('total') or 0
+            dish.rating_count = row.get('count', 0)
+            for field in stars.values():
+                setattr(dish, field, row.get(field, 0))
+
+        with transaction.atomic():
+            Dish.objects.bulk_update(dishes, fields, batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt rating aggregates for {len(dishes)} dishes ({sum(d.rating_count for d in dishes)} reviews)."
+        ))
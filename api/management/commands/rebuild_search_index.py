@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from api.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the FTS5 dish search table from the Dish and DishCategory tables."
+
+    def handle(self, *args, **options):
+        if rebuild_index():
+            self.stdout.write(self.style.SUCCESS("Dish search index rebuilt."))
+        else:
+            self.stdout.write(self.style.WARNING(
+                "FTS5 search table is not available on this database; search falls back to LIKE."
+            ))
@@ -0,0 +1,26 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.occupancy import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the per-table daily occupancy bitmaps (TableOccupancy) from confirmed reservations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Only rebuild days from this date on (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("--since must be a date in YYYY-MM-DD format.")
+
+        with transaction.atomic():
+            count = rebuild_occupancy(since=since)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} table occupancy rows."))
@@ -0,0 +1,43 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from api.models import ReplicaHeartbeat
+
+
+class Command(BaseCommand):
+    help = "Writes the replication heartbeat on the primary database, which the replica router uses to measure lag."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep beating instead of writing once.")
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds between beats with --loop.")
+        parser.add_argument('--sync-sqlite', action='store_true',
+                            help="After each beat, copy the primary into every SQLite replica file (local testing).")
+
+    def handle(self, *args, **options):
+        while True:
+            beat_at = timezone.now()
+            ReplicaHeartbeat.objects.using('default').update_or_create(pk=1, defaults={'beat_at': beat_at})
+            if options['sync_sqlite']:
+                self.sync_sqlite_replicas()
+            self.stdout.write(f"Heartbeat {beat_at.isoformat()}")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def sync_sqlite_replicas(self):
+        # ლოკალური "რეპლიკაცია" ორი SQLite ფაილით: primary-ს ასლი sqlite3 backup API-ით
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            return
+        primary.ensure_connection()
+        for alias in settings.READ_REPLICAS['ALIASES']:
+            target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
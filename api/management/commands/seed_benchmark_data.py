@@ -0,0 +1,209 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api import search
+from api.menu_cache import bump_menu_version
+from api.models import (
+    Coupon, Dish, DishCategory, OperatingHours, Order, OrderItem, Reservation, Review, Table, UserProfile,
+)
+from api.occupancy import SLOT, rebuild_occupancy, schedules_for
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates synthetic benchmark data with bulk_create: categories, dishes, users with tokens, "
+        "completed orders, reviews, coupons, tables and reservations. Users are <prefix>_user_<n> "
+        "with email <prefix>_user_<n>@example.com (see benchmarks/run.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=12)
+        parser.add_argument('--dishes', type=int, default=300)
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--orders-per-user', type=int, default=4)
+        parser.add_argument('--items-per-order', type=int, default=4, help="Maximum items per order.")
+        parser.add_argument('--reviews', type=int, default=3000)
+        parser.add_argument('--coupons', type=int, default=20)
+        parser.add_argument('--tables', type=int, default=25)
+        parser.add_argument('--reservations', type=int, default=3000)
+        parser.add_argument('--days', type=int, default=30, help="Reservations are spread over this many days around today.")
+        parser.add_argument('--prefix', default='bench')
+        parser.add_argument('--password', default='benchmark-password')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--flush', action='store_true', help="Delete earlier data with the same prefix first.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        prefix = options['prefix']
+
+        if options['flush']:
+            self.flush(prefix)
+
+        with transaction.atomic():
+            self.ensure_operating_hours()
+            categories = self.create_categories(prefix, options['categories'])
+            dishes = self.create_dishes(rng, prefix, categories, options['dishes'])
+            users = self.create_users(prefix, options['users'], options['password'])
+            coupons = self.create_coupons(rng, prefix, options['coupons'])
+            orders, items = self.create_orders(rng, users, dishes, coupons, options['orders_per_user'], options['items_per_order'])
+            reviews = self.create_reviews(rng, users, dishes, options['reviews'])
+            tables = self.create_tables(rng, prefix, options['tables'])
+            reservations = self.create_reservations(rng, users, tables, options['reservations'], options['days'])
+
+        # bulk_create სიგნალებს არ იძახებს: აგრეგატებს, ძიების ინდექსს და ჯავშნების ბადეს თავიდან ვაგებ
+        call_command('rebuild_rating_aggregates', stdout=self.stdout)
+        search.rebuild_index()
+        rebuild_occupancy()
+        bump_menu_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(categories)} categories, {len(dishes)} dishes, {len(users)} users, {orders} orders "
+            f"({items} items), {reviews} reviews, {len(coupons)} coupons, {len(tables)} tables, "
+            f"{reservations} reservations."
+        ))
+
+    def flush(self, prefix):
+        # მომხმარებლებთან ერთად იშლება მათი შეკვეთები, შეფასებები, ჯავშნები და ტოკენები
+        User.objects.filter(username__startswith=f'{prefix}_user_').delete()
+        DishCategory.objects.filter(slug__startswith=f'{prefix}-').delete()
+        Table.objects.filter(name__startswith=f'{prefix}-').delete()
+        Coupon.objects.filter(code__startswith=prefix.upper()).delete()
+
+    def ensure_operating_hours(self):
+        # ჯავშნებისთვის ყველა დღეს სამუშაო საათები სჭირდება
+        existing = set(OperatingHours.objects.values_list('weekday', flat=True))
+        OperatingHours.objects.bulk_create([
+            OperatingHours(weekday=weekday, open_time=datetime.time(11), close_time=datetime.time(23))
+            for weekday in range(7) if weekday not in existing
+        ])
+
+    def create_categories(self, prefix, count):
+        return DishCategory.objects.bulk_create([
+            DishCategory(name=f'{prefix.title()} Category {i}', slug=f'{prefix}-category-{i}')
+            for i in range(count)
+        ], batch_size=BATCH_SIZE)
+
+    def create_dishes(self, rng, prefix, categories, count):
+        if not categories:
+            return []
+        words = ['Grilled', 'Smoked', 'Spicy', 'Garden', 'Crispy', 'Roasted', 'Lemon', 'Garlic', 'Herb', 'Cheese']
+        kinds = ['Salad', 'Soup', 'Khachapuri', 'Khinkali', 'Chicken', 'Pork', 'Trout', 'Mushrooms', 'Eggplant', 'Lobiani']
+        return Dish.objects.bulk_create([
+            Dish(
+                category=rng.choice(categories),
+                name=f'{rng.choice(words)} {rng.choice(kinds)} {prefix} {i}',
+                description=f'{rng.choice(words)} {rng.choice(kinds).lower()} with {rng.choice(words).lower()} sauce.',
+                price=Decimal(rng.randint(300, 4500)) / 100,
+                spiciness=rng.randint(0, 4),
+                has_nuts=rng.random() < 0.2,
+                is_vegetarian=rng.random() < 0.3,
+                is_featured=rng.random() < 0.05,
+            )
+            for i in range(count)
+        ], batch_size=BATCH_SIZE)
+
+    def create_users(self, prefix, count, password):
+        # ერთი ჰეში ყველასთვის: pbkdf2 ათასჯერ ძალიან ნელია
+        password_hash = make_password(password)
+        users = User.objects.bulk_create([
+            User(username=f'{prefix}_user_{i}', email=f'{prefix}_user_{i}@example.com', password=password_hash)
+            for i in range(count)
+        ], batch_size=BATCH_SIZE)
+        Token.objects.bulk_create([Token(key=Token.generate_key(), user=user) for user in users], batch_size=BATCH_SIZE)
+        UserProfile.objects.bulk_create([UserProfile(user=user, city='Tbilisi') for user in users], batch_size=BATCH_SIZE)
+        return users
+
+    def create_coupons(self, rng, prefix, count):
+        return Coupon.objects.bulk_create([
+            Coupon(code=f'{prefix.upper()}{i}', discount_percent=rng.choice([5, 10, 15, 20]), one_use_per_user=False)
+            for i in range(count)
+        ], batch_size=BATCH_SIZE)
+
+    def create_orders(self, rng, users, dishes, coupons, per_user, max_items):
+        if not dishes:
+            return 0, 0
+        orders = Order.objects.bulk_create([
+            Order(user=user, status='completed', coupon=rng.choice(coupons) if coupons and rng.random() < 0.2 else None)
+            for user in users for _ in range(per_user)
+        ], batch_size=BATCH_SIZE)
+
+        items = []
+        for order in orders:
+            total = Decimal('0.00')
+            for dish in rng.sample(dishes, min(len(dishes), rng.randint(1, max_items))):
+                quantity = rng.randint(1, 3)
+                items.append(OrderItem(order=order, dish=dish, quantity=quantity, price_at_order=dish.price))
+                total += dish.price * quantity
+            if order.coupon:
+                total -= total * Decimal(order.coupon.discount_percent) / Decimal(100)
+            order.total_price = round(total, 2)
+        OrderItem.objects.bulk_create(items, batch_size=BATCH_SIZE)
+        Order.objects.bulk_update(orders, ['total_price'], batch_size=BATCH_SIZE)
+        return len(orders), len(items)
+
+    def create_reviews(self, rng, users, dishes, count):
+        # (user, dish) უნიკალურია
+        pairs = set()
+        limit = min(count, len(users) * len(dishes))
+        while len(pairs) < limit:
+            pairs.add((rng.randrange(len(users)), rng.randrange(len(dishes))))
+        Review.objects.bulk_create([
+            Review(user=users[u], dish=dishes[d], rating=rng.choices([1, 2, 3, 4, 5], weights=[1, 1, 3, 5, 5])[0])
+            for u, d in pairs
+        ], batch_size=BATCH_SIZE)
+        return len(pairs)
+
+    def create_tables(self, rng, prefix, count):
+        return Table.objects.bulk_create([
+            Table(name=f'{prefix}-T{i}', capacity=rng.choice([2, 2, 4, 4, 4, 6, 8]))
+            for i in range(count)
+        ], batch_size=BATCH_SIZE)
+
+    def create_reservations(self, rng, users, tables, count, days):
+        if not users or not tables:
+            return 0
+        today = timezone.localdate()
+        dates = [today + datetime.timedelta(days=offset) for offset in range(-days // 2, days - days // 2)]
+        schedules = schedules_for(dates)
+
+        # ერთ მაგიდაზე ჯავშნები ერთმანეთს არ უნდა გადაფარონ: დაკავებულ სლოტებს ვინიშნავ
+        taken = set()
+        reservations = []
+        for _ in range(count * 3):
+            if len(reservations) >= count:
+                break
+            day = rng.choice(dates)
+            schedule = schedules[day]
+            if schedule is None:
+                continue
+            length = rng.choice([2, 3, 4])
+            if schedule.slot_count < length:
+                continue
+            first = rng.randrange(schedule.slot_count - length + 1)
+            table = rng.choice(tables)
+            slots = {(table.id, day, index) for index in range(first, first + length)}
+            if slots & taken:
+                continue
+            taken |= slots
+            start = schedule.open_datetime + SLOT * first
+            reservations.append(Reservation(
+                user=rng.choice(users),
+                table=table,
+                party_size=rng.randint(1, table.capacity),
+                start_time=start,
+                end_time=start + SLOT * length,
+                status='Cancelled' if rng.random() < 0.1 else 'Confirmed',
+            ))
+        Reservation.objects.bulk_create(reservations, batch_size=BATCH_SIZE)
+        return len(reservations)
@@ -0,0 +1,77 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .routers import read_alias, replica_has_caught_up
+
+
+# მენიუს ვერსიის მთვლელი
+# იზრდება ყოველი Dish/DishCategory/Review-ს შენახვისას ან წაშლისას (იხ. signals.py)
+MENU_VERSION_KEY = 'menu:version'
+# ბოლო ცვლილების დრო: ვერსიით ქეშირებული პასუხი ჩამორჩენილი რეპლიკიდან არ უნდა აიგოს
+MENU_CHANGED_AT_KEY = 'menu:changed_at'
+
+
+def get_menu_version():
+    version = cache.get(MENU_VERSION_KEY)
+    if version is None:
+        # თუ ქეშიდან გაქრა, ვიწყებ დროზე დაფუძნებული რიცხვით, რომ ძველ ვერსიას არ დაემთხვეს
+        cache.add(MENU_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = cache.get(MENU_VERSION_KEY)
+    return version
+
+
+def bump_menu_version():
+    cache.set(MENU_CHANGED_AT_KEY, time.time(), timeout=None)
+    try:
+        return cache.incr(MENU_VERSION_KEY)
+    except ValueError:
+        # გასაღები ჯერ არ არსებობს
+        return get_menu_version()
+
+
+class MenuCacheMixin:
+    # ListAPIView-სთვის: სერიალიზებულ პასუხს ვინახავ ქეშში ვერსია + query პარამეტრების მიხედვით
+    # და If-None-Match-ზე ვაბრუნებ 304-ს, ბაზასთან შეხების გარეშე
+
+    def get_menu_cache_key(self, request, version):
+        params = sorted(request.query_params.lists())
+        # ჰოსტი საჭიროა, რადგან პასუხში next/previous და სურათების ბმულები აბსოლუტურია
+        source = f"{self.__class__.__name__}|{request.get_host()}|{params}"
+        digest = hashlib.md5(source.encode('utf-8')).hexdigest()
+        return f"menu:{version}:{digest}"
+
+    def list(self, request, *args, **kwargs):
+        version = get_menu_version()
+        cache_key = self.get_menu_cache_key(request, version)
+        etag = quote_etag(cache_key.replace(':', '-'))
+
+        # სუსტი შედარება: შეკუმშულ პასუხზე ბრაუზერი W/ ETag-ს აბრუნებს (CompressionMiddleware)
+        if etag in {tag.removeprefix('W/') for tag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))}:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            data = cache.get(cache_key)
+            if data is None:
+                if read_alias.get() and not replica_has_caught_up(cache.get(MENU_CHANGED_AT_KEY)):
+                    # რეპლიკამ მენიუს ბოლო ცვლილება შეიძლება ჯერ ვერ მიიღო, ამიტომ ვკითხულობ primary-დან
+                    read_alias.set(None)
+                response = self.get_uncached_response(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(cache_key, response.data, settings.MENU_CACHE_TIMEOUT)
+            else:
+                response = Response(data, status=status.HTTP_200_OK)
+
+        response['ETag'] = etag
+        # ბრაუზერი და proxy ყოველ ჯერზე ამოწმებს ETag-ს, მაგრამ შეუცვლელ მენიუს თავიდან აღარ იწერს
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    def get_uncached_response(self, request, *args, **kwargs):
+        # View-ს შეუძლია ეს მეთოდი გადატვირთოს, თუ პასუხს სხვა გზით აგებს
+        return super().list(request, *args, **kwargs)
@@ -0,0 +1,129 @@
+import threading
+
+from . import compiled_serializers
+from .menu_cache import get_menu_version
+from .models import Dish
+from .serializers import DishSerializer
+
+
+# კერძების მეხსიერებაში შენახული ინდექსი DishListAPIView-სთვის
+# თითოეული ფასეტის მნიშვნელობისთვის ვინახავ bitset-ს (Python int), სადაც i-ური ბიტი
+# ნიშნავს, რომ id-ით დალაგებული სიის i-ური კერძი ამ მნიშვნელობას შეესაბამება.
+# ფილტრაცია არის bitset-ების AND, ფასეტების დათვლა კი bit_count().
+class MenuIndex:
+    FACETS = ('category', 'spiciness', 'has_nuts', 'is_vegetarian')
+
+    # ფასეტებისთვის და დალაგებისთვის საჭირო სვეტები
+    COLUMNS = ('id', 'name', 'price', 'category__slug', 'spiciness', 'has_nuts', 'is_vegetarian')
+
+    def __init__(self, version, records, rows):
+        # records: COLUMNS-ის მნიშვნელობები, rows: სერიალიზებული კერძები, ორივე id-ით დალაგებული
+        self.version = version
+        # სურათის ბმული აქ ფარდობითია, აბსოლუტურად მოთხოვნის დროს ვაქცევ
+        self.rows = rows
+        self.positions = {record['id']: position for position, record in enumerate(records)}
+        self.sort_keys = [{'name': record['name'], 'price': record['price']} for record in records]
+        self.all_mask = (1 << len(records)) - 1
+        self.masks = {facet: {} for facet in self.FACETS}
+
+        for position, record in enumerate(records):
+            bit = 1 << position
+            values = {
+                'category': record['category__slug'],
+                'spiciness': record['spiciness'],
+                'has_nuts': record['has_nuts'],
+                'is_vegetarian': record['is_vegetarian'],
+            }
+            for facet, value in values.items():
+                self.masks[facet][value] = self.masks[facet].get(value, 0) | bit
+
+        self._orderings = {}
+
+    @classmethod
+    def from_values(cls, version):
+        # კომპილირებული სერიალიზატორით: ერთი .values() query, მოდელის ობიექტების გარეშე
+        serializer = compiled_serializers.CompiledDishSerializer()
+        records = list(Dish.objects.order_by('id').values(*serializer.columns(), *cls.COLUMNS))
+        return cls(version, records, serializer.serialize_rows(records))
+
+    @classmethod
+    def from_models(cls, version):
+        dishes = list(Dish.objects.select_related('category').order_by('id'))
+        records = [
+            {**{column: getattr(dish, column) for column in cls.COLUMNS if column != 'category__slug'},
+             'category__slug': dish.category.slug}
+            for dish in dishes
+        ]
+        return cls(version, records, list(DishSerializer(dishes, many=True).data))
+
+    def ids_mask(self, ids):
+        mask = 0
+        for dish_id in ids:
+            position = self.positions.get(dish_id)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def filter_mask(self, filters, exclude=None, restrict=None):
+        mask = self.all_mask if restrict is None else restrict
+        for facet, value in filters.items():
+            if facet != exclude:
+                mask &= self.masks[facet].get(value, 0)
+        return mask
+
+    def get_ordering(self, ordering):
+        # ordering არის მაგ. ('-price', 'name'); შედეგს ვიმახსოვრებ, რომ ყოველ ჯერზე არ დავალაგო
+        ordering = tuple(ordering or ())
+        positions = self._orderings.get(ordering)
+        if positions is None:
+            positions = list(range(len(self.rows)))  # ნაგულისხმევად id-ის მიხედვით
+            # stable sort-ს ვიყენებ ბოლო ველიდან პირველისკენ
+            for field in reversed(ordering):
+                name = field.lstrip('-')
+                positions.sort(key=lambda position: self.sort_keys[position][name],
+                               reverse=field.startswith('-'))
+            self._orderings[ordering] = positions
+        return positions
+
+    def search(self, filters, ordering=None, ranked_ids=None):
+        # ranked_ids არის სრულტექსტოვანი ძებნის შედეგი რელევანტურობის მიხედვით
+        restrict = None if ranked_ids is None else self.ids_mask(ranked_ids)
+        mask = self.filter_mask(filters, restrict=restrict)
+        if ranked_ids is not None and not ordering:
+            positions = [self.positions[dish_id] for dish_id in ranked_ids if dish_id in self.positions]
+        else:
+            positions = self.get_ordering(ordering)
+        return [self.rows[position] for position in positions if mask >> position & 1]
+
+    def facet_counts(self, filters, ranked_ids=None):
+        # ყოველი ფასეტისთვის ვითვლი დანარჩენი ფილტრების გათვალისწინებით,
+        # რომ sidebar-მა აჩვენოს რამდენი კერძი იქნება სხვა მნიშვნელობის არჩევისას
+        restrict = None if ranked_ids is None else self.ids_mask(ranked_ids)
+        counts = {}
+        for facet in ('category', 'spiciness'):
+            base = self.filter_mask(filters, exclude=facet, restrict=restrict)
+            counts[facet] = {
+                value: (base & mask).bit_count()
+                for value, mask in sorted(self.masks[facet].items())
+            }
+        return counts
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_menu_index():
+    # ინდექსი თავიდან იგება, როცა მენიუს ვერსია იცვლება
+    global _index
+    version = get_menu_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            index = _index
+            if index is None or index.version != version:
+                if compiled_serializers.enabled():
+                    index = _index = MenuIndex.from_values(version)
+                else:
+                    index = _index = MenuIndex.from_models(version)
+    return index
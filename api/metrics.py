@@ -0,0 +1,128 @@
+import contextvars
+import threading
+import time
+
+# მოთხოვნების მეტრიკები: SQL query-ების რაოდენობა და დრო, რენდერერის (Response -> JSON ბაიტები) დრო და სრული დრო.
+# სერიალიზატორების (.data, compiled_serializers) მუშაობა view-ის შიგნით სრულდება და ცალკე არ იზომება:
+# ის სრულ დროშია (total), ამიტომ renderer არ არის "სერიალიზაციის დრო".
+# RequestMetricsMiddleware (api/middleware.py) თითო მოთხოვნაზე ქმნის RequestMetrics-ს, ხოლო
+# ჯამურ სტატისტიკას view-ების მიხედვით ამ პროცესის მეხსიერებაში ინახავს (GET /api/metrics/)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+# მიმდინარე მოთხოვნის RequestMetrics. connection.execute_wrapper() მხოლოდ ამ ნაკადის კავშირს ეხება,
+# ASGI-ზე კი view-ს query-ები sync_to_async-ის ნაკადში სრულდება; contextvars იქაც გადადის
+# (ასევე bootstrap-ის ნაკადებში), ამიტომ count_query ყველა კავშირზეა და მეტრიკებს აქედან იღებს
+current = contextvars.ContextVar('request_metrics', default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    request_metrics = current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    return request_metrics(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    # connection_created სიგნალი (api/apps.py): თითო კავშირზე ერთხელ, ყველა ნაკადში და alias-ზე
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.view_name = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self.renderer_time = 0.0
+        self.total_time = 0.0
+        self._renderer_started = None
+        # query-ები შეიძლება მოთხოვნის სხვა ნაკადებიდანაც მოვიდეს (bootstrap/)
+        self._lock = threading.Lock()
+
+    # connection.execute_wrapper-ის ინტერფეისი
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.sql_time += elapsed
+                self.queries += 1
+
+    def renderer_started(self):
+        self._renderer_started = time.perf_counter()
+
+    def renderer_finished(self, response=None):
+        if self._renderer_started is not None:
+            self.renderer_time = time.perf_counter() - self._renderer_started
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.sql_time * 1000:.2f};desc="{self.queries} queries", '
+            f'renderer;dur={self.renderer_time * 1000:.2f};desc="response renderer", '
+            f'total;dur={self.total_time * 1000:.2f}'
+        )
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def record(metrics):
+    with _stats_lock:
+        stats = _stats.setdefault(metrics.view_name, {
+            'requests': 0,
+            'queries': 0,
+            'max_queries': 0,
+            'sql_ms': 0.0,
+            'renderer_ms': 0.0,
+            'total_ms': 0.0,
+            'max_total_ms': 0.0,
+            'over_budget': 0,
+        })
+        stats['requests'] += 1
+        stats['queries'] += metrics.queries
+        stats['max_queries'] = max(stats['max_queries'], metrics.queries)
+        stats['sql_ms'] += metrics.sql_time * 1000
+        stats['renderer_ms'] += metrics.renderer_time * 1000
+        stats['total_ms'] += metrics.total_time * 1000
+        stats['max_total_ms'] = max(stats['max_total_ms'], metrics.total_time * 1000)
+        return stats
+
+
+def mark_over_budget(view_name):
+    with _stats_lock:
+        if view_name in _stats:
+            _stats[view_name]['over_budget'] += 1
+
+
+def snapshot():
+    # საშუალოები view-ების მიხედვით, ყველაზე ძვირიდან იაფისკენ
+    with _stats_lock:
+        rows = {name: dict(stats) for name, stats in _stats.items()}
+    result = []
+    for name, stats in rows.items():
+        count = stats['requests']
+        result.append({
+            'view': name,
+            'requests': count,
+            'avg_queries': round(stats['queries'] / count, 2),
+            'max_queries': stats['max_queries'],
+            'avg_sql_ms': round(stats['sql_ms'] / count, 2),
+            'avg_renderer_ms': round(stats['renderer_ms'] / count, 2),
+            'avg_total_ms': round(stats['total_ms'] / count, 2),
+            'max_total_ms': round(stats['max_total_ms'], 2),
+            'over_budget': stats['over_budget'],
+        })
+    return sorted(result, key=lambda row: row['avg_total_ms'] * row['requests'], reverse=True)
+
+
+def reset():
+    with _stats_lock:
+        _stats.clear()
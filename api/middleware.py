@@ -0,0 +1,253 @@
+import logging
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # brotli არჩევითია: მის გარეშე მხოლოდ gzip
+    brotli = None
+
+from . import metrics
+from .routers import apin_to_primary, choose_replica, is_pinned, mark_unhealthy, pin_to_primary, read_alias
+
+logger = logging.getLogger('api.metrics')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+# GET მოთხოვნებს read_from_replica = True view-ებზე რეპლიკაზე აგზავნის (იხ. api/routers.py)
+# sync და async ორივე რეჟიმში მუშაობს: ASGI-ზე sync-only middleware მთელ მოთხოვნას (async view-ების
+# ჩათვლით) ერთადერთ საერთო sync ნაკადში გაატარებდა და ერთი ნელი async ლოგინი ყველა სხვა მოთხოვნას გააჩერებდა
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_alias.set(None)
+
+        # ცვლილების შემდეგ ამ კლიენტის წაკითხვები ცოტა ხნით primary-ზე მიდის
+        if self.should_pin(request, response):
+            pin_to_primary(request)
+        return response
+
+    async def __acall__(self, request):
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_alias.set(None)
+
+        if self.should_pin(request, response):
+            await apin_to_primary(request)
+        return response
+
+    def should_pin(self, request, response):
+        return request.method not in SAFE_METHODS and response.status_code < 500
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if request.method not in ('GET', 'HEAD') or not getattr(view_class, 'read_from_replica', False):
+            return None
+        if is_pinned(request):
+            return None
+
+        alias = choose_replica()
+        if alias:
+            read_alias.set(alias)
+            request._replica_view = (view_func, view_args, view_kwargs)
+        return None
+
+    def process_exception(self, request, exception):
+        # რეპლიკა მოთხოვნის შუაში მიუწვდომელი გახდა: ვნიშნავ და view-ს primary-ზე ვიმეორებ (მხოლოდ GET-ია)
+        alias = read_alias.get()
+        if not alias or not isinstance(exception, DatabaseError):
+            return None
+        mark_unhealthy(alias)
+        read_alias.set(None)
+        view_func, view_args, view_kwargs = request._replica_view
+        return view_func(request, *view_args, **view_kwargs)
+
+
+# თითო მოთხოვნის query-ების რაოდენობა/დრო, რენდერერის დრო და სრული დრო (sync და async რეჟიმში)
+# query-ები ითვლება metrics.current-ით (იხ. api/metrics.py), ყველა alias-ზე და ნაკადში
+# პასუხს ემატება Server-Timing ჰედერი, ჯამები გროვდება api/metrics.py-ში.
+# API_METRICS['QUERY_BUDGETS'] view-ის (ან "View.METHOD") query-ების ლიმიტია: გადაჭარბებისას
+# იწერება warning, ხოლო STRICT_BUDGETS რეჟიმში (ტესტები) ამოვარდება QueryBudgetExceeded
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        config = settings.API_METRICS
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        request_metrics, started = self.start(request)
+        token = metrics.current.set(request_metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, request_metrics, started, config)
+
+    async def __acall__(self, request):
+        config = settings.API_METRICS
+        if not config['ENABLED']:
+            return await self.get_response(request)
+
+        request_metrics, started = self.start(request)
+        token = metrics.current.set(request_metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, request_metrics, started, config)
+
+    def start(self, request):
+        request_metrics = request._metrics = metrics.RequestMetrics()
+        return request_metrics, time.perf_counter()
+
+    def finish(self, request, response, request_metrics, started, config):
+        request_metrics.total_time = time.perf_counter() - started
+
+        if config['SERVER_TIMING']:
+            response['Server-Timing'] = request_metrics.server_timing()
+
+        if request_metrics.view_name:
+            metrics.record(request_metrics)
+            logger.debug(
+                "%s %s %s: %d queries, sql %.2fms, renderer %.2fms, total %.2fms",
+                request.method, request.path, request_metrics.view_name, request_metrics.queries,
+                request_metrics.sql_time * 1000, request_metrics.renderer_time * 1000, request_metrics.total_time * 1000,
+            )
+            self.check_budget(request, request_metrics, config)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request_metrics = getattr(request, '_metrics', None)
+        if request_metrics is not None:
+            view_class = getattr(view_func, 'view_class', None)
+            request_metrics.view_name = (view_class or view_func).__name__
+        return None
+
+    def process_template_response(self, request, response):
+        # DRF-ის Response რენდერერით ამ მეთოდის შემდეგ გადაიქცევა ბაიტებად; სერიალიზატორის .data
+        # მანამდე, view-ში გამოითვლება და აქ არ შედის
+        request_metrics = getattr(request, '_metrics', None)
+        if request_metrics is not None:
+            request_metrics.renderer_started()
+            response.add_post_render_callback(request_metrics.renderer_finished)
+        return response
+
+    def check_budget(self, request, request_metrics, config):
+        budgets = config['QUERY_BUDGETS']
+        name = request_metrics.view_name
+        budget = budgets.get(f'{name}.{request.method}', budgets.get(name))
+        if budget is None or request_metrics.queries <= budget:
+            return
+
+        metrics.mark_over_budget(name)
+        message = (
+            f"{name} ({request.method} {request.get_full_path()}) ran {request_metrics.queries} queries, "
+            f"budget is {budget}."
+        )
+        if config['STRICT_BUDGETS']:
+            raise metrics.QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'image/svg+xml')
+ACCEPT_ENCODING_RE = re.compile(r'\s*([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?', re.IGNORECASE)
+
+
+def accepted_encodings(header):
+    # Accept-Encoding-იდან კოდირებები, რომლებიც q=0-ით არ არის აკრძალული
+    accepted = set()
+    for part in header.split(','):
+        match = ACCEPT_ENCODING_RE.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        if quality > 0:
+            accepted.add(match.group(1).lower())
+    return accepted
+
+
+# პასუხის შეკუმშვა brotli-თ (თუ დაყენებულია და კლიენტი იღებს) ან gzip-ით, MIN_SIZE ბაიტზე დიდი პასუხებისთვის
+# (მენიუ, შეკვეთების ისტორია). პატარა პასუხები, მაგ. ლოგინი ტოკენით, არ იკუმშება: შეკუმშვა მათ არაფერს
+# აძლევს, ხოლო საიდუმლოს შემცველ შეკუმშულ პასუხებზე BREACH-ის შეტევა შესაძლებელია.
+# Django-ს GZipMiddleware-ის ნაცვლად, რომელსაც brotli და ზღვრის არჩევა არ აქვს. მუშაობს sync და async რეჟიმში.
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        config = settings.RESPONSE_COMPRESSION
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < config['MIN_SIZE']
+            or not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in accepted:
+            encoding = 'br'
+            compressed = brotli.compress(response.content, quality=config['BROTLI_QUALITY'])
+        elif 'gzip' in accepted:
+            encoding = 'gzip'
+            # შემთხვევითი სიგრძის padding gzip-ის სათაურში, როგორც GZipMiddleware-ში (BREACH-ის წინააღმდეგ)
+            compressed = compress_string(response.content, max_random_bytes=100)
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # შეკუმშული ტანი სხვა ბაიტებია, ამიტომ ძლიერი ETag სუსტად იქცევა (როგორც GZipMiddleware-ში)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
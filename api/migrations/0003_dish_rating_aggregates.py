@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:45
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    Dish = apps.get_model('api', 'Dish')
+    Review = apps.get_model('api', 'Review')
+    stars = range(1, 6)
+    rows = Review.objects.values('dish_id').annotate(
+        total=Sum('rating'),
+        count=Count('id'),
+        **{f'rating_{star}': Count('id', filter=Q(rating=star)) for star in stars}
+    )
+    for row in rows:
+        Dish.objects.filter(pk=row['dish_id']).update(
+            rating_sum=row['total'],
+            rating_count=row['count'],
+            **{f'rating_{star}_count': row[f'rating_{star}'] for star in stars}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_operatinghours_table_reservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dish',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dish',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dish',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dish',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dish',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dish',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dish',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_rating_aggregates, migrations.RunPython.noop),
+    ]
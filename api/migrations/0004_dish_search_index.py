@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+FTS_TABLE = 'api_dish_fts'
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 მხოლოდ SQLite-ზეა; სხვა ბაზებზე ძებნა LIKE-ით მუშაობს
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "name, description, category, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except Exception:
+            # SQLite FTS5-ის გარეშეა აწყობილი
+            return
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description, category) "
+            "SELECT dish.id, dish.name, COALESCE(dish.description, ''), category.name "
+            "FROM api_dish dish JOIN api_dishcategory category ON category.id = dish.category_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_dish_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_dish_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dish',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:02
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+# api/occupancy.py-ის სლოტების ბადის ასლი ამ მიგრაციის დროინდელი სახით: მიგრაცია ცოცხალ კოდს
+# არ უნდა ეყრდნობოდეს, რომ ბადის შემდგომმა ცვლილებებმა ძველი მიგრაცია არ შეცვალოს
+SLOT = datetime.timedelta(minutes=30)
+
+
+def slots_until(open_datetime, moment):
+    # რამდენი სლოტი იწყება open_datetime-დან moment-მდე (moment-ის ჩათვლით არა) — ანუ ceil
+    if moment <= open_datetime:
+        return 0
+    return -(-(moment - open_datetime) // SLOT)
+
+
+def run_mask(first, last):
+    # ბიტები [first, last) შუალედში
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+class DaySchedule:
+
+    def __init__(self, date, hours):
+        self.open_datetime = timezone.make_aware(datetime.datetime.combine(date, hours.open_time))
+        close_datetime = timezone.make_aware(datetime.datetime.combine(date, hours.close_time))
+        self.slot_count = max(0, slots_until(self.open_datetime, close_datetime))
+        self.grid_end = self.open_datetime + self.slot_count * SLOT
+
+    def busy_mask(self, start, end):
+        first = min(slots_until(self.open_datetime, start), self.slot_count)
+        last = min(slots_until(self.open_datetime, end), self.slot_count)
+        return run_mask(first, last)
+
+    def overlap_mask(self, start, end):
+        if end <= self.open_datetime or start >= self.grid_end:
+            return 0
+        first = max((start - self.open_datetime) // SLOT, 0)
+        last = min(slots_until(self.open_datetime, end), self.slot_count)
+        return run_mask(first, last)
+
+
+def local_dates(start, end):
+    day = timezone.localtime(start).date()
+    last_day = timezone.localtime(end).date()
+    dates = []
+    while day <= last_day:
+        dates.append(day)
+        day += datetime.timedelta(days=1)
+    return dates
+
+
+def fill_table_occupancy(apps, schema_editor):
+    OperatingHours = apps.get_model('api', 'OperatingHours')
+    Reservation = apps.get_model('api', 'Reservation')
+    TableOccupancy = apps.get_model('api', 'TableOccupancy')
+    hours_by_weekday = {hours.weekday: hours for hours in OperatingHours.objects.all()}
+
+    masks = {}
+    reservations = Reservation.objects.filter(status='Confirmed').values_list('table_id', 'start_time', 'end_time')
+    for table_id, start, end in reservations:
+        for date in local_dates(start, end):
+            hours = hours_by_weekday.get(date.weekday())
+            if not hours:
+                continue
+            schedule = DaySchedule(date, hours)
+            overlap = schedule.overlap_mask(start, end)
+            if overlap:
+                busy, previous_overlap = masks.get((table_id, date), (0, 0))
+                masks[(table_id, date)] = (busy | schedule.busy_mask(start, end), previous_overlap | overlap)
+
+    TableOccupancy.objects.bulk_create([
+        TableOccupancy(
+            table_id=table_id,
+            date=date,
+            open_time=hours_by_weekday[date.weekday()].open_time,
+            slot_count=DaySchedule(date, hours_by_weekday[date.weekday()]).slot_count,
+            busy_mask=busy,
+            overlap_mask=overlap,
+        )
+        for (table_id, date), (busy, overlap) in masks.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_outbound_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('open_time', models.TimeField()),
+                ('slot_count', models.PositiveSmallIntegerField()),
+                ('busy_mask', models.BigIntegerField(default=0)),
+                ('overlap_mask', models.BigIntegerField(default=0)),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='api.table')),
+            ],
+            options={
+                'unique_together': {('table', 'date')},
+            },
+        ),
+        migrations.RunPython(fill_table_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:05
+
+from django.conf import settings
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_items(OrderItem, cart):
+    # ერთი და იმავე კერძის რამდენიმე ნივთი ერთ კალათაში -> ერთი, რაოდენობების ჯამით
+    items = {}
+    for item in OrderItem.objects.filter(order=cart).order_by('id'):
+        existing = items.get(item.dish_id) if item.dish_id is not None else None
+        if existing:
+            existing.quantity += item.quantity
+            existing.save(update_fields=['quantity'])
+            item.delete()
+        elif item.dish_id is not None:
+            items[item.dish_id] = item
+
+
+def recalculate_total(OrderItem, cart):
+    # Order.calculate_total-ის ანალოგი (ისტორიულ მოდელს მეთოდები არ აქვს)
+    total = sum((item.price_at_order * item.quantity for item in OrderItem.objects.filter(order=cart)), Decimal('0.00'))
+    if cart.coupon_id and cart.coupon.is_active:
+        total -= total * Decimal(cart.coupon.discount_percent) / Decimal(100)
+    cart.total_price = round(total, 2)
+    cart.save(update_fields=['total_price'])
+
+
+def merge_duplicate_carts(apps, schema_editor):
+    # კონსტრეინთამდე: თუ მომხმარებელს რამდენიმე pending კალათა აქვს, ვტოვებ უახლესს,
+    # დანარჩენების ნივთებს მასში გადავიტან და მათ ვშლი; შემდეგ კალათებში ვაერთიანებ ერთი და
+    # იმავე კერძის ნივთებს (კალათის get_or_create ერთ ნივთს ელოდება). დასრულებული შეკვეთები
+    # ისტორიაა და მათ არ ვეხები.
+    Order = apps.get_model('api', 'Order')
+    OrderItem = apps.get_model('api', 'OrderItem')
+    duplicated_users = (
+        Order.objects.filter(status='pending').values('user_id')
+        .annotate(carts=Count('id')).filter(carts__gt=1).values_list('user_id', flat=True)
+    )
+    merged_cart_ids = set()
+    for user_id in list(duplicated_users):
+        carts = list(Order.objects.filter(user_id=user_id, status='pending').order_by('-created_at', '-id'))
+        cart, duplicates = carts[0], carts[1:]
+        for duplicate in duplicates:
+            OrderItem.objects.filter(order=duplicate).update(order=cart)
+            if cart.coupon_id is None and duplicate.coupon_id is not None:
+                cart.coupon_id = duplicate.coupon_id
+            duplicate.delete()
+        cart.save(update_fields=['coupon'])
+        merged_cart_ids.add(cart.id)
+
+    duplicated_carts = (
+        OrderItem.objects.filter(order__status='pending', dish__isnull=False).values('order_id', 'dish_id')
+        .annotate(items=Count('id')).filter(items__gt=1).values_list('order_id', flat=True)
+    )
+    for cart in Order.objects.filter(id__in=merged_cart_ids | set(duplicated_carts)):
+        merge_duplicate_items(OrderItem, cart)
+        recalculate_total(OrderItem, cart)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_carts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('user',), name='unique_pending_cart'),
+        ),
+    ]
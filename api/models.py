@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import F, Sum
 from django.utils.text import slugify
 from django.contrib.auth.models import User
+from django.conf import settings
+from django.utils import timezone
 from decimal import Decimal
 
 
@@ -55,6 +58,8 @@ class Dish(models.Model):
     category = models.ForeignKey(DishCategory, related_name='dishes', on_delete=models.CASCADE)
     name = models.CharField(max_length=200)
     image = models.ImageField(upload_to='dishes/', blank=True, null=True)
+    # შემცირებული და WebP ვარიანტები (იხ. images.py), ივსება სურათის ატვირთვის შემდეგ
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     # ფილტრაციის ველები
     spiciness = models.IntegerField(choices=SPICINESS_CHOICES, default=0)
@@ -64,23 +69,55 @@ class Dish(models.Model):
     description = models.TextField(blank=True, null=True)
     is_featured = models.BooleanField(default=False)  # მთავარ გვერდზე რჩეული კერძების გამოსაჩენად
 
+    # შეფასებების შენახული აგრეგატები, რომ სიის ჩვენებისას ყოველ კერძზე ცალკე query არ გაეშვას
+    # ახლდება signals.py-დან Review-ს შექმნის/წაშლისას
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    # ჰისტოგრამა: რამდენი შეფასებაა თითოეული ვარსკვლავისთვის
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+
+    RATING_HISTOGRAM_FIELDS = {
+        1: 'rating_1_count',
+        2: 'rating_2_count',
+        3: 'rating_3_count',
+        4: 'rating_4_count',
+        5: 'rating_5_count',
+    }
+
     def __str__(self):
         return self.name
 
     # გამოთვლადი ველები
     @property
     def average_rating(self):
-        # ეს ითვლის ამ კერძის ყველა რევიუს საშუალოს
-        from django.db.models import Avg
-        rating = self.reviews.aggregate(Avg('rating'))['rating__avg']
-        if rating:
-            return round(rating, 1) # ვამრგვალებ
+        # საშუალოს ვითვლი შენახული ჯამიდან და რაოდენობიდან
+        if self.rating_count:
+            return round(self.rating_sum / self.rating_count, 1) # ვამრგვალებ
         return 0
 
     @property
     def review_count(self):
-        # ითვლის, სულ რამდენი რევიუ აქვს ამ კერძს
-        return self.reviews.count()
+        # სულ რამდენი რევიუ აქვს ამ კერძს
+        return self.rating_count
+
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, field) for star, field in self.RATING_HISTOGRAM_FIELDS.items()}
+
+    @classmethod
+    def apply_rating_change(cls, dish_id, rating, delta):
+        # delta არის +1 (რევიუ დაემატა) ან -1 (რევიუ წაიშალა)
+        # F() გამოსახულებით ვაახლებ ბაზაში, რომ პარალელურმა მოთხოვნებმა ერთმანეთის ცვლილება არ გადაფარონ
+        histogram_field = cls.RATING_HISTOGRAM_FIELDS[rating]
+        cls.objects.filter(pk=dish_id).update(
+            rating_sum=F('rating_sum') + rating * delta,
+            rating_count=F('rating_count') + delta,
+            **{histogram_field: F(histogram_field) + delta}
+        )
 
 # მომხმარებლის პროფილი
 class UserProfile(models.Model):
@@ -111,20 +148,50 @@ class Order(models.Model):
     def __str__(self):
         return f"Order {self.id} by {self.user.username} ({self.status})"
 
-    # ეს ფუნქცია ითვლის კალათის/შეკვეთის ჯამურ ფასს
-    def calculate_total(self):
-        total = sum(item.get_total_price() for item in self.items.all())
+    # ითვლის ჯამურ ფასს ერთი SQL აგრეგატით, ბაზაში ჩაწერის გარეშე
+    # (კალათის GET-ისთვის, რომ ყოველი ნახვა write ტრანზაქცია არ იყოს)
+    def compute_total(self):
+        total = self.items.aggregate(
+            total=Sum(F('price_at_order') * F('quantity'), output_field=models.DecimalField(max_digits=12, decimal_places=2))
+        )['total'] or Decimal('0.00')
         # მოწმდება აქვს თუ არა შეკვეთას მიბმული კუპონი
         if self.coupon and self.coupon.is_active:
             # ფასდაკლების დათვლა და გამოკლება
             discount_multiplier = Decimal(self.coupon.discount_percent) / Decimal(100)
             discount_amount = total * discount_multiplier
             total = total - discount_amount
+        return total
+
+    # ეს ფუნქცია ითვლის კალათის/შეკვეთის ჯამურ ფასს და ინახავს ბაზაში
+    # გამოიყენება მხოლოდ მაშინ, როცა კალათა იცვლება ან შეკვეთა ფორმდება
+    def calculate_total(self):
+        total = self.compute_total()
         # ვამრგვალებ და ვინახავ ბაზაში
         self.total_price = round(total, 2)
         self.save()
         return total
 
+    # მომხმარებლის კალათა (pending შეკვეთა), საჭიროების შემთხვევაში ახალი
+    # unique_pending_cart-ის გამო კალათა მაქსიმუმ ერთია: თუ პარალელურმა მოთხოვნამ (ორმაგი დაჭერა,
+    # ორი ჩანართი) კალათა ჩვენამდე შექმნა, ჩვენი INSERT IntegrityError-ს იღებს და get_or_create
+    # savepoint-ის უკან დაბრუნების შემდეგ არსებულ კალათას კითხულობს.
+    # კალათის სტრიქონს ვბლოკავ (select_for_update), რომ ერთი კალათის ცვლილებები რიგრიგობით
+    # შესრულდეს: ასე კერძი კალათაში ერთხელ ხვდება. ბაზაში (order, dish) უნიკალურობას ვერ დავადებ,
+    # რადგან ის მხოლოდ pending შეკვეთებს ეხება. ამიტომ გამოძახება transaction.atomic()-ის შიგნით.
+    @classmethod
+    def get_or_create_cart(cls, user):
+        return cls.objects.select_for_update().get_or_create(user=user, status='pending')
+
+    class Meta:
+        indexes = [
+            # კალათა (user + pending) და ისტორია (user + completed, უახლესიდან)
+            models.Index(fields=['user', 'status', '-created_at'], name='order_user_status_idx'),
+        ]
+        constraints = [
+            # ერთ მომხმარებელს მხოლოდ ერთი კალათა; ეს ნაწილობრივი ინდექსი კალათის ძებნასაც ემსახურება
+            models.UniqueConstraint(fields=['user'], condition=models.Q(status='pending'), name='unique_pending_cart'),
+        ]
+
 # შეკვეთის ერთეულის მოდელი
 class OrderItem(models.Model):
     # ეს მოდელი აკავშირებს Order-ს და Dish-ს (ბევრი-ბევრთან კავშირი)
@@ -144,6 +211,13 @@ class OrderItem(models.Model):
              self.price_at_order = self.dish.price
         super().save(*args, **kwargs)
 
+    class Meta:
+        indexes = [
+            # ორივე ტოლობაა, ამიტომ ერთი ინდექსი ემსახურება კალათის get_or_create-ს (order + dish)
+            # და ნაყიდობის შემოწმებას შეფასებისას (კერძიდან შეკვეთებისკენ)
+            models.Index(fields=['dish', 'order'], name='orderitem_dish_order_idx'),
+        ]
+
 # შეფასების მოდელი
 class Review(models.Model):
 
@@ -233,3 +307,87 @@ class Reservation(models.Model):
 
     class Meta:
         ordering = ['start_time']
+        indexes = [
+            # კონფლიქტის შემოწმება და ხელმისაწვდომობა მხოლოდ დადასტურებულ ჯავშნებს ეხება
+            models.Index(
+                fields=['table', 'start_time', 'end_time'],
+                condition=models.Q(status='Confirmed'),
+                name='reservation_confirmed_idx',
+            ),
+            # ჯავშნების ისტორია (user + end_time)
+            models.Index(fields=['user', 'end_time'], name='reservation_user_end_idx'),
+        ]
+
+
+# მაგიდის დაკავებულობა ერთი დღისთვის, 30 წუთიანი სლოტების bitmask-ად (იხ. api/occupancy.py)
+# ბიტი i შეესაბამება სლოტს open_time + i * 30 წუთი. ჩანაწერი ხელახლა ითვლება Reservation-ის
+# ყოველი შენახვა/წაშლისას; თუ დღეს ჯავშანი არ აქვს, ჩანაწერი არ არსებობს.
+class TableOccupancy(models.Model):
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='occupancy')
+    date = models.DateField()
+    # სლოტების ბადე, რომლითაც ნიღბები დაითვალა; თუ სამუშაო საათები შეიცვალა, ჩანაწერი აღარ ვარგა
+    open_time = models.TimeField()
+    slot_count = models.PositiveSmallIntegerField()
+    # სლოტები, რომელთა დასაწყისი რომელიმე ჯავშნის შიგნითაა (ასე აჩვენებს ხელმისაწვდომობას UI)
+    busy_mask = models.BigIntegerField(default=0)
+    # სლოტები, რომლებსაც რომელიმე ჯავშანი ნაწილობრივ მაინც კვეთს (კონფლიქტის შემოწმებისთვის)
+    overlap_mask = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.table.name} on {self.date}"
+
+    class Meta:
+        unique_together = ('table', 'date')
+
+
+# გასაგზავნი იმეილების რიგი (outbox)
+# View-ები იმეილს პირდაპირ აღარ აგზავნიან: ჩანაწერი იქმნება იმავე ტრანზაქციაში, რაც შეკვეთა/ჯავშანი,
+# ხოლო გაგზავნას აკეთებს ცალკე worker-ი (manage.py deliver_outbox)
+class OutboundEmail(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    # როდის შეიძლება შემდეგი მცდელობა (retry-სთვის და worker-ის მიერ დაკავებისთვის)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+    @classmethod
+    def queue(cls, subject, body, recipients, from_email=None):
+        return cls.objects.create(
+            subject=subject,
+            body=body,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            recipients=list(recipients),
+        )
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_pending_idx'),
+        ]
+
+
+# რეპლიკის ჩამორჩენის გასაზომი ერთადერთი ჩანაწერი (pk=1)
+# primary-ზე მას manage.py replica_heartbeat აახლებს, ხოლო api/routers.py რეპლიკიდან კითხულობს:
+# თუ რეპლიკაზე beat_at ძალიან ძველია, რეპლიკა ჩამორჩება და წაკითხვა primary-ზე მიდის
+class ReplicaHeartbeat(models.Model):
+    beat_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Heartbeat at {self.beat_at}"
@@ -0,0 +1,157 @@
+import datetime
+
+from django.utils import timezone
+
+from .models import OperatingHours, Reservation, TableOccupancy
+
+SLOT_MINUTES = 30
+SLOT = datetime.timedelta(minutes=SLOT_MINUTES)
+
+
+def slots_until(open_datetime, moment):
+    # რამდენი სლოტი იწყება open_datetime-დან moment-მდე (moment-ის ჩათვლით არა) — ანუ ceil
+    if moment <= open_datetime:
+        return 0
+    return -(-(moment - open_datetime) // SLOT)
+
+
+def run_mask(first, last):
+    # ბიტები [first, last) შუალედში
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+# ერთი დღის სლოტების ბადე: გახსნის დრო და სლოტების რაოდენობა
+class DaySchedule:
+
+    def __init__(self, date, hours):
+        self.date = date
+        self.hours = hours
+        self.open_datetime = timezone.make_aware(datetime.datetime.combine(date, hours.open_time))
+        self.close_datetime = timezone.make_aware(datetime.datetime.combine(date, hours.close_time))
+        self.slot_count = max(0, slots_until(self.open_datetime, self.close_datetime))
+        self.full_mask = (1 << self.slot_count) - 1
+        self.grid_end = self.open_datetime + self.slot_count * SLOT
+
+    def slot_time(self, index):
+        return (self.open_datetime + index * SLOT).time()
+
+    def busy_mask(self, start, end):
+        # სლოტი დაკავებულია, თუ მისი დასაწყისი ჯავშნის [start, end) შუალედში ხვდება
+        first = min(slots_until(self.open_datetime, start), self.slot_count)
+        last = min(slots_until(self.open_datetime, end), self.slot_count)
+        return run_mask(first, last)
+
+    def overlap_mask(self, start, end):
+        # ყველა სლოტი, რომელსაც [start, end) ნაწილობრივ მაინც კვეთს
+        if end <= self.open_datetime or start >= self.grid_end:
+            return 0
+        first = max((start - self.open_datetime) // SLOT, 0)
+        last = min(slots_until(self.open_datetime, end), self.slot_count)
+        return run_mask(first, last)
+
+    def past_mask(self, now):
+        return run_mask(0, min(slots_until(self.open_datetime, now), self.slot_count))
+
+    def is_exact(self, start, end):
+        # შუალედი ზუსტად სლოტების საზღვრებზეა და ბადის შიგნითაა — მაშინ overlap_mask ზუსტ პასუხს იძლევა
+        return (
+            self.open_datetime <= start < end <= self.grid_end
+            and (start - self.open_datetime) % SLOT == datetime.timedelta(0)
+            and (end - self.open_datetime) % SLOT == datetime.timedelta(0)
+        )
+
+    def matches(self, occupancy):
+        return occupancy.open_time == self.hours.open_time and occupancy.slot_count == self.slot_count
+
+
+def schedules_for(dates):
+    hours_by_weekday = {hours.weekday: hours for hours in OperatingHours.objects.all()}
+    schedules = {}
+    for date in dates:
+        hours = hours_by_weekday.get(date.weekday())
+        schedules[date] = DaySchedule(date, hours) if hours else None
+    return schedules
+
+
+def local_dates(start, end):
+    # ადგილობრივი თარიღები, რომლებსაც [start, end) ეხება
+    day = timezone.localtime(start).date()
+    last_day = timezone.localtime(end).date()
+    dates = []
+    while day <= last_day:
+        dates.append(day)
+        day += datetime.timedelta(days=1)
+    return dates
+
+
+def load_occupancy(table_ids, start_date, end_date):
+    rows = TableOccupancy.objects.filter(table_id__in=table_ids, date__gte=start_date, date__lte=end_date)
+    return {(row.table_id, row.date): row for row in rows}
+
+
+# ერთი მაგიდის რამდენიმე დღის ჩანაწერის ხელახლა დათვლა Reservation ცხრილიდან
+# იძახება სიგნალებიდან, იმავე ტრანზაქციაში, რომელშიც ჯავშანი შეიცვალა
+def refresh_occupancy(table_id, dates):
+    for date, schedule in schedules_for(dates).items():
+        busy_mask = overlap_mask = 0
+        if schedule and schedule.slot_count:
+            reservations = Reservation.objects.filter(
+                table_id=table_id,
+                status='Confirmed',
+                start_time__lt=schedule.grid_end,
+                end_time__gt=schedule.open_datetime
+            ).values_list('start_time', 'end_time')
+            for start, end in reservations:
+                busy_mask |= schedule.busy_mask(start, end)
+                overlap_mask |= schedule.overlap_mask(start, end)
+
+        if not overlap_mask:
+            TableOccupancy.objects.filter(table_id=table_id, date=date).delete()
+            continue
+
+        TableOccupancy.objects.update_or_create(table_id=table_id, date=date, defaults={
+            'open_time': schedule.hours.open_time,
+            'slot_count': schedule.slot_count,
+            'busy_mask': busy_mask,
+            'overlap_mask': overlap_mask,
+        })
+
+
+# ყველა ჩანაწერის თავიდან აგება (manage.py rebuild_table_occupancy და სამუშაო საათების ცვლილება)
+def rebuild_occupancy(since=None):
+    reservations = Reservation.objects.filter(status='Confirmed')
+    existing = TableOccupancy.objects.all()
+    if since:
+        reservations = reservations.filter(end_time__gt=timezone.make_aware(datetime.datetime.combine(since, datetime.time.min)))
+        existing = existing.filter(date__gte=since)
+
+    masks = {}
+    reservations = list(reservations.values_list('table_id', 'start_time', 'end_time'))
+    dates = {date for _, start, end in reservations for date in local_dates(start, end)}
+    schedules = schedules_for(dates)
+    for table_id, start, end in reservations:
+        for date in local_dates(start, end):
+            schedule = schedules[date]
+            if not schedule or (since and date < since):
+                continue
+            overlap = schedule.overlap_mask(start, end)
+            if overlap:
+                busy, previous_overlap = masks.get((table_id, date), (0, 0))
+                masks[(table_id, date)] = (busy | schedule.busy_mask(start, end), previous_overlap | overlap)
+
+    rows = [
+        TableOccupancy(
+            table_id=table_id,
+            date=date,
+            open_time=schedules[date].hours.open_time,
+            slot_count=schedules[date].slot_count,
+            busy_mask=busy,
+            overlap_mask=overlap,
+        )
+        for (table_id, date), (busy, overlap) in masks.items()
+    ]
+    existing.delete()
+    TableOccupancy.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
@@ -0,0 +1,154 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Keyset (cursor) პაგინაცია
+# PageNumberPagination-ისგან განსხვავებით არ უშვებს COUNT(*)-ს და OFFSET-ს:
+# შემდეგი გვერდი იფილტრება ბოლო ჩანაწერის დალაგების ველების მნიშვნელობით,
+# ამიტომ ნებისმიერ სიღრმეზე გვერდის ღირებულება ერთნაირია.
+class KeysetPagination(pagination.BasePagination):
+    cursor_query_param = 'cursor'
+    page_size = 9
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('id',)
+    # ველი, რომელიც ერთნაირი მნიშვნელობების მქონე ჩანაწერებს ცალსახად ალაგებს
+    tiebreaker = 'id'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        # თუ View-ს აქვს OrderingFilter, ვიყენებ მის მიერ არჩეულ დალაგებას
+        ordering = list(self.ordering)
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                ordering = list(backend().get_ordering(request, queryset, view) or ordering)
+                break
+        if not any(field.lstrip('-') == self.tiebreaker for field in ordering):
+            ordering.append(self.tiebreaker)
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        position, reverse = self.decode_cursor(request)
+        if position is not None:
+            position = self.clean_position(queryset.model, position)
+
+        ordering = self.ordering
+        if reverse:
+            # წინა გვერდისთვის ვალაგებ საპირისპიროდ და შედეგს მერე ვაბრუნებ
+            ordering = tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_after_filter(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_after_filter(self, ordering, position):
+        # (a, b, id) > (x, y, z) ველების მიმართულების გათვალისწინებით:
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)
+        condition = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {ordering[j].lstrip('-'): position[j] for j in range(i)}
+            condition |= Q(**equal, **{f'{name}__{lookup}': position[i]})
+        return condition
+
+    def clean_position(self, model, position):
+        # cursor-ს კლიენტი აგზავნის, ამიტომ მნიშვნელობებს ველების ტიპზე ვამოწმებ (მაგ. ფასად "x"),
+        # რომ არასწორმა cursor-მა filter()-ში ან ბაზაში 500 არ გამოიწვიოს
+        try:
+            values = [
+                model._meta.get_field(field.lstrip('-')).clean(value, None)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in values):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_position(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = data['p']
+            reverse = bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        data = json.dumps({'p': position, 'r': reverse}, default=str, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,33 @@
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson არ არის დაყენებული: DRF-ის სტანდარტული json
+    orjson = None
+
+# orjson-ისთვის: int/bool ლექსიკონის გასაღებები (ფასეტები, rating_histogram) სტრიქონად, როგორც json-ში;
+# datetime/date/time კი DRF-ის encoder-ზე გადადის, რომ ფორმატი ზუსტად იგივე დარჩეს (Z, მილიწამები)
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+_encoder = encoders.JSONEncoder()
+
+
+# JSONRenderer orjson-ით: იგივე ბაიტები, რაც DRF-ის compact/unicode JSON-ს აქვს, რამდენჯერმე უფრო სწრაფად
+# orjson-ის გარეშე, ან indent-ით მოთხოვნისას (მაგ. Browsable API), სტანდარტულ რენდერს ვიყენებ
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Decimal, lazy სტრიქონები, QuerySet და ა.შ. იგივე default()-ით გადადის, რაც DRF-ში
+        ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        # JavaScript-ისთვის \u2028 და \u2029 ყოველთვის escape-ით, როგორც JSONRenderer-ში
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
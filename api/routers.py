@@ -0,0 +1,130 @@
+import contextvars
+import datetime
+import hashlib
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.utils import timezone
+
+# read replica-ებზე წაკითხვის მარშრუტიზაცია
+# ReplicaRoutingMiddleware (api/middleware.py) ამ ცვლადში წერს რეპლიკის alias-ს მხოლოდ
+# GET/HEAD მოთხოვნებზე იმ view-ებისთვის, რომლებსაც read_from_replica = True აქვთ.
+# ყველა სხვა შემთხვევაში ReplicaRouter წაკითხვას primary-ზე (default) ტოვებს.
+read_alias = contextvars.ContextVar('read_alias', default=None)
+
+# ავტორიზაციის მოდელები ყოველთვის primary-დან: ახლახან შექმნილი ტოკენი რეპლიკაზე შეიძლება ჯერ არ იყოს
+PRIMARY_ONLY_APPS = {'auth', 'authtoken', 'sessions', 'contenttypes'}
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def replica_settings():
+    return settings.READ_REPLICAS
+
+
+def replica_aliases():
+    return replica_settings()['ALIASES']
+
+
+def check_replica(alias):
+    from .models import ReplicaHeartbeat
+
+    try:
+        beat_at = ReplicaHeartbeat.objects.using(alias).values_list('beat_at', flat=True).first()
+    except DatabaseError:
+        return False
+    if beat_at is None:
+        return False
+    return timezone.now() - beat_at <= datetime.timedelta(seconds=replica_settings()['MAX_LAG'])
+
+
+def healthy_replicas():
+    # რეპლიკების მდგომარეობას პროცესში ვინახავ HEALTH_CHECK_INTERVAL წამით
+    interval = replica_settings()['HEALTH_CHECK_INTERVAL']
+    now = time.monotonic()
+    healthy = []
+    for alias in replica_aliases():
+        with _health_lock:
+            state = _health.get(alias)
+        if state is None or now - state[1] > interval:
+            state = (check_replica(alias), now)
+            with _health_lock:
+                _health[alias] = state
+        if state[0]:
+            healthy.append(alias)
+    return healthy
+
+
+def mark_unhealthy(alias):
+    with _health_lock:
+        _health[alias] = (False, time.monotonic())
+
+
+def choose_replica():
+    replicas = healthy_replicas() if replica_aliases() else []
+    return random.choice(replicas) if replicas else None
+
+
+def replica_has_caught_up(changed_at):
+    # changed_at (time.time()) ცვლილება უკვე ყველა ჯანმრთელ რეპლიკაზეა: ჩამორჩენა MAX_LAG-ზე ნაკლებია
+    # შემოწმების მომენტში და შემოწმებებს შორის მაქსიმუმ HEALTH_CHECK_INTERVAL გადის
+    if changed_at is None:
+        return False
+    window = replica_settings()['MAX_LAG'] + replica_settings()['HEALTH_CHECK_INTERVAL']
+    return time.time() - changed_at > window
+
+
+# read-your-writes: ცვლილების შემდეგ კლიენტი STICKY_SECONDS წამით primary-ზე რჩება
+# გასაღები არის Authorization ჰედერის (ან სესიის) ჰეში — ის ცნობილია view-მდე, DRF-ის ავტორიზაციამდე
+
+def client_key(request):
+    credential = request.META.get('HTTP_AUTHORIZATION')
+    if not credential:
+        session = getattr(request, 'session', None)
+        credential = session.session_key if session is not None else None
+    if not credential:
+        return None
+    return 'db:sticky:' + hashlib.sha256(credential.encode()).hexdigest()
+
+
+def pin_to_primary(request):
+    key = client_key(request)
+    if key:
+        cache.set(key, True, replica_settings()['STICKY_SECONDS'])
+
+
+async def apin_to_primary(request):
+    key = client_key(request)
+    if key:
+        await cache.aset(key, True, replica_settings()['STICKY_SECONDS'])
+
+
+def is_pinned(request):
+    key = client_key(request)
+    return bool(key and cache.get(key))
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # რეპლიკები primary-ის ასლია, მათზე მიგრაცია არ ეშვება
+        return db not in replica_aliases()
@@ -0,0 +1,103 @@
+import re
+
+from django.db import DatabaseError, connection
+from django.db.models import Q
+
+from .models import Dish
+
+
+# კერძების სრულტექსტოვანი ძებნა SQLite FTS5-ით
+# ცხრილი იქმნება 0004 მიგრაციაში, სინქრონიზაცია ხდება signals.py-დან.
+# ტრიგერები არ გამოვიყენე, რადგან SQLite-ზე Django api_dish ცხრილს ზოგიერთი
+# მიგრაციისას თავიდან ქმნის და ტრიგერები ამ დროს იკარგება.
+FTS_TABLE = 'api_dish_fts'
+# bm25 წონები სვეტების მიხედვით: name, description, category
+BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+_INSERT_SQL = (
+    f"INSERT INTO {FTS_TABLE} (rowid, name, description, category) "
+    "SELECT dish.id, dish.name, COALESCE(dish.description, ''), category.name "
+    "FROM api_dish dish JOIN api_dishcategory category ON category.id = dish.category_id"
+)
+
+_availability = {}
+
+
+def fts_available():
+    # ვამოწმებ ერთხელ თითო ბაზისთვის, არსებობს თუ არა FTS ცხრილი
+    key = (connection.vendor, str(connection.settings_dict['NAME']))
+    if key not in _availability:
+        available = False
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                available = cursor.fetchone() is not None
+        _availability[key] = available
+    return _availability[key]
+
+
+def index_dish(dish_id):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [dish_id])
+        cursor.execute(f"{_INSERT_SQL} WHERE dish.id = %s", [dish_id])
+
+
+def unindex_dish(dish_id):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [dish_id])
+
+
+def reindex_category(category_id):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {FTS_TABLE} SET category = (SELECT name FROM api_dishcategory WHERE id = %s) "
+            "WHERE rowid IN (SELECT id FROM api_dish WHERE category_id = %s)",
+            [category_id, category_id]
+        )
+
+
+def rebuild_index():
+    if not fts_available():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(_INSERT_SQL)
+    return True
+
+
+def search_dish_ids(query):
+    # აბრუნებს კერძების id-ებს რელევანტურობის მიხედვით დალაგებულს
+    # ან None-ს, თუ საძიებო სიტყვა ცარიელია
+    terms = re.findall(r'\w+', query or '')
+    if not terms:
+        return None
+
+    if fts_available():
+        # ყოველ სიტყვას ვსვამ ბრჭყალებში, რომ მომხმარებლის ტექსტი FTS სინტაქსად არ აღიქმებოდეს,
+        # ბოლოში * კი ნიშნავს prefix ძებნას ("cur" -> "curry")
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                    f"ORDER BY bm25({FTS_TABLE}, {weights})",
+                    [match]
+                )
+                return [row[0] for row in cursor.fetchall()]
+        except DatabaseError:
+            pass
+
+    # FTS5-ის გარეშე: ჩვეულებრივი LIKE ძებნა
+    condition = Q()
+    for term in terms:
+        condition &= (
+            Q(name__icontains=term) | Q(description__icontains=term) | Q(category__name__icontains=term)
+        )
+    return list(Dish.objects.filter(condition).order_by('id').values_list('id', flat=True))
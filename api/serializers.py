@@ -2,7 +2,9 @@ from rest_framework import serializers
 from .models import DishCategory, Dish, UserProfile, Order, OrderItem, Review, Coupon, Table, Reservation
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework.authtoken.models import Token
+from .images import build_srcset
 
 # კერძების და კატეგორიების სერიალიზატორები
 class DishCategorySerializer(serializers.ModelSerializer):
@@ -13,11 +15,17 @@ class DishCategorySerializer(serializers.ModelSerializer):
 class DishSerializer(serializers.ModelSerializer):
     category = serializers.StringRelatedField()
     spiciness_display = serializers.CharField(source='get_spiciness_display', read_only=True)
+    # შემცირებული სურათების srcset (თუ უკვე დაგენერირდა)
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Dish
-        fields = ['id', 'category', 'name', 'image', 'price',
-                  'spiciness', 'spiciness_display', 'has_nuts', 'is_vegetarian', 'description', 'average_rating', 'review_count']
+        fields = ['id', 'category', 'name', 'image', 'image_srcset', 'price',
+                  'spiciness', 'spiciness_display', 'has_nuts', 'is_vegetarian', 'description', 'average_rating', 'review_count',
+                  'rating_histogram']
+
+    def get_image_srcset(self, obj):
+        return build_srcset(obj.image_derivatives)
 
 
 class CouponSerializer(serializers.ModelSerializer):
@@ -45,10 +53,16 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 # ლოგინის სერიალიზატორი
-class LoginSerializer(serializers.Serializer):
+class LoginCredentialsSerializer(serializers.Serializer):
+    # მხოლოდ ველების ვალიდაცია, ბაზის გარეშე (async ლოგინიც ამას იყენებს)
     email = serializers.EmailField()
     password = serializers.CharField()
 
+    INVALID_CREDENTIALS_MESSAGE = "Incorrect Credentials. Please try again."
+
+
+class LoginSerializer(LoginCredentialsSerializer):
+
     def validate(self, data):
 
         email = data.get('email')
@@ -63,7 +77,7 @@ class LoginSerializer(serializers.Serializer):
             if user and user.is_active:
                 data['user'] = user
                 return data
-        raise serializers.ValidationError("Incorrect Credentials. Please try again.")
+        raise serializers.ValidationError(self.INVALID_CREDENTIALS_MESSAGE)
 
 # შეკვეთების (Orders/Carts) სერიალიზატორები
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -71,24 +85,43 @@ class OrderItemSerializer(serializers.ModelSerializer):
     dish_name = serializers.CharField(source='dish.name', read_only=True)
     dish_image = serializers.ImageField(source='dish.image', read_only=True)
     dish_price = serializers.DecimalField(source='dish.price', max_digits=10, decimal_places=2, read_only=True)
+    dish_image_srcset = serializers.SerializerMethodField()
     # ეს არის ჩემი custom ველი, რომელიც იძახებს get_is_reviewed ფუნქციას
     is_reviewed = serializers.SerializerMethodField()
 
     class Meta:
         model = OrderItem
-        fields = ('id', 'dish', 'dish_name', 'dish_image', 'dish_price', 'quantity', 'price_at_order', 'is_reviewed')
+        fields = ('id', 'dish', 'dish_name', 'dish_image', 'dish_image_srcset', 'dish_price', 'quantity',
+                  'price_at_order', 'is_reviewed')
         read_only_fields = ('price_at_order',)
 
+    def get_dish_image_srcset(self, obj):
+        return build_srcset(obj.dish.image_derivatives) if obj.dish else None
+
     # ეს არის ჩემი custom ლოგიკა "Leave Review" ღილაკისთვის
     def get_is_reviewed(self, obj):
-        user = obj.order.user
-        dish = obj.dish
-
-        if not user or not dish:
+        if not obj.dish_id:
             return False
 
-        # ვამოწმებ, არსებობს თუ არა Review, სადაც user და dish ემთხვევა
-        return Review.objects.filter(user=user, dish=dish).exists()
+        # მომხმარებლის შეფასებული კერძების id-ებს ერთხელ ვკითხულობ მთელი მოთხოვნისთვის
+        # და ვინახავ root სერიალიზატორის context-ში, მერე კი ყოველი ნივთისთვის მხოლოდ set-ში ვეძებ
+        user_id = obj.order.user_id
+        reviewed_dish_ids = self.context.setdefault('reviewed_dish_ids', {})
+        if user_id not in reviewed_dish_ids:
+            reviewed_dish_ids[user_id] = set(
+                Review.objects.filter(user_id=user_id, dish_id__in=self.serialized_dish_ids())
+                .values_list('dish_id', flat=True)
+            )
+        return obj.dish_id in reviewed_dish_ids[user_id]
+
+    def serialized_dish_ids(self):
+        # მხოლოდ ამ პასუხში მოხვედრილი კერძები და არა მომხმარებლის ყველა შეფასება
+        # (3 ნივთიან კალათას ასობით შეფასება არ უნდა ჩატვირთოს). ნივთები უკვე prefetch-ითაა ჩატვირთული
+        instance = self.root.instance
+        if isinstance(instance, OrderItem):
+            return {instance.dish_id}
+        orders = [instance] if isinstance(instance, Order) else instance
+        return {item.dish_id for order in orders for item in order.items.all() if item.dish_id}
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -104,6 +137,46 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ('id', 'user', 'created_at', 'status', 'total_price', 'coupon', 'items')
         read_only_fields = ('user', 'total_price', 'created_at')
 
+    # N+1 query-ების თავიდან ასაცილებლად: კუპონი JOIN-ით, ნივთები და მათი კერძები ერთი დამატებითი query-ით
+    @staticmethod
+    def get_items_prefetch():
+        return Prefetch('items', queryset=OrderItem.objects.select_related('dish'))
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.select_related('coupon').prefetch_related(cls.get_items_prefetch())
+
+    @classmethod
+    def prefetch(cls, orders):
+        # იგივე უკვე ჩატვირთული ობიექტებისთვის (მაგ. კალათა ცვლილების შემდეგ)
+        prefetch_related_objects(orders, 'coupon', cls.get_items_prefetch())
+        return orders
+
+# კალათის ერთდროული ცვლილებების სერიალიზატორები (cart/batch/)
+class CartOperationSerializer(serializers.Serializer):
+    OPERATION_CHOICES = ('add', 'set', 'remove')
+
+    op = serializers.ChoiceField(choices=OPERATION_CHOICES)
+    dish_id = serializers.IntegerField(required=False)
+    item_id = serializers.IntegerField(required=False)
+    quantity = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, data):
+        if 'dish_id' not in data and 'item_id' not in data:
+            raise serializers.ValidationError("Either dish_id or item_id is required.")
+        if data['op'] == 'add':
+            if 'dish_id' not in data:
+                raise serializers.ValidationError("dish_id is required to add an item.")
+            data.setdefault('quantity', 1)
+        if data['op'] == 'set' and 'quantity' not in data:
+            raise serializers.ValidationError("quantity is required to set an item quantity.")
+        return data
+
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=100)
+
+
 # პროფილის და შეფასების სერიალიზატორები
 class UserProfileSerializer(serializers.ModelSerializer):
     # source-ს ვიყენებ, რომ დავაკავშირო UserProfile-ის ველები User მოდელთან
@@ -0,0 +1,157 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .menu_cache import bump_menu_version
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .images import delete_derivatives, schedule_derivatives
+from .models import Dish, DishCategory, Review, Reservation, OperatingHours
+from .occupancy import local_dates, rebuild_occupancy, refresh_occupancy
+from . import search
+
+
+# შეფასებების აგრეგატების განახლება Dish-ზე
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, **kwargs):
+    # რედაქტირებისას (მაგ. ადმინიდან) მჭირდება ძველი მნიშვნელობა, რომ აგრეგატიდან გამოვაკლო
+    instance._previous_rating = None
+    if not instance._state.adding and instance.pk:
+        instance._previous_rating = (
+            Review.objects.filter(pk=instance.pk).values_list('dish_id', 'rating').first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def add_review_to_dish_rating(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_rating', None)
+    if not created and previous:
+        if previous == (instance.dish_id, instance.rating):
+            return
+        Dish.apply_rating_change(previous[0], previous[1], -1)
+    Dish.apply_rating_change(instance.dish_id, instance.rating, 1)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_dish_rating(sender, instance, **kwargs):
+    Dish.apply_rating_change(instance.dish_id, instance.rating, -1)
+
+
+# მენიუს ვერსიის გაზრდა, რომ ქეშირებული გვერდები გაუქმდეს
+
+@receiver(post_save, sender=Dish)
+@receiver(post_delete, sender=Dish)
+@receiver(post_save, sender=DishCategory)
+@receiver(post_delete, sender=DishCategory)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_menu_cache(sender, **kwargs):
+    # ვერსიას ვზრდი მხოლოდ commit-ის შემდეგ, რომ სხვა მოთხოვნამ ძველი მონაცემები ახალი ვერსიით არ შეინახოს
+    transaction.on_commit(bump_menu_version)
+
+
+# ძებნის FTS ცხრილის სინქრონიზაცია
+
+@receiver(post_save, sender=Dish)
+def index_dish_for_search(sender, instance, **kwargs):
+    search.index_dish(instance.pk)
+
+
+@receiver(post_delete, sender=Dish)
+def unindex_dish_for_search(sender, instance, **kwargs):
+    search.unindex_dish(instance.pk)
+
+
+@receiver(post_save, sender=DishCategory)
+def reindex_category_for_search(sender, instance, created, **kwargs):
+    if not created:
+        search.reindex_category(instance.pk)
+
+
+# სურათის ვარიანტების გენერაცია ატვირთვისას
+
+@receiver(pre_save, sender=Dish)
+def reset_image_derivatives(sender, instance, raw=False, **kwargs):
+    instance._image_changed = bool(instance.image)
+    instance._stale_derivatives = {}
+    if raw or instance._state.adding or not instance.pk:
+        return
+    previous_image, previous_derivatives = (
+        Dish.objects.filter(pk=instance.pk).values_list('image', 'image_derivatives').first() or ('', {})
+    )
+    instance._image_changed = (previous_image or '') != (instance.image.name or '')
+    if instance._image_changed:
+        # ძველი სურათის ვარიანტები აღარ გამოდგება; მათ ფაილებს ახლების შენახვის შემდეგ ვშლი
+        instance._stale_derivatives = previous_derivatives or {}
+        instance.image_derivatives = {}
+
+
+@receiver(post_save, sender=Dish)
+def generate_image_derivatives(sender, instance, raw=False, **kwargs):
+    if raw or not getattr(instance, '_image_changed', False):
+        return
+    dish_id, image_name, stale = instance.pk, instance.image.name, instance._stale_derivatives
+    if image_name:
+        transaction.on_commit(lambda: schedule_derivatives(dish_id, image_name, stale))
+    elif stale:
+        # სურათი წაიშალა: ახალი ვარიანტები არ იქნება
+        transaction.on_commit(lambda: delete_derivatives(stale))
+
+
+# მაგიდების დაკავებულობის (TableOccupancy) განახლება
+
+@receiver(pre_save, sender=Reservation)
+def remember_previous_reservation(sender, instance, **kwargs):
+    # ადმინში მაგიდის ან დროის შეცვლისას ძველი დღეებიც უნდა გადაითვალოს
+    instance._previous_slot = None
+    if not instance._state.adding and instance.pk:
+        instance._previous_slot = (
+            Reservation.objects.filter(pk=instance.pk).values_list('table_id', 'start_time', 'end_time').first()
+        )
+
+
+@receiver(post_save, sender=Reservation)
+def update_occupancy_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    affected = {(instance.table_id, date) for date in local_dates(instance.start_time, instance.end_time)}
+    previous = getattr(instance, '_previous_slot', None)
+    if previous:
+        table_id, start, end = previous
+        affected |= {(table_id, date) for date in local_dates(start, end)}
+    for table_id in {table_id for table_id, _ in affected}:
+        refresh_occupancy(table_id, sorted(date for other, date in affected if other == table_id))
+
+
+@receiver(post_delete, sender=Reservation)
+def update_occupancy_on_delete(sender, instance, **kwargs):
+    refresh_occupancy(instance.table_id, local_dates(instance.start_time, instance.end_time))
+
+
+@receiver(post_save, sender=OperatingHours)
+@receiver(post_delete, sender=OperatingHours)
+def rebuild_occupancy_on_hours_change(sender, raw=False, **kwargs):
+    # სლოტების ბადე შეიცვალა: დღევანდელი და მომავალი დღეების ნიღბებს თავიდან ვაგებ
+    if not raw:
+        rebuild_occupancy(since=timezone.localdate())
+
+
+# ტოკენების ქეშის გასუფთავება
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    # LogoutView ტოკენს შლის
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    # პაროლის შეცვლა, დეაქტივაცია ან სხვა ცვლილება - ქეშირებული user ობიექტი აღარ არის აქტუალური
+    token_cache.invalidate_user(instance.pk)
@@ -1,3 +1,1157 @@
-from django.test import TestCase
+import asyncio
+import base64
+import datetime
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import smtplib
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import Future
+from decimal import Decimal
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from . import compiled_serializers, metrics
+from .authentication import token_cache
+from .images import build_srcset, derivative_files, render_derivatives, store_derivatives
+from .management.commands.deliver_outbox import Command as DeliverOutboxCommand
+from .menu_cache import bump_menu_version
+from .menu_index import MenuIndex
+from .middleware import accepted_encodings
+from .models import DishCategory, Dish, Order, OrderItem, Review, Table, OperatingHours, Reservation, Coupon, TableOccupancy, UserProfile, OutboundEmail
+from .occupancy import rebuild_occupancy
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+from .serializers import DishSerializer, OrderSerializer, ReservationSerializer
+
+
+# query-ების ბიუჯეტის გადაჭარბება (API_METRICS['QUERY_BUDGETS']) ტესტებში შეცდომაა
+def strict_query_budgets(**budgets):
+    config = settings.API_METRICS
+    return override_settings(API_METRICS={
+        **config, 'STRICT_BUDGETS': True, 'QUERY_BUDGETS': {**config['QUERY_BUDGETS'], **budgets},
+    })
+
+
+# შეკვეთების სერიალიზაციის query-ების რაოდენობა არ უნდა იყოს დამოკიდებული შეკვეთების/ნივთების რაოდენობაზე
+@strict_query_budgets()
+class OrderSerializationQueryCountTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user('tester', 'tester@example.com', 'password123')
+        self.token = Token.objects.create(user=self.user)
+        category = DishCategory.objects.create(name='Curries')
+        self.dishes = [
+            Dish.objects.create(category=category, name=f'Dish {i}', price=5 + i) for i in range(6)
+        ]
+
+    def create_orders(self, order_count, items_per_order):
+        for _ in range(order_count):
+            order = Order.objects.create(user=self.user, status='completed')
+            for dish in self.dishes[:items_per_order]:
+                OrderItem.objects.create(order=order, dish=dish, quantity=2)
+        # რამდენიმე კერძი უკვე შეფასებულია, რომ is_reviewed-ის ორივე შემთხვევა შემოწმდეს
+        for dish in self.dishes[:items_per_order:2]:
+            Review.objects.get_or_create(user=self.user, dish=dish, defaults={'rating': 4})
+
+    def count_history_queries(self):
+        token_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/orders/history/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_order_history_query_count_is_constant(self):
+        self.create_orders(order_count=1, items_per_order=1)
+        small_count, small_data = self.count_history_queries()
+
+        self.create_orders(order_count=9, items_per_order=6)
+        large_count, large_data = self.count_history_queries()
+
+        self.assertEqual(len(small_data), 1)
+        self.assertEqual(len(large_data), 10)
+        self.assertEqual(small_count, large_count)
+
+    def test_is_reviewed_uses_reviewed_dish_set(self):
+        self.create_orders(order_count=2, items_per_order=3)
+        _, data = self.count_history_queries()
+
+        flags = {item['dish']: item['is_reviewed'] for order in data for item in order['items']}
+        self.assertEqual(flags, {
+            self.dishes[0].id: True,
+            self.dishes[1].id: False,
+            self.dishes[2].id: True,
+        })
+
+    def test_cart_query_count_is_constant(self):
+        headers = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        self.client.post('/api/cart/', {'dish_id': self.dishes[0].id}, content_type='application/json', **headers)
+        token_cache.clear()
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/cart/', **headers)
+
+        for dish in self.dishes[1:]:
+            self.client.post('/api/cart/', {'dish_id': dish.id}, content_type='application/json', **headers)
+        token_cache.clear()
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/api/cart/', **headers)
+
+        self.assertEqual(len(response.json()['items']), len(self.dishes))
+        self.assertEqual(len(small), len(large))
+
+
+# ერთსა და იმავე დროზე პარალელური ჯავშნები: თითო მაგიდაზე მხოლოდ ერთი უნდა შეიქმნას
+class ConcurrentReservationTests(TransactionTestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        for weekday in range(7):
+            OperatingHours.objects.create(weekday=weekday, open_time=datetime.time(10), close_time=datetime.time(22))
+        self.tables = [
+            Table.objects.create(name='Window', capacity=2),
+            Table.objects.create(name='Corner', capacity=4),
+        ]
+        Table.objects.create(name='Closed', capacity=2, is_active=False)
+        self.tokens = []
+        for i in range(8):
+            user = User.objects.create_user(f'guest{i}', f'guest{i}@example.com', 'password123')
+            self.tokens.append(Token.objects.create(user=user).key)
+        self.date = timezone.localdate() + datetime.timedelta(days=2)
+
+    def book(self, token, barrier, results):
+        try:
+            barrier.wait()
+            response = self.client_class().post('/api/reservations/create/', {
+                'party_size': 2,
+                'date': self.date.isoformat(),
+                'start_time_str': '18:00',
+                'end_time_str': '19:30',
+            }, content_type='application/json', HTTP_AUTHORIZATION=f'Token {token}')
+            results.append(response.status_code)
+        finally:
+            connection.close()
+
+    def test_parallel_bookings_never_double_book(self):
+        barrier = threading.Barrier(len(self.tokens))
+        results = []
+        threads = [threading.Thread(target=self.book, args=(token, barrier, results)) for token in self.tokens]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # ჯერ პატარა მაგიდა ივსება, შემდეგ დიდი; დანარჩენები 409-ს იღებენ
+        self.assertEqual(sorted(results), [201, 201] + [409] * 6)
+        booked_tables = list(Reservation.objects.order_by('table__capacity').values_list('table_id', flat=True))
+        self.assertEqual(booked_tables, [table.id for table in self.tables])
+
+
+# ერთი კერძი კალათაში ერთხელ; დასრულებული შეკვეთების ხაზებს მიგრაცია არ ეხება
+class CartItemMergeTests(TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user('guest', 'guest@example.com', 'password123')
+        self.token = Token.objects.create(user=self.user).key
+        category = DishCategory.objects.create(name='Soups')
+        self.dish = Dish.objects.create(category=category, name='Kharcho', description='Beef soup', price=12)
+
+    def test_migration_merges_only_pending_carts(self):
+        merge_duplicate_carts = import_module('api.migrations.0009_unique_pending_cart').merge_duplicate_carts
+        # დასრულებულ შეკვეთაში ერთი კერძის ორი ხაზი სხვადასხვა ფასით ისტორიაა
+        completed = Order.objects.create(user=self.user, status='completed', total_price=Decimal('22.00'))
+        OrderItem.objects.create(order=completed, dish=self.dish, quantity=1)
+        OrderItem.objects.filter(order=completed).update(price_at_order=10)
+        OrderItem.objects.create(order=completed, dish=self.dish, quantity=1)
+        cart = Order.objects.create(user=self.user, status='pending')
+        OrderItem.objects.create(order=cart, dish=self.dish, quantity=1)
+        OrderItem.objects.create(order=cart, dish=self.dish, quantity=2)
+
+        merge_duplicate_carts(django_apps, None)
+
+        self.assertEqual(sorted(completed.items.values_list('quantity', 'price_at_order')),
+                         [(1, Decimal('10.00')), (1, Decimal('12.00'))])
+        completed.refresh_from_db()
+        self.assertEqual(completed.total_price, Decimal('22.00'))
+        self.assertEqual(list(cart.items.values_list('quantity', flat=True)), [3])
+        cart.refresh_from_db()
+        self.assertEqual(cart.total_price, Decimal('36.00'))
+
+        # კერძის დამატება, რომელიც ისტორიაში ორჯერ გვხვდება
+        response = self.client.post('/api/cart/', {'dish_id': self.dish.id}, content_type='application/json',
+                                    HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(cart.items.values_list('quantity', flat=True)), [4])
+
+
+# მიგრაცია 0007 ბადის საკუთარ ასლს იყენებს; შედეგი rebuild_occupancy-ს უნდა ემთხვეოდეს
+class TableOccupancyMigrationTests(TestCase):
+
+    def test_matches_rebuild_occupancy(self):
+        for weekday in range(7):
+            OperatingHours.objects.create(weekday=weekday, open_time=datetime.time(10), close_time=datetime.time(22, 15))
+        user = User.objects.create_user('guest', 'guest@example.com', 'password123')
+        table = Table.objects.create(name='Window', capacity=2)
+        start = timezone.make_aware(datetime.datetime.combine(timezone.localdate(), datetime.time(9, 45)))
+        for hours, minutes, length in ((0, 0, 60), (3, 10, 95), (8, 45, 60), (12, 0, 120), (36, 0, 30)):
+            begin = start + datetime.timedelta(hours=hours, minutes=minutes)
+            Reservation.objects.create(user=user, table=table, party_size=2, start_time=begin,
+                                       end_time=begin + datetime.timedelta(minutes=length), status='Confirmed')
+        fields = ('table_id', 'date', 'open_time', 'slot_count', 'busy_mask', 'overlap_mask')
+
+        rebuild_occupancy()
+        expected = list(TableOccupancy.objects.order_by('date').values_list(*fields))
+        TableOccupancy.objects.all().delete()
+        import_module('api.migrations.0007_table_occupancy').fill_table_occupancy(django_apps, None)
+
+        self.assertEqual(list(TableOccupancy.objects.order_by('date').values_list(*fields)), expected)
+        self.assertEqual(len(expected), 2)
+
+
+# ერთი მოთხოვნის ღირებულების ზედა ზღვარი: ნაწილი, რომელიც N-ზე არ არის დამოკიდებული, და ნაწილი თითო
+# ჩანაწერზე იმ endpoint-ებისთვის, რომლებიც პირობით ყველაფერს აბრუნებენ (მაგ. შეკვეთების სრული ისტორია)
+def bound(fixed, per_row=0):
+    return lambda size: fixed + per_row * size
+
+
+# (სახელი, მეთოდი, URL, მონაცემები, მოსალოდნელი სტატუსი, query-ები, პასუხის ბაიტები, გამოყოფილი მეხსიერება KiB-ში)
+# URL-ში და მონაცემებში {dish}, {cart_item} და ა.შ. ივსება seed-ის შემდეგ (იხ. build_context)
+ENDPOINTS = [
+    ('categories', 'GET', '/api/categories/', None, 200, 1, bound(600), bound(60)),
+    ('dishes', 'GET', '/api/dishes/', None, 200, 1, bound(5000), bound(150, 3.5)),
+    ('dishes_filtered', 'GET', '/api/dishes/?category={category}&spiciness=2&ordering=price', None, 200, 1, bound(5000), bound(150, 3.5)),
+    ('dishes_search', 'GET', '/api/dishes/?search=salad', None, 200, 2, bound(5000), bound(150, 3.5)),
+    ('dishes_cursor', 'GET', '/api/dishes/?pagination=cursor&ordering=price', None, 200, 1, bound(5000), bound(150)),
+    ('featured', 'GET', '/api/featured-dishes/', None, 200, 1, bound(1000, 25), bound(100, 0.4)),
+    ('register', 'POST', '/api/register/', {'username': 'newcomer', 'email': 'newcomer@example.com', 'password': 'secret-123'}, 201, 8, bound(200), bound(100)),
+    ('login', 'POST', '/api/login/', {'email': '{email}', 'password': 'benchmark-password'}, 200, 3, bound(200), bound(80)),
+    ('register_async', 'POST', '/api/register/async/', {'username': 'newcomer', 'email': 'newcomer@example.com', 'password': 'secret-123'}, 201, 8, bound(200), bound(100)),
+    ('login_async', 'POST', '/api/login/async/', {'email': '{email}', 'password': 'benchmark-password'}, 200, 2, bound(200), bound(100)),
+    ('logout', 'POST', '/api/logout/', None, 204, 2, bound(100), bound(60)),
+    ('cart', 'GET', '/api/cart/', None, 200, 5, bound(1000), bound(100)),
+    ('cart_add', 'POST', '/api/cart/', {'dish_id': '{dish}'}, 201, 13, bound(1200), bound(100)),
+    ('cart_update', 'PUT', '/api/cart/', {'item_id': '{cart_item}', 'quantity': 3}, 200, 7, bound(1000), bound(100)),
+    ('cart_remove', 'DELETE', '/api/cart/', {'item_id': '{cart_item}'}, 200, 8, bound(800), bound(100)),
+    ('cart_batch', 'POST', '/api/cart/batch/', {'operations': [{'op': 'add', 'dish_id': '{dish}', 'quantity': 2}, {'op': 'set', 'item_id': '{cart_item}', 'quantity': 4}]}, 200, 12, bound(1200), bound(120)),
+    ('apply_coupon', 'POST', '/api/cart/apply-coupon/', {'coupon_code': '{coupon}'}, 200, 8, bound(1000), bound(100)),
+    ('remove_coupon', 'POST', '/api/cart/remove-coupon/', None, 200, 8, bound(1000), bound(100)),
+    ('availability', 'GET', '/api/reservations/availability/?date={date}&table_id={table}', None, 200, 4, bound(1200), bound(80)),
+    ('availability_range', 'GET', '/api/reservations/availability/range/?start={date}&end={week_end}&party_size=2', None, 200, 4, bound(5000), bound(150)),
+    ('reservation_create', 'POST', '/api/reservations/create/', {'party_size': 2, 'date': '{free_date}', 'start_time_str': '12:00', 'end_time_str': '13:00'}, 201, 18, bound(300), bound(120)),
+    ('reservation_history', 'GET', '/api/reservations/history/', None, 200, 3, bound(1000, 250), bound(150, 4.5)),
+    ('reservation_cancel', 'POST', '/api/reservations/cancel/{reservation}/', None, 200, 8, bound(300), bound(100)),
+    ('place_order', 'POST', '/api/orders/place/', None, 200, 11, bound(1000), bound(100)),
+    ('order_history', 'GET', '/api/orders/history/', None, 200, 4, bound(1000, 700), bound(250, 16)),
+    ('order_history_cursor', 'GET', '/api/orders/history/?pagination=cursor', None, 200, 4, bound(7000), bound(300)),
+    ('profile', 'GET', '/api/profile/', None, 200, 3, bound(200), bound(80)),
+    ('profile_update', 'PUT', '/api/profile/', {'city': 'Batumi'}, 200, 4, bound(200), bound(80)),
+    ('change_password', 'POST', '/api/profile/change-password/', {'old_password': 'benchmark-password', 'new_password': 'another-secret-456', 'new_password_confirm': 'another-secret-456'}, 200, 3, bound(100), bound(80)),
+    ('review_add', 'POST', '/api/reviews/add/', {'dish': '{unreviewed_dish}', 'rating': 5}, 201, 7, bound(200), bound(100)),
+    ('metrics', 'GET', '/api/metrics/', None, 200, 1, bound(10000), bound(100)),
+    ('bootstrap', 'GET', '/api/bootstrap/', None, 200, 9, bound(6000, 16), bound(250, 3.5)),
+]
+
+
+# ყველა endpoint-ის ღირებულება რამდენიმე ზომის მონაცემებზე (10, 100, 1000 კერძი/შეკვეთა/ჯავშანი)
+# query-ების რაოდენობა ყველა ზომაზე ერთნაირი უნდა იყოს, ბაიტები და მეხსიერება კი bound()-ში უნდა ჯდებოდეს
+# BOOTSTRAP_WORKERS=0: query-ებს ამ ნაკადის კავშირზე ვითვლი და სხვა ნაკადი TestCase-ის მონაცემებს ვერ ხედავს
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], BOOTSTRAP_WORKERS=0)
+@strict_query_budgets()
+class EndpointCostRegressionTests(TestCase):
+    SIZES = (10, 100, 1000)
+
+    def seed(self, size):
+        call_command(
+            'seed_benchmark_data', stdout=io.StringIO(),
+            categories=5, dishes=size, users=1, orders_per_user=size, items_per_order=3,
+            reviews=size // 2, coupons=2, tables=10, reservations=size, days=60,
+        )
+        self.user = User.objects.get(username='bench_user_0')
+        self.user.is_staff = True
+        self.user.save()
+
+        # კალათა სამი კერძით და გასაუქმებელი ჯავშანი ცალკე დღეს; ორივე ზომაზე არ არის დამოკიდებული
+        cart = Order.objects.create(user=self.user, status='pending')
+        for dish in Dish.objects.order_by('id')[:3]:
+            OrderItem.objects.create(order=cart, dish=dish, quantity=1)
+        start = timezone.make_aware(datetime.datetime.combine(
+            timezone.localdate() + datetime.timedelta(days=50), datetime.time(18)
+        ))
+        self.reservation = Reservation.objects.create(
+            user=self.user, table=Table.objects.order_by('id').first(), party_size=2,
+            start_time=start, end_time=start + datetime.timedelta(hours=1),
+        )
+        return cart
+
+    def build_context(self, cart):
+        today = timezone.localdate()
+        reviewed = Review.objects.filter(user=self.user).values('dish_id')
+        return {
+            'email': self.user.email,
+            'category': DishCategory.objects.order_by('id').values_list('slug', flat=True)[1],
+            'dish': Dish.objects.order_by('-id').values_list('id', flat=True)[0],
+            'cart_item': cart.items.order_by('id').values_list('id', flat=True)[0],
+            'coupon': Coupon.objects.order_by('id').values_list('code', flat=True)[0],
+            'table': Table.objects.order_by('id').values_list('id', flat=True)[0],
+            'date': (today + datetime.timedelta(days=1)).isoformat(),
+            'week_end': (today + datetime.timedelta(days=7)).isoformat(),
+            'free_date': (today + datetime.timedelta(days=45)).isoformat(),
+            'reservation': self.reservation.id,
+            'unreviewed_dish': OrderItem.objects.filter(
+                order__user=self.user, order__status='completed'
+            ).exclude(dish_id__in=reviewed).values_list('dish_id', flat=True)[0],
+        }
+
+    def fill(self, value, context):
+        if isinstance(value, str):
+            formatted = value.format(**context)
+            return int(formatted) if value.startswith('{') and formatted.isdigit() else formatted
+        if isinstance(value, dict):
+            return {key: self.fill(item, context) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.fill(item, context) for item in value]
+        return value
+
+    def measure(self, name, method, path, data, cart):
+        # ყოველი მოთხოვნა ცივი ქეშით და საკუთარ savepoint-ში, რომელიც ბოლოს უკან ბრუნდება
+        cache.clear()
+        token_cache.clear()
+        if name == 'remove_coupon':
+            cart.coupon = Coupon.objects.order_by('id').first()
+            cart.save()
+        request = getattr(self.client, method.lower())
+        headers = {} if name in ('register', 'register_async') else {'HTTP_AUTHORIZATION': f'Token {self.token}'}
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            response = request(path, data, content_type='application/json', **headers)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return {
+            'status': response.status_code,
+            'queries': len(queries),
+            'bytes': len(response.content),
+            'kib': peak / 1024,
+            'ms': elapsed * 1000,
+        }
+
+    def measure_all(self, size):
+        results = {}
+        with transaction.atomic():
+            cart = self.seed(size)
+            self.token = Token.objects.get(user=self.user).key
+            context = self.build_context(cart)
+            for name, method, path, data, *_ in ENDPOINTS:
+                with transaction.atomic():
+                    results[name] = self.measure(name, method, self.fill(path, context), self.fill(data, context), cart)
+                    transaction.set_rollback(True)
+            transaction.set_rollback(True)
+        return results
+
+    def test_endpoint_cost_does_not_grow_with_data(self):
+        # პირველი გაშვება მხოლოდ გასახურებლადაა (იმპორტები, lazy ობიექტები), რომ ისინი პირველ ზომას არ ჩაეთვალოს
+        self.measure_all(self.SIZES[0])
+        results = {}
+        for size in self.SIZES:
+            for name, cost in self.measure_all(size).items():
+                results[name, size] = cost
+
+        self.print_growth_table(results)
+
+        for name, method, path, data, expected_status, queries, max_bytes, max_kib in ENDPOINTS:
+            for size in self.SIZES:
+                cost = results[name, size]
+                with self.subTest(endpoint=name, size=size):
+                    self.assertEqual(cost['status'], expected_status)
+                    if queries is not None:
+                        self.assertEqual(cost['queries'], queries)
+                    if max_bytes is not None:
+                        self.assertLessEqual(cost['bytes'], max_bytes(size))
+                    if max_kib is not None:
+                        self.assertLessEqual(cost['kib'], max_kib(size))
+
+    def print_growth_table(self, results):
+        first, last = self.SIZES[0], self.SIZES[-1]
+        header = f"{'endpoint':<22}" + ''.join(f"{f'q@{size}':>7}" for size in self.SIZES)
+        header += ''.join(f"{f'bytes@{size}':>12}" for size in self.SIZES)
+        header += ''.join(f"{f'KiB@{size}':>10}" for size in self.SIZES)
+        header += f"{f'ms@{first}':>9}{f'ms@{last}':>9}{'growth':>8}"
+        lines = ['', f"Endpoint cost by data size (growth = KiB@{last} / KiB@{first})", header]
+        for name, *_ in ENDPOINTS:
+            costs = [results[name, size] for size in self.SIZES]
+            line = f"{name:<22}" + ''.join(f"{cost['queries']:>7}" for cost in costs)
+            line += ''.join(f"{cost['bytes']:>12}" for cost in costs)
+            line += ''.join(f"{cost['kib']:>10.0f}" for cost in costs)
+            line += f"{costs[0]['ms']:>9.1f}{costs[-1]['ms']:>9.1f}{costs[-1]['kib'] / costs[0]['kib']:>7.1f}x"
+            lines.append(line)
+        print('\n'.join(lines))
+
+
+# კომპილირებული (.values()) სერიალიზატორები ბაიტ-ბაიტ იგივე JSON-ს უნდა აბრუნებდნენ, რასაც DRF-ის სერიალიზატორები
+@strict_query_budgets()
+class CompiledSerializerTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('tester', 'tester@example.com', 'password123')
+        other = User.objects.create_user('other', 'other@example.com', 'password123')
+        categories = [DishCategory.objects.create(name='Soups'), DishCategory.objects.create(name='Grill')]
+        derivatives = {
+            '320': {'width': 320, 'src': 'dishes/derived/a-320.jpg', 'webp': 'dishes/derived/a-320.webp'},
+            '640': {'width': 640, 'src': 'dishes/derived/a-640.jpg', 'webp': 'dishes/derived/a-640.webp'},
+        }
+        self.dishes = [
+            Dish.objects.create(
+                category=categories[i % 2], name=f'Dish {i} “ქართული”', description='Line\nbreak\u2028',
+                price=f'{4 + i}.{i}5', spiciness=i % 5, has_nuts=i % 3 == 0, is_vegetarian=i % 2 == 0,
+                is_featured=i < 3, image=f'dishes/dish {i}.jpg' if i % 2 else '',
+                image_derivatives=derivatives if i == 1 else {},
+            )
+            for i in range(6)
+        ]
+        for i, dish in enumerate(self.dishes[:4]):
+            Review.objects.create(user=other, dish=dish, rating=i + 1)
+        Review.objects.create(user=self.user, dish=self.dishes[0], rating=5)
+
+        coupon = Coupon.objects.create(code='SAVE10', discount_percent=10)
+        for coupon_or_none in (coupon, None):
+            order = Order.objects.create(user=self.user, status='completed', coupon=coupon_or_none, total_price='12.30')
+            for dish in self.dishes[:3]:
+                OrderItem.objects.create(order=order, dish=dish, quantity=2, price_at_order=dish.price)
+        Order.objects.create(user=self.user, status='completed')
+        # წაშლილი კერძის ნივთი: dish_name/dish_image/dish_price პასუხში არ არის
+        self.dishes[2].delete()
+
+        table = Table.objects.create(name='T1', capacity=4)
+        start = timezone.now().replace(microsecond=0) + datetime.timedelta(days=2)
+        for offset, reservation_status in ((0, 'Confirmed'), (-5, 'Confirmed'), (1, 'Cancelled')):
+            Reservation.objects.create(
+                user=self.user, table=table, party_size=2, status=reservation_status,
+                start_time=start + datetime.timedelta(days=offset, hours=offset),
+                end_time=start + datetime.timedelta(days=offset, hours=offset + 2),
+            )
+
+    def assertSameJSON(self, compiled, expected):
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            with self.subTest(renderer=type(renderer).__name__):
+                self.assertEqual(renderer.render(compiled), renderer.render(expected))
+
+    def test_dishes(self):
+        request = RequestFactory().get('/api/featured-dishes/')
+        for context in ({}, {'request': request}):
+            with self.subTest(context=context):
+                queryset = Dish.objects.select_related('category').order_by('id')
+                self.assertSameJSON(
+                    compiled_serializers.CompiledDishSerializer(context).serialize(queryset),
+                    DishSerializer(queryset, many=True, context=context).data,
+                )
+
+    def test_menu_index_rows(self):
+        version = 1
+        self.assertSameJSON(MenuIndex.from_values(version).rows, MenuIndex.from_models(version).rows)
+
+    def test_order_history(self):
+        orders = Order.objects.filter(user=self.user).order_by('-created_at')
+        self.assertSameJSON(
+            compiled_serializers.CompiledOrderSerializer().serialize(orders),
+            OrderSerializer(OrderSerializer.setup_eager_loading(orders), many=True).data,
+        )
+
+    def test_reservations(self):
+        reservations = Reservation.objects.filter(user=self.user).order_by('-start_time')
+        self.assertSameJSON(
+            compiled_serializers.CompiledReservationSerializer().serialize(reservations),
+            ReservationSerializer(reservations.select_related('table'), many=True).data,
+        )
+
+    def test_endpoints_match_drf_serializers(self):
+        headers = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.user).key}'}
+        for path in ('/api/dishes/', '/api/featured-dishes/', '/api/orders/history/', '/api/reservations/history/'):
+            with self.subTest(path=path):
+                cache.clear()
+                compiled = self.client.get(path, **headers)
+                cache.clear()
+                with override_settings(COMPILED_SERIALIZERS=False):
+                    expected = self.client.get(path, **headers)
+                self.assertEqual(compiled.status_code, 200)
+                self.assertEqual(compiled.content, expected.content)
+
+
+# bootstrap/ იგივე მონაცემებს უნდა აბრუნებდეს, რასაც ცალკე endpoint-ები; კალათა და პროფილი სხვა ნაკადებში ითვლება,
+# ამიტომ TransactionTestCase (TestCase-ის ტრანზაქციის მონაცემებს სხვა ნაკადის კავშირი ვერ ხედავს)
+@strict_query_budgets()
+class BootstrapTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user('tester', 'tester@example.com', 'password123')
+        self.token = Token.objects.create(user=self.user)
+        category = DishCategory.objects.create(name='Curries')
+        dishes = [
+            Dish.objects.create(category=category, name=f'Dish {i}', price=5 + i, is_featured=i % 4 == 0)
+            for i in range(12)
+        ]
+        # update() სიგნალების გარეშე: სურათის დამუშავება (შემცირებული ვარიანტები) არ უნდა დაიწყოს
+        Dish.objects.filter(id__in=[dish.id for dish in dishes[::2]]).update(image='dishes/dish.jpg')
+        bump_menu_version()
+        cart = Order.objects.create(user=self.user, status='pending')
+        OrderItem.objects.create(order=cart, dish=dishes[0], quantity=2)
+
+    def get_json(self, path, **headers):
+        response = self.client.get(path, **headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_matches_separate_endpoints(self):
+        headers = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        # პირველი გამოძახება ქეშს ავსებს, მეორე კი ქეშიდან კითხულობს
+        for _ in range(2):
+            data = self.get_json('/api/bootstrap/', **headers)
+            self.assertEqual(data['categories'], self.get_json('/api/categories/'))
+            self.assertEqual(data['featured_dishes'], self.get_json('/api/featured-dishes/'))
+            self.assertEqual(data['dishes'], self.get_json('/api/dishes/'))
+            self.assertEqual(data['cart'], self.get_json('/api/cart/', **headers))
+            self.assertEqual(data['profile'], self.get_json('/api/profile/', **headers))
+        self.assertEqual(len(data['cart']['items']), 1)
+        self.assertIsNotNone(data['dishes']['next'])
+
+    def test_anonymous_gets_public_parts_only(self):
+        data = self.get_json('/api/bootstrap/')
+        self.assertEqual(len(data['dishes']['results']), 9)
+        self.assertIsNone(data['cart'])
+        self.assertIsNone(data['profile'])
+
+
+# ASGI: ნელი async ლოგინის (პაროლის ჰეშირების) დროს სხვა მოთხოვნა არ უნდა ელოდოს.
+# sync-only middleware მთელ async მოთხოვნას ერთადერთ საერთო sync ნაკადში გაატარებდა
+class AsgiConcurrencyTests(TestCase):
+    DJANGO_MIDDLEWARE = [
+        'django.middleware.security.SecurityMiddleware',
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    ]
+    HASHING_SECONDS = 1
+
+    def setUp(self):
+        cache.clear()
+
+    def slow_make_password(self, password):
+        time.sleep(self.HASHING_SECONDS)
+        return make_password(password)
+
+    async def get_during_slow_login(self, path):
+        with mock.patch('api.async_views.make_password', self.slow_make_password):
+            login = asyncio.create_task(AsyncClient().post(
+                '/api/login/async/', {'email': 'nobody@example.com', 'password': 'secret-123'},
+                content_type='application/json',
+            ))
+            await asyncio.sleep(0.1)
+            started = time.perf_counter()
+            response = await AsyncClient().get(path)
+            elapsed = time.perf_counter() - started
+            self.assertEqual((await login).status_code, 400)
+        self.assertEqual(response.status_code, 200)
+        return elapsed
+
+    async def assertNotBlocked(self, *middleware):
+        with override_settings(MIDDLEWARE=[*self.DJANGO_MIDDLEWARE, *middleware]):
+            elapsed = await self.get_during_slow_login('/api/categories/')
+        self.assertLess(elapsed, self.HASHING_SECONDS / 2)
+
+    async def test_replica_routing_middleware(self):
+        await self.assertNotBlocked('api.middleware.ReplicaRoutingMiddleware')
+
+    async def test_request_metrics_middleware(self):
+        await self.assertNotBlocked('api.middleware.RequestMetricsMiddleware')
+
+    async def test_compression_middleware(self):
+        await self.assertNotBlocked('api.middleware.CompressionMiddleware')
+
+
+# query-ების დათვლა და ბიუჯეტები (RequestMetricsMiddleware)
+class RequestMetricsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_budget_is_a_warning_by_default(self):
+        with override_settings(API_METRICS={**settings.API_METRICS, 'QUERY_BUDGETS': {'DishCategoryListAPIView': 0}}):
+            with self.assertLogs('api.metrics', 'WARNING') as logs:
+                response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('DishCategoryListAPIView (GET /api/categories/) ran 1 queries, budget is 0.', logs.output[0])
+
+    def test_strict_budget_raises(self):
+        with strict_query_budgets(DishCategoryListAPIView=0):
+            with self.assertRaises(metrics.QueryBudgetExceeded):
+                self.client.get('/api/categories/')
+
+    def test_server_timing_header(self):
+        category = DishCategory.objects.create(name='Soups')
+        for i in range(3):
+            Dish.objects.create(category=category, name=f'Dish {i}', description='Soup', price=5 + i)
+        metrics.reset()
+        response = self.client.get('/api/dishes/?pagination=cursor&ordering=price')
+        self.assertEqual(response.status_code, 200)
+
+        timings = {
+            name: float(duration)
+            for name, duration in re.findall(r'(\w+);dur=(-?[0-9.]+)', response['Server-Timing'])
+        }
+        self.assertEqual(set(timings), {'db', 'renderer', 'total'})
+        for name, duration in timings.items():
+            self.assertGreaterEqual(duration, 0, name)
+        self.assertGreater(timings['total'], 0)
+        self.assertLessEqual(timings['db'] + timings['renderer'], timings['total'])
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        self.assertIn('desc="response renderer"', response['Server-Timing'])
+
+        stats, = metrics.snapshot()
+        self.assertEqual((stats['view'], stats['requests'], stats['max_queries']), ('DishListAPIView', 1, 1))
+        self.assertGreaterEqual(stats['avg_renderer_ms'], 0)
+
+    async def test_queries_are_counted_under_asgi(self):
+        # ASGI-ზე view-ს query-ები სხვა ნაკადში სრულდება
+        response = await AsyncClient().get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+
+
+# orjson-ით რენდერი/პარსინგი იგივე ბაიტებს და შედეგს უნდა იძლეოდეს, რასაც DRF-ის JSONRenderer/JSONParser
+class FastJSONTests(SimpleTestCase):
+    DATA = {
+        'text': 'ქართული "quoted" \\ line\nbreak \u2028 and \u2029',
+        'non_str_keys': {1: 'one', 2: True, None: None, True: 0},
+        'price': Decimal('12.30'),
+        'created_at': datetime.datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone(datetime.timedelta(hours=4))),
+        'utc': datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+        'date': datetime.date(2026, 1, 2),
+        'time': datetime.time(10, 30),
+        'uuid': uuid.UUID(int=5),
+        'lazy': gettext_lazy('Mild'),
+        'numbers': [0, -1, 1.5, 2 ** 60],
+        'nested': [[], {}, (1, 2), None, False],
+    }
+
+    def assertSameBytes(self, data, accepted_media_type=None, renderer_context=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type, renderer_context),
+            JSONRenderer().render(data, accepted_media_type, renderer_context),
+        )
+
+    def test_render_matches_drf(self):
+        for data in (self.DATA, [self.DATA], [], {}, 'text', 0, None):
+            with self.subTest(data=data):
+                self.assertSameBytes(data)
+        self.assertIn(b'\\u2028 and \\u2029', FastJSONRenderer().render(self.DATA))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_render_falls_back_to_drf(self):
+        # indent-ით (მაგ. Browsable API) და orjson-ის გარეშე სტანდარტული რენდერი
+        self.assertSameBytes(self.DATA, 'application/json; indent=2')
+        self.assertSameBytes(self.DATA, None, {'indent': 4})
+        with mock.patch('api.renderers.orjson', None):
+            self.assertSameBytes(self.DATA)
+
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(io.BytesIO(body), 'application/json', {'encoding': encoding})
+
+    def test_parse_matches_drf(self):
+        body = JSONRenderer().render(self.DATA)
+        self.assertEqual(self.parse(FastJSONParser(), body), self.parse(JSONParser(), body))
+        # UTF-8-ის გარდა სხვა კოდირება და orjson-ის გარეშე: სტანდარტული პარსერი
+        latin = '{"name": "café"}'.encode('latin-1')
+        self.assertEqual(self.parse(FastJSONParser(), latin, 'latin-1'), {'name': 'café'})
+        with mock.patch('api.parsers.orjson', None):
+            self.assertEqual(self.parse(FastJSONParser(), body), self.parse(JSONParser(), body))
+
+    def test_parse_errors(self):
+        for body in (b'{"a": ', b'{"a": NaN}', b'\xff'):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self.parse(FastJSONParser(), body)
+
+
+# პასუხების შეკუმშვა (CompressionMiddleware) და მენიუს ETag-ები
+@mock.patch('api.middleware.brotli', None)
+class CompressionTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        category = DishCategory.objects.create(name='Soups')
+        for i in range(12):
+            Dish.objects.create(category=category, name=f'Dish {i}', description='A bowl of soup. ' * 5, price=5 + i)
+
+    def test_large_response_is_gzipped(self):
+        plain = self.client.get('/api/dishes/')
+        response = self.client.get('/api/dishes/', HTTP_ACCEPT_ENCODING='br, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertGreater(len(plain.content), settings.RESPONSE_COMPRESSION['MIN_SIZE'])
+
+    def test_small_response_is_not_compressed(self):
+        response = self.client.get('/api/categories/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertLess(len(response.content), settings.RESPONSE_COMPRESSION['MIN_SIZE'])
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.json(), [{'id': DishCategory.objects.get().id, 'name': 'Soups', 'slug': 'soups'}])
+
+    def test_refused_encodings(self):
+        for header in ('gzip;q=0', 'identity', '', 'gzip; q=0.0, br;q=0'):
+            with self.subTest(header=header):
+                response = self.client.get('/api/dishes/', HTTP_ACCEPT_ENCODING=header)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(accepted_encodings('gzip;q=0.5, br;q=0, deflate'), {'gzip', 'deflate'})
+
+    def test_strong_etag_becomes_weak(self):
+        plain = self.client.get('/api/dishes/')
+        compressed = self.client.get('/api/dishes/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(plain['ETag'].startswith('"'))
+        self.assertEqual(compressed['ETag'], 'W/' + plain['ETag'])
+
+    def test_weak_if_none_match_returns_304(self):
+        etag = self.client.get('/api/dishes/', HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        for header in (etag, etag.removeprefix('W/'), f'"other", {etag}'):
+            with self.subTest(header=header):
+                response = self.client.get('/api/dishes/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+        self.assertEqual(self.client.get('/api/dishes/', HTTP_IF_NONE_MATCH='W/"other"').status_code, 200)
+
+
+# cursor კლიენტიდან მოდის: არასწორი ფორმა ან ტიპები 404-ია და არა 500
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        category = DishCategory.objects.create(name='Soups')
+        for i in range(12):
+            Dish.objects.create(category=category, name=f'Dish {i:02}', description='Soup', price=5 + i % 4)
+
+    def get_page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_follow_cursor(self):
+        url = '/api/dishes/?pagination=cursor&ordering=price&page_size=5'
+        names = []
+        while url:
+            page = self.get_page(url)
+            names += [dish['name'] for dish in page['results']]
+            url = page['next']
+        self.assertEqual(names, list(Dish.objects.order_by('price', 'id').values_list('name', flat=True)))
+        # უკან დაბრუნება წინა გვერდზე
+        second = self.get_page(self.get_page('/api/dishes/?pagination=cursor&ordering=price&page_size=5')['next'])
+        self.assertEqual([dish['name'] for dish in self.get_page(second['previous'])['results']], names[:5])
+
+    def test_invalid_cursor_is_not_found(self):
+        def encode(data):
+            return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+        cursors = [
+            'not base64!', encode('text'), base64.urlsafe_b64encode(b'\xff').decode(),
+            encode({}), encode({'p': 'x'}), encode({'p': ['1.00']}), encode({'p': ['1.00', 1, 2]}),
+            encode({'p': ['1.00', 'x']}), encode({'p': [{'a': 1}, 1]}), encode({'p': [['1.00'], 1]}),
+            encode({'p': [None, 1]}), encode({'p': ['1.00', 2 ** 80]}), encode({'p': ['NaN-ish', 1]}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/dishes/', {'pagination': 'cursor', 'ordering': 'price', 'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {'detail': 'Invalid cursor'})
+
+
+# ქეშირებული ტოკენი უქმდება გასვლისას, პაროლის შეცვლისას და დეაქტივაციისას
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TokenCacheInvalidationTests(TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        self.user = User.objects.create_user('guest', 'guest@example.com', 'password123')
+        UserProfile.objects.create(user=self.user)
+        self.token = Token.objects.create(user=self.user).key
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token}'}
+        # პირველი მოთხოვნა ქეშს ავსებს
+        self.assertEqual(self.client.get('/api/profile/', **self.auth).status_code, 200)
+        self.assertIsNotNone(token_cache.get(self.token))
+
+    def change_password(self, old_password, new_password):
+        return self.client.post('/api/profile/change-password/', {
+            'old_password': old_password, 'new_password': new_password, 'new_password_confirm': new_password,
+        }, content_type='application/json', **self.auth)
+
+    def test_logout(self):
+        self.assertEqual(self.client.post('/api/logout/', **self.auth).status_code, 204)
+        self.assertIsNone(token_cache.get(self.token))
+        self.assertEqual(self.client.get('/api/profile/', **self.auth).status_code, 401)
+
+    def test_password_change(self):
+        self.assertEqual(self.change_password('password123', 'another-secret-456').status_code, 200)
+        self.assertIsNone(token_cache.get(self.token))
+        # შემდეგი მოთხოვნა ახალ პაროლს ხედავს და არა ქეშში დარჩენილ ძველ ჰეშს
+        self.assertEqual(self.change_password('password123', 'third-secret-789').status_code, 400)
+        self.assertEqual(self.change_password('another-secret-456', 'third-secret-789').status_code, 200)
+
+    def test_deactivation(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(token_cache.get(self.token))
+        self.assertEqual(self.client.get('/api/profile/', **self.auth).status_code, 401)
+
+
+# იგივე საერთო ქეშით (რამდენიმე worker-ის კონფიგურაცია)
+@override_settings(TOKEN_AUTH_CACHE={**settings.TOKEN_AUTH_CACHE, 'BACKEND': 'default'})
+class SharedTokenCacheInvalidationTests(TokenCacheInvalidationTests):
+    pass
+
+
+def save_test_image(media_root, name, size, image_format):
+    path = os.path.join(media_root, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new('RGB', size, (200, 80, 40)).save(path, image_format)
+    return name
+
+
+# სურათის ვარიანტები: ზომები, ფორმატები, srcset და ძველი ფაილების წაშლა სურათის შეცვლისას
+class ImageDerivativeTests(TransactionTestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root, MEDIA_URL='/media/')
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def existing(self, names):
+        return {name for name in names if os.path.exists(os.path.join(self.media_root, name))}
+
+    def open_image(self, name):
+        with Image.open(os.path.join(self.media_root, name)) as image:
+            return image.format, image.width
+
+    def test_render_derivatives(self):
+        jpeg = render_derivatives(self.media_root, save_test_image(self.media_root, 'dishes/foo.jpg', (1600, 800), 'JPEG'))
+        png = render_derivatives(self.media_root, save_test_image(self.media_root, 'dishes/foo.png', (300, 200), 'PNG'))
+
+        self.assertEqual({size: variant['width'] for size, variant in jpeg.items()}, {'thumb': 160, 'card': 480, 'full': 1200})
+        # პატარა სურათს არ ვადიდებ
+        self.assertEqual({size: variant['width'] for size, variant in png.items()}, {'thumb': 160, 'card': 300, 'full': 300})
+        for derivatives, source_format in ((jpeg, 'JPEG'), (png, 'PNG')):
+            for variant in derivatives.values():
+                self.assertEqual(self.open_image(variant['src']), (source_format, variant['width']))
+                self.assertEqual(self.open_image(variant['webp']), ('WEBP', variant['width']))
+        # ერთი სახელის, სხვადასხვა გაფართოების სურათების ვარიანტები ერთმანეთს არ ემთხვევა
+        self.assertFalse(derivative_files(jpeg) & derivative_files(png))
+
+        self.assertEqual(build_srcset(jpeg), {
+            'srcset': '/media/dishes/derivatives/foo_jpg_thumb.jpg 160w, '
+                      '/media/dishes/derivatives/foo_jpg_card.jpg 480w, '
+                      '/media/dishes/derivatives/foo_jpg_full.jpg 1200w',
+            'webp': '/media/dishes/derivatives/foo_jpg_thumb.webp 160w, '
+                    '/media/dishes/derivatives/foo_jpg_card.webp 480w, '
+                    '/media/dishes/derivatives/foo_jpg_full.webp 1200w',
+        })
+        self.assertIsNone(build_srcset({}))
+
+    def test_changing_image_deletes_previous_derivatives(self):
+        # ცალკე პროცესის ნაცვლად ვარიანტებს იმავე ნაკადში ვაგებ
+        def render_now(dish_id, image_name, stale_derivatives=None):
+            future = Future()
+            future.set_result(render_derivatives(self.media_root, image_name))
+            store_derivatives(dish_id, image_name, stale_derivatives, future)
+
+        save_test_image(self.media_root, 'dishes/foo.jpg', (800, 600), 'JPEG')
+        save_test_image(self.media_root, 'dishes/foo.png', (800, 600), 'PNG')
+        category = DishCategory.objects.create(name='Soups')
+        with mock.patch('api.signals.schedule_derivatives', render_now):
+            dish = Dish.objects.create(category=category, name='Kharcho', description='Beef soup', price=12, image='dishes/foo.jpg')
+            dish.refresh_from_db()
+            jpeg_files = derivative_files(dish.image_derivatives)
+            self.assertEqual(len(jpeg_files), 6)
+
+            dish.image = 'dishes/foo.png'
+            dish.save()
+            dish.refresh_from_db()
+            png_files = derivative_files(dish.image_derivatives)
+            self.assertEqual(len(png_files), 6)
+            self.assertEqual(self.existing(jpeg_files | png_files), png_files)
+
+            dish.image = ''
+            dish.save()
+            dish.refresh_from_db()
+            self.assertEqual(dish.image_derivatives, {})
+
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'dishes', 'derivatives')), [])
+        self.assertEqual(self.existing({'dishes/foo.jpg', 'dishes/foo.png'}), {'dishes/foo.jpg', 'dishes/foo.png'})
+
+
+# Dish-ზე შენახული შეფასებების აგრეგატები (signals.py) და rebuild_rating_aggregates
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class RatingAggregateTests(TestCase):
+
+    def setUp(self):
+        category = DishCategory.objects.create(name='Soups')
+        self.kharcho = Dish.objects.create(category=category, name='Kharcho', description='Beef soup', price=12)
+        self.chikhirtma = Dish.objects.create(category=category, name='Chikhirtma', description='Chicken soup', price=10)
+        self.users = [User.objects.create_user(f'guest{i}', f'guest{i}@example.com', 'password123') for i in range(3)]
+
+    def assertAggregates(self, dish, ratings):
+        dish.refresh_from_db()
+        self.assertEqual((dish.rating_sum, dish.rating_count), (sum(ratings), len(ratings)))
+        self.assertEqual(dish.rating_histogram, {star: ratings.count(star) for star in range(1, 6)})
+
+    def test_create_updates_sum_count_and_histogram(self):
+        Review.objects.create(user=self.users[0], dish=self.kharcho, rating=5)
+        Review.objects.create(user=self.users[1], dish=self.kharcho, rating=3)
+        Review.objects.create(user=self.users[2], dish=self.kharcho, rating=5)
+        self.assertAggregates(self.kharcho, [5, 3, 5])
+        self.assertAggregates(self.chikhirtma, [])
+
+    def test_edit_moves_counts(self):
+        review = Review.objects.create(user=self.users[0], dish=self.kharcho, rating=2)
+        Review.objects.create(user=self.users[1], dish=self.kharcho, rating=4)
+
+        review.rating = 5
+        review.save()
+        self.assertAggregates(self.kharcho, [5, 4])
+
+        # შეფასების გადატანა სხვა კერძზე
+        review.dish = self.chikhirtma
+        review.save()
+        self.assertAggregates(self.kharcho, [4])
+        self.assertAggregates(self.chikhirtma, [5])
+
+        # უცვლელი შენახვა აგრეგატს არ ცვლის
+        review.comment = 'Great'
+        review.save()
+        self.assertAggregates(self.chikhirtma, [5])
+
+    def test_delete_decrements(self):
+        review = Review.objects.create(user=self.users[0], dish=self.kharcho, rating=1)
+        Review.objects.create(user=self.users[1], dish=self.kharcho, rating=4)
+        review.delete()
+        self.assertAggregates(self.kharcho, [4])
+        Review.objects.filter(dish=self.kharcho).get().delete()
+        self.assertAggregates(self.kharcho, [])
+
+    def test_rebuild_restores_corrupted_aggregates(self):
+        for user, rating in zip(self.users, (5, 4, 4)):
+            Review.objects.create(user=user, dish=self.kharcho, rating=rating)
+        Review.objects.create(user=self.users[0], dish=self.chikhirtma, rating=2)
+        Dish.objects.update(rating_sum=99, rating_count=1, rating_1_count=7, rating_5_count=0)
+
+        call_command('rebuild_rating_aggregates', stdout=io.StringIO())
+
+        self.assertAggregates(self.kharcho, [5, 4, 4])
+        self.assertAggregates(self.chikhirtma, [2])
+        data = DishSerializer(Dish.objects.get(pk=self.kharcho.pk)).data
+        self.assertEqual((data['average_rating'], data['review_count']), (4.3, 3))
+        self.assertEqual(data['rating_histogram'], {1: 0, 2: 0, 3: 0, 4: 2, 5: 1})
+
+
+# ყველა get_connection() ერთი კავშირია; ვინახავ, რომ batch-ზე გახსნილი კავშირები დავთვალო
+class RecordingEmailBackend(locmem.EmailBackend):
+    connections = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        RecordingEmailBackend.connections.append(self)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPRecipientsRefused({'guest@example.com': (550, b'Mailbox unavailable')})
+
+
+class UnreachableEmailBackend(BaseEmailBackend):
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP server is down')
+
+
+# იმეილები outbox-ში იწერება ბიზნეს-ოპერაციის ტრანზაქციაში და მოთხოვნისას არაფერი იგზავნება
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class OutboxEnqueueTests(TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user('guest', 'guest@example.com', 'password123')
+        self.auth = {'HTTP_AUTHORIZATION': f"Token {Token.objects.create(user=self.user).key}"}
+
+    def post(self, path, data=None):
+        return self.client.post(path, data, content_type='application/json', **self.auth)
+
+    def assertQueued(self, recipient, subject):
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.recipients, email.status, email.attempts), ([recipient], 'pending', 0))
+        self.assertIn(subject, email.subject)
+        self.assertEqual(mail.outbox, [])
+
+    def failing_queue(self):
+        return mock.patch.object(OutboundEmail, 'queue', side_effect=DatabaseError('outbox is unavailable'))
+
+    def test_register(self):
+        data = {'username': 'newcomer', 'email': 'newcomer@example.com', 'password': 'secret-123'}
+        with self.failing_queue(), self.assertRaises(DatabaseError):
+            self.client.post('/api/register/', data, content_type='application/json')
+        self.assertFalse(User.objects.filter(username='newcomer').exists())
+
+        self.assertEqual(self.client.post('/api/register/', data, content_type='application/json').status_code, 201)
+        self.assertQueued('newcomer@example.com', 'Welcome')
+
+    def test_place_order(self):
+        category = DishCategory.objects.create(name='Soups')
+        dish = Dish.objects.create(category=category, name='Kharcho', description='Beef soup', price=12)
+        cart = Order.objects.create(user=self.user, status='pending')
+        OrderItem.objects.create(order=cart, dish=dish, quantity=2)
+
+        with self.failing_queue(), self.assertRaises(DatabaseError):
+            self.post('/api/orders/place/')
+        cart.refresh_from_db()
+        self.assertEqual(cart.status, 'pending')
+
+        self.assertEqual(self.post('/api/orders/place/').status_code, 200)
+        self.assertQueued('guest@example.com', f'Order #{cart.id}')
+        self.assertIn('Kharcho (x2)', OutboundEmail.objects.get().body)
+
+    def test_create_reservation(self):
+        for weekday in range(7):
+            OperatingHours.objects.create(weekday=weekday, open_time=datetime.time(10), close_time=datetime.time(22))
+        Table.objects.create(name='Window', capacity=2)
+        data = {
+            'party_size': 2, 'date': (timezone.localdate() + datetime.timedelta(days=2)).isoformat(),
+            'start_time_str': '18:00', 'end_time_str': '19:30',
+        }
+        with self.failing_queue(), self.assertRaises(DatabaseError):
+            self.post('/api/reservations/create/', data)
+        self.assertFalse(Reservation.objects.exists())
+
+        self.assertEqual(self.post('/api/reservations/create/', data).status_code, 201)
+        self.assertQueued('guest@example.com', f'ID: #{Reservation.objects.get().id}')
+
+
+# deliver_outbox: batch-ები ერთ კავშირზე, retry გაორმაგებული დაყოვნებით, failed და lease
+@override_settings(EMAIL_BACKEND='api.tests.RecordingEmailBackend')
+class DeliverOutboxTests(TestCase):
+    OPTIONS = {'batch_size': 50, 'lease': 300}
+
+    def setUp(self):
+        RecordingEmailBackend.connections = []
+
+    def queue(self, count=1):
+        return [OutboundEmail.queue(f'Message {i}', 'Hello', [f'guest{i}@example.com']) for i in range(count)]
+
+    def deliver(self, *args):
+        call_command('deliver_outbox', *args, stdout=io.StringIO())
+
+    def make_due(self):
+        # retry-ის დრო დადგა
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+
+    def test_batch_is_sent_over_one_connection(self):
+        self.queue(3)
+        self.deliver()
+        self.assertEqual(len(RecordingEmailBackend.connections), 1)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         ['guest0@example.com', 'guest1@example.com', 'guest2@example.com'])
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', flat=True)), {'sent'})
+        self.assertFalse(OutboundEmail.objects.filter(sent_at__isnull=True).exists())
+
+        # სავსე batch-ის შემდეგ შემდეგი batch მაშინვე, ახალ კავშირზე
+        RecordingEmailBackend.connections = []
+        self.queue(5)
+        self.deliver('--batch-size', '2')
+        self.assertEqual(len(RecordingEmailBackend.connections), 3)
+        self.assertEqual(len(mail.outbox), 8)
+
+    @override_settings(EMAIL_BACKEND='api.tests.FailingEmailBackend')
+    def test_failure_backs_off_exponentially(self):
+        email, = self.queue()
+        for attempt, delay in ((1, 30), (2, 60), (3, 120)):
+            before = timezone.now()
+            self.deliver('--backoff', '30', '--max-attempts', '5')
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ('pending', attempt))
+            self.assertIn('Mailbox unavailable', email.last_error)
+            self.assertAlmostEqual((email.next_attempt_at - before).total_seconds(), delay, delta=5)
+
+            # დაყოვნების ვადამდე ჩანაწერს ხელახლა არ ვცდი
+            self.deliver()
+            email.refresh_from_db()
+            self.assertEqual(email.attempts, attempt)
+            self.make_due()
+
+    @override_settings(EMAIL_BACKEND='api.tests.FailingEmailBackend')
+    def test_failed_after_max_attempts(self):
+        email, = self.queue()
+        for _ in range(2):
+            self.deliver('--max-attempts', '2')
+            self.make_due()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 2))
+
+        self.deliver('--max-attempts', '2')
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 2)
+
+    @override_settings(EMAIL_BACKEND='api.tests.UnreachableEmailBackend')
+    def test_connection_failure_retries_whole_batch(self):
+        self.queue(2)
+        self.deliver()
+        self.assertEqual(list(OutboundEmail.objects.values_list('status', 'attempts')), [('pending', 1)] * 2)
+        self.assertEqual(set(OutboundEmail.objects.values_list('last_error', flat=True)), {'SMTP server is down'})
+
+    def test_leased_rows_are_not_claimed_again(self):
+        self.queue(3)
+        command = DeliverOutboxCommand()
+        claimed = command.claim_batch({**self.OPTIONS, 'batch_size': 2})
+        self.assertEqual(len(claimed), 2)
+        # მეორე worker-ი მხოლოდ დარჩენილს იღებს, მერე კი აღარაფერს, სანამ lease არ ამოიწურება
+        self.assertEqual([email.id for email in command.claim_batch(self.OPTIONS)],
+                         list(OutboundEmail.objects.exclude(id__in=[email.id for email in claimed]).values_list('id', flat=True)))
+        self.assertEqual(command.claim_batch(self.OPTIONS), [])
+        self.deliver()
+        self.assertEqual(mail.outbox, [])
+        self.make_due()
+        self.assertEqual(len(command.claim_batch(self.OPTIONS)), 3)
@@ -1,11 +1,15 @@
 from django.urls import path
+from .async_views import AsyncLoginView, AsyncRegisterView
 from .views import (
     DishCategoryListAPIView,
     DishListAPIView,
+    BootstrapView,
+    MetricsView,
     RegisterView,
     LoginView,
     LogoutView,
     CartView,
+    CartBatchView,
     PlaceOrderView,
     OrderHistoryView,
     FeaturedDishListView,
@@ -15,6 +19,7 @@ from .views import (
     ApplyCouponView,
     RemoveCouponView,
     GetAvailabilityView,
+    AvailabilityRangeView,
     CreateReservationView,
     ReservationHistoryView,
     CancelReservationView
@@ -25,11 +30,16 @@ urlpatterns = [
     path('dishes/', DishListAPIView.as_view(), name='dish-list'),
     path('register/', RegisterView.as_view(), name='auth-register'),
     path('login/', LoginView.as_view(), name='auth-login'),
+    # async ვერსიები ASGI დეპლოიმენტისთვის
+    path('register/async/', AsyncRegisterView.as_view(), name='auth-register-async'),
+    path('login/async/', AsyncLoginView.as_view(), name='auth-login-async'),
     path('logout/', LogoutView.as_view(), name='auth-logout'),
     path('cart/', CartView.as_view(), name='cart-api'),
+    path('cart/batch/', CartBatchView.as_view(), name='cart-batch'),
     path('cart/apply-coupon/', ApplyCouponView.as_view(), name='apply-coupon'),
     path('cart/remove-coupon/', RemoveCouponView.as_view(), name='remove-coupon'),
     path('reservations/availability/', GetAvailabilityView.as_view(), name='reservation-availability'),
+    path('reservations/availability/range/', AvailabilityRangeView.as_view(), name='reservation-availability-range'),
     path('reservations/create/', CreateReservationView.as_view(), name='reservation-create'),
     path('reservations/history/', ReservationHistoryView.as_view(), name='reservation-history'),
     path('reservations/cancel/<int:pk>/', CancelReservationView.as_view(), name='reservation-cancel'),
@@ -39,4 +49,6 @@ urlpatterns = [
     path('profile/', UserProfileView.as_view(), name='user-profile'),
     path('profile/change-password/', ChangePasswordView.as_view(), name='change-password'),
     path('reviews/add/', ReviewCreateView.as_view(), name='review-add'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('bootstrap/', BootstrapView.as_view(), name='bootstrap'),
 ]
\ No newline at end of file
@@ -1,16 +1,33 @@
+import contextvars
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
+from django.core.cache import cache
+from django.db import OperationalError, close_old_connections, transaction
+from django.db.models import F
+from django.urls import reverse
 from rest_framework import generics, filters, status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.models import Token
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework import pagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
 # ჩემი მოდელები და სერიალიზატორები
-from .models import DishCategory, Dish, Order, OrderItem, UserProfile, Coupon, Table, OperatingHours, Reservation
+from . import compiled_serializers, metrics
+from .allocation import allocate_table, fitting_tables
+from .authentication import CachedTokenAuthentication
+from .availability import AvailabilityEngine, MAX_RANGE_DAYS
+from .menu_cache import MENU_CHANGED_AT_KEY, MenuCacheMixin, get_menu_version
+from .menu_index import get_menu_index
+from .pagination import KeysetPagination
+from .routers import read_alias, replica_has_caught_up
+from .search import search_dish_ids
+from .models import DishCategory, Dish, Order, OrderItem, UserProfile, Coupon, Table, OperatingHours, Reservation, OutboundEmail
 from .serializers import (
     DishCategorySerializer,
     DishSerializer,
@@ -20,7 +37,8 @@ from .serializers import (
     UserProfileSerializer,
     ReviewSerializer,
     ReservationSerializer,
-    CreateReservationSerializer
+    CreateReservationSerializer,
+    CartBatchSerializer
 )
 
 import datetime
@@ -29,9 +47,11 @@ from django.utils import timezone
 # მენიუს გვერდის ლოგიკა
 
 # ეს კლასი აბრუნებს კატეგორიების სიას
-class DishCategoryListAPIView(generics.ListAPIView):
+class DishCategoryListAPIView(MenuCacheMixin, generics.ListAPIView):
     queryset = DishCategory.objects.all()
     serializer_class = DishCategorySerializer
+    # მხოლოდ კითხულობს: GET-ები read replica-ზე (api/routers.py)
+    read_from_replica = True
 
 # ეს არის ჩემი პაგინაციის კლასი.
 class DishPagination(pagination.PageNumberPagination):
@@ -39,10 +59,36 @@ class DishPagination(pagination.PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+# cursor პაგინაცია კერძებისთვის (?pagination=cursor), იყენებს ordering_fields-ს და id-ს
+class DishCursorPagination(KeysetPagination):
+    page_size = 9
+    max_page_size = 100
+
+# cursor პაგინაცია შეკვეთების ისტორიისთვის, უახლესიდან ძველისკენ
+class OrderHistoryCursorPagination(KeysetPagination):
+    page_size = 10
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+def wants_cursor_pagination(request):
+    return request.query_params.get('pagination') == 'cursor'
+
+
+def absolute_image_urls(request, rows):
+    # მენიუს ინდექსში სურათის ბმული ფარდობითია
+    results = []
+    for row in rows:
+        if row['image']:
+            row = {**row, 'image': request.build_absolute_uri(row['image'])}
+        results.append(row)
+    return results
+
 # ეს კლასი აბრუნებს კერძების გაფილტრულ და დალაგებულ სიას.
-class DishListAPIView(generics.ListAPIView):
-    queryset = Dish.objects.all()
+class DishListAPIView(MenuCacheMixin, generics.ListAPIView):
+    queryset = Dish.objects.select_related('category')
     serializer_class = DishSerializer
+    read_from_replica = True
 
     # ფილტრაცია და დალაგება
     # ვიყენებ Django-ს ჩაშენებულ ფილტრებს
@@ -50,38 +96,84 @@ class DishListAPIView(generics.ListAPIView):
     ordering_fields = ['name', 'price']
     pagination_class = DishPagination
 
-    def get_queryset(self):
-        # ვიღებ ყველა კერძს
-        queryset = super().get_queryset()
+    @property
+    def paginator(self):
+        # ?pagination=cursor-ით კლიენტი ირჩევს keyset პაგინაციას
+        if not hasattr(self, '_paginator'):
+            if wants_cursor_pagination(self.request):
+                self._paginator = DishCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_filter_params(self):
+        # URL-ის პარამეტრებს ვაქცევ ფილტრების ლექსიკონად, რომელსაც იყენებს როგორც ბაზა, ისე ინდექსი
+        params = self.request.query_params
+        dish_filters = {}
 
         # ვამოწმებ URL-ს, ხომ არ მომაწოდეს კატეგორია
-        category_slug = self.request.query_params.get('category')
+        category_slug = params.get('category')
         if category_slug:
-            # ვაფილტრავ ბაზას ამ კატეგორიით
-            queryset = queryset.filter(category__slug=category_slug)
+            dish_filters['category'] = category_slug
 
         # იგივე ლოგიკა სიცხარისთვის
-        spiciness = self.request.query_params.get('spiciness')
+        spiciness = params.get('spiciness')
         if spiciness is not None and spiciness.isdigit():
-            queryset = queryset.filter(spiciness=spiciness)
+            dish_filters['spiciness'] = int(spiciness)
 
-        # იგივე ლოგიკა თხილისთვის
-        has_nuts = self.request.query_params.get('has_nuts')
-        if has_nuts is not None:
-            has_nuts_bool = has_nuts.lower() in ('true', '1')
-            queryset = queryset.filter(has_nuts=has_nuts_bool)
+        # იგივე ლოგიკა თხილისთვის და ვეგეტარიანულისთვის
+        for name in ('has_nuts', 'is_vegetarian'):
+            value = params.get(name)
+            if value is not None:
+                dish_filters[name] = value.lower() in ('true', '1')
 
-        # იგივე ლოგიკა ვეგეტარიანულისთვის
-        is_vegetarian = self.request.query_params.get('is_vegetarian')
-        if is_vegetarian is not None:
-            is_vegetarian_bool = is_vegetarian.lower() in ('true', '1')
-            queryset = queryset.filter(is_vegetarian=is_vegetarian_bool)
+        return dish_filters
 
-        return queryset # ვაბრუნებ საბოლოო, გაფილტრულ სიას
+    def get_queryset(self):
+        # ვიღებ ყველა კერძს
+        queryset = super().get_queryset()
+
+        dish_filters = self.get_filter_params()
+        if 'category' in dish_filters:
+            # ვაფილტრავ ბაზას ამ კატეგორიით
+            dish_filters['category__slug'] = dish_filters.pop('category')
+
+        # სრულტექსტოვანი ძებნა (?search=)
+        ranked_ids = search_dish_ids(self.request.query_params.get('search'))
+        if ranked_ids is not None:
+            dish_filters['id__in'] = ranked_ids
+
+        return queryset.filter(**dish_filters) # ვაბრუნებ საბოლოო, გაფილტრულ სიას
+
+    def get_uncached_response(self, request, *args, **kwargs):
+        if wants_cursor_pagination(request):
+            # cursor რეჟიმი პირდაპირ ბაზიდან კითხულობს ინდექსირებული ველების მიხედვით
+            return super().get_uncached_response(request, *args, **kwargs)
+
+        # ფილტრაცია, დალაგება და პაგინაცია ხდება მეხსიერებაში არსებულ ინდექსზე, ბაზის გარეშე
+        index = get_menu_index()
+        dish_filters = self.get_filter_params()
+        ordering = filters.OrderingFilter().get_ordering(request, Dish.objects.none(), self)
+        # ძებნისას, თუ დალაგება არ არის მითითებული, შედეგები რელევანტურობით (bm25) ლაგდება
+        ranked_ids = search_dish_ids(request.query_params.get('search'))
+
+        page = self.paginate_queryset(index.search(dish_filters, ordering, ranked_ids))
+        response = self.get_paginated_response(absolute_image_urls(request, page))
+        # ფასეტების რაოდენობები მენიუს sidebar-ისთვის
+        response.data['facets'] = index.facet_counts(dish_filters, ranked_ids)
+        return response
 
 
 # ავთენტიფიკაციის ლოგიკა
 
+# მისალმების იმეილი outbox-ში (გამოიყენება async რეგისტრაციაშიც)
+def queue_welcome_email(user):
+    OutboundEmail.queue(
+        'Welcome to Step Ordering!',
+        f'Hi {user.username},\n\nThank you for registering at Step Ordering. We are excited to see you!',
+        [user.email], # მიმღები
+    )
+
 # რეგისტრაციის View
 class RegisterView(generics.CreateAPIView):
     # generics.CreateAPIView არის ავტომატური კლასი ახალი ობიექტის შესაქმნელად.
@@ -90,22 +182,11 @@ class RegisterView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
     def perform_create(self, serializer):
-        user = serializer.save() # ჯერ ვინახავ მომხმარებელს
-        # შემდეგ ვცდილობ იმეილის გაგზავნას
-        try:
-            subject = 'Welcome to Step Ordering!'
-            message = f'Hi {user.username},\n\nThank you for registering at Step Ordering. We are excited to see you!'
-
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL, # გამგზავნი (settings.py-დან)
-                [user.email], # მიმღები
-                fail_silently=False,
-            )
-        except Exception as e:
-            # თუ იმეილი ვერ გაიგზავნა, რეგისტრაცია მაინც წარმატებულია
-            print(f"Error sending welcome email: {e}")
+        # მომხმარებელი და მისალმების იმეილი ერთ ტრანზაქციაში ინახება,
+        # თავად გაგზავნას კი outbox-ის worker-ი აკეთებს
+        with transaction.atomic():
+            user = serializer.save()
+            queue_welcome_email(user)
 
 # ლოგინის View
 class LoginView(APIView):
@@ -131,6 +212,7 @@ class LoginView(APIView):
 
 # ლოგაუთის View
 class LogoutView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = (IsAuthenticated,)
 
     def post(self, request, *args, **kwargs):
@@ -143,17 +225,36 @@ class LogoutView(APIView):
 
 
 # კალათის ლოგიკა
+
+# კალათის მონაცემები GET cart/-ისთვის და bootstrap/-ისთვის
+# მხოლოდ კითხულობს ბაზას: ჯამი ითვლება SQL აგრეგატით და არ ინახება
+def get_cart_data(user):
+    # ვპოულობ ამ მომხმარებლის pending სტატუსის მქონე შეკვეთას
+    cart = Order.objects.select_related('coupon').filter(user=user, status='pending').first()
+    if cart is None:
+        # კალათა ჯერ არ არსებობს - ვაბრუნებ ცარიელს და არ ვქმნი, სანამ რამე არ დაემატება
+        return {
+            'id': None,
+            'user': user.id,
+            'created_at': None,
+            'status': 'pending',
+            'total_price': '0.00',
+            'coupon': None,
+            'items': [],
+        }
+
+    cart.total_price = round(cart.compute_total(), 2)
+    OrderSerializer.prefetch([cart])
+    return OrderSerializer(cart).data # ვთარგმნით JSON-ად
+
+
 class CartView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated] # მხოლოდ დალოგინებულებისთვის
 
     # GET: კალათის ჩვენება
     def get(self, request, *args, **kwargs):
-        # ვპოულობ ამ მომხმარებლის pending სტატუსის მქონე შეკვეთას, ან ვქმნი ახალს
-        cart, created = Order.objects.get_or_create(user=request.user, status='pending')
-        cart.calculate_total()
-        serializer = OrderSerializer(cart) # ვთარგმნით JSON-ად
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(get_cart_data(request.user), status=status.HTTP_200_OK)
 
     # POST: კალათაში დამატება
     def post(self, request, *args, **kwargs):
@@ -167,22 +268,22 @@ class CartView(APIView):
             dish = Dish.objects.get(id=dish_id)
         except Dish.DoesNotExist:
             return Response({"error": "Dish not found"}, status=status.HTTP_404_NOT_FOUND)
-        # ვპოულობ ჩემს კალათას
-        cart, created = Order.objects.get_or_create(user=request.user, status='pending')
-        # ვპოულობ ამ კერძს ამ კალათაში, ან ვქმნი ახალს
-        order_item, item_created = OrderItem.objects.get_or_create(
-            order=cart,
-            dish=dish
-        )
-        # თუ კერძი უკვე კალათაშია, ვუმატებ რაოდენობას
-        if item_created:
-            order_item.quantity = quantity
-        else:
-            order_item.quantity += quantity
-        order_item.save()
+        with transaction.atomic():
+            # ვპოულობ ჩემს კალათას (დაბლოკილს, იხ. Order.get_or_create_cart)
+            cart, created = Order.get_or_create_cart(request.user)
+            # ვპოულობ ამ კერძს ამ კალათაში, ან ვქმნი ახალს
+            order_item, item_created = OrderItem.objects.get_or_create(
+                order=cart,
+                dish=dish,
+                defaults={'quantity': quantity}
+            )
+            # თუ კერძი უკვე კალათაშია, ვუმატებ რაოდენობას ბაზაში (F), რომ პარალელური დამატება არ დაიკარგოს
+            if not item_created:
+                OrderItem.objects.filter(pk=order_item.pk).update(quantity=F('quantity') + quantity)
 
-        # ვიძახებ calculate_total() მეთოდს models.py-დან
-        cart.calculate_total()
+            # ვიძახებ calculate_total() მეთოდს models.py-დან
+            cart.calculate_total()
+        OrderSerializer.prefetch([cart])
         serializer = OrderSerializer(cart)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -196,12 +297,16 @@ class CartView(APIView):
 
         try:
             # ვპოულობ OrderItem-ს ID-ით და ვრწმუნდები, რომ ის ჩემს კალათაშია
-            order_item = OrderItem.objects.get(id=item_id, order__user=request.user, order__status='pending')
+            order_item = OrderItem.objects.select_related('order__coupon').get(
+                id=item_id, order__user=request.user, order__status='pending'
+            )
             order_item.quantity = new_quantity
             order_item.save()
 
-            order_item.order.calculate_total()
-            serializer = OrderSerializer(order_item.order)
+            cart = order_item.order
+            cart.calculate_total()
+            OrderSerializer.prefetch([cart])
+            serializer = OrderSerializer(cart)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except OrderItem.DoesNotExist:
             return Response({"error": "Item not found in your cart"}, status=status.HTTP_404_NOT_FOUND)
@@ -228,12 +333,88 @@ class CartView(APIView):
             cart.items.all().delete()
 
         cart.calculate_total()
+        OrderSerializer.prefetch([cart])
         serializer = OrderSerializer(cart)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+# კალათის რამდენიმე ცვლილება ერთ მოთხოვნაში
+# მაგ. წინა შეკვეთის გამეორება ან შენახული კალათის აღდგენა
+class CartBatchView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    # POST: {"operations": [{"op": "add", "dish_id": 1, "quantity": 2},
+    #                       {"op": "set", "item_id": 5, "quantity": 3},
+    #                       {"op": "remove", "dish_id": 7}]}
+    def post(self, request, *args, **kwargs):
+        serializer = CartBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        operations = serializer.validated_data['operations']
+
+        # ყველა საჭირო კერძს ერთი query-ით ვკითხულობ
+        dish_ids = {op['dish_id'] for op in operations if 'dish_id' in op}
+        dishes = Dish.objects.in_bulk(dish_ids)
+        missing = dish_ids - set(dishes)
+        if missing:
+            return Response({"error": f"Dish not found: {sorted(missing)}"}, status=status.HTTP_404_NOT_FOUND)
+
+        with transaction.atomic():
+            # კალათა და მისი ნივთები დაბლოკილია ტრანზაქციის ბოლომდე: ქვემოთ რაოდენობებს აბსოლუტური
+            # მნიშვნელობით ვწერ, ამიტომ პარალელური დამატება (CartView.post) ჩვენს წაკითხვასა და
+            # ჩაწერას შორის არ უნდა მოხვდეს, თორემ დაიკარგება ან ერთი კერძის მეორე ხაზს შექმნის
+            cart, created = Order.get_or_create_cart(request.user)
+            existing = list(cart.items.select_for_update())
+            # კალათის მდგომარეობა მეხსიერებაში: კერძის id -> OrderItem
+            # (წაშლილი კერძის ნივთს, რომელსაც dish აღარ აქვს, მისივე id-ით ვინახავ)
+            items = {item.dish_id if item.dish_id is not None else ('item', item.id): item for item in existing}
+            items_by_id = {item.id: item for item in existing}
+            original_quantities = {item.id: item.quantity for item in existing}
+
+            for op in operations:
+                if 'item_id' in op:
+                    item = items_by_id.get(op['item_id'])
+                    if item is None:
+                        transaction.set_rollback(True)
+                        return Response({"error": f"Item {op['item_id']} not found in your cart"},
+                                        status=status.HTTP_404_NOT_FOUND)
+                else:
+                    item = items.get(op['dish_id'])
+
+                if op['op'] == 'remove':
+                    if item is not None:
+                        item.quantity = 0 # 0 ნიშნავს, რომ ბოლოს წაიშლება
+                    continue
+
+                if item is None:
+                    dish = dishes[op['dish_id']]
+                    item = OrderItem(order=cart, dish=dish, quantity=0, price_at_order=dish.price)
+                    items[dish.id] = item
+
+                if op['op'] == 'add':
+                    item.quantity += op['quantity']
+                else:
+                    item.quantity = op['quantity']
+
+            to_create = [item for item in items.values() if item.pk is None and item.quantity > 0]
+            to_update = [item for item in items.values()
+                         if item.pk is not None and item.quantity > 0 and item.quantity != original_quantities[item.pk]]
+            to_delete = [item.pk for item in items.values() if item.pk is not None and item.quantity == 0]
+
+            OrderItem.objects.bulk_create(to_create)
+            OrderItem.objects.bulk_update(to_update, ['quantity'])
+            if to_delete:
+                OrderItem.objects.filter(id__in=to_delete).delete()
+
+            # ჯამს ერთხელ ვითვლი ყველა ცვლილების შემდეგ
+            cart.calculate_total()
+
+        OrderSerializer.prefetch([cart])
+        return Response(OrderSerializer(cart).data, status=status.HTTP_200_OK)
+
 # შეკვეთის დადასტურება
 class PlaceOrderView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
@@ -247,14 +428,16 @@ class PlaceOrderView(APIView):
         if not cart.items.all().exists():
             return Response({"error": "Your cart is empty."}, status=status.HTTP_400_BAD_REQUEST)
 
-        cart.calculate_total()
+        # ნივთებს და კერძებს ერთხელ ვტვირთავ იმეილისთვისაც და პასუხისთვისაც
+        OrderSerializer.prefetch([cart])
 
-        # ვაქცევთ შეკვეთად
-        cart.status = 'completed'
-        cart.save()
+        with transaction.atomic():
+            cart.calculate_total()
+
+            # ვაქცევთ შეკვეთად
+            cart.status = 'completed'
+            cart.save()
 
-        # იმეილის გაგზავნა
-        try:
             # ვქმნით შეკვეთის დეტალურ ტექსტს
             order_details = ""
             for item in cart.items.all():
@@ -263,20 +446,14 @@ class PlaceOrderView(APIView):
             if cart.coupon:
                 order_details += f"\nCoupon Applied: {cart.coupon.code} (-{cart.coupon.discount_percent}%)\n"
 
-            subject = f'Your Step Ordering Order #{cart.id} is Confirmed!'
-            message = f'Hi {request.user.username},\n\nYour order has been successfully placed.\n\n' \
-                      f'Order Summary:\n{order_details}\n' \
-                      f'Total Price: ${cart.total_price}\n\nThank you for your purchase!'
-
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
+            # იმეილი outbox-ში ჩაიწერება იმავე ტრანზაქციაში, რაც შეკვეთის დადასტურება
+            OutboundEmail.queue(
+                f'Your Step Ordering Order #{cart.id} is Confirmed!',
+                f'Hi {request.user.username},\n\nYour order has been successfully placed.\n\n'
+                f'Order Summary:\n{order_details}\n'
+                f'Total Price: ${cart.total_price}\n\nThank you for your purchase!',
                 [request.user.email],
-                fail_silently=False,
             )
-        except Exception as e:
-            print(f"Error sending order confirmation email: {e}")
 
         # ვაბრუნებთ დასრულებულ შეკვეთას
         serializer = OrderSerializer(cart)
@@ -284,8 +461,9 @@ class PlaceOrderView(APIView):
 
 # შეკვეთების ისტორია
 class OrderHistoryView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    read_from_replica = True
 
     def get(self, request, *args, **kwargs):
         # ვპოულობ ამ მომხმარებლის ყველა დასრულებულ შეკვეთას
@@ -294,12 +472,22 @@ class OrderHistoryView(APIView):
             status='completed'
         ).order_by('-created_at') # დავალაგოთ უახლესის მიხედვით
 
-        serializer = OrderSerializer(completed_orders, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if wants_cursor_pagination(request):
+            # ?pagination=cursor - ისტორია გვერდებად, ნაცვლად ყველა შეკვეთისა
+            paginator = OrderHistoryCursorPagination()
+            page = paginator.paginate_queryset(OrderSerializer.setup_eager_loading(completed_orders), request, view=self)
+            return paginator.get_paginated_response(OrderSerializer(page, many=True).data)
+
+        if compiled_serializers.enabled():
+            # ყველა შეკვეთა: ობიექტების ნაცვლად .values() სტრიქონებიდან
+            data = compiled_serializers.CompiledOrderSerializer().serialize(completed_orders)
+        else:
+            data = OrderSerializer(OrderSerializer.setup_eager_loading(completed_orders), many=True).data
+        return Response(data, status=status.HTTP_200_OK)
 
 # მომხმარებლის პროფილის მართვა
 class UserProfileView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     # GET: პროფილის მონაცემების ჩვენება
@@ -321,14 +509,25 @@ class UserProfileView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # რჩეული კერძების View
-class FeaturedDishListView(generics.ListAPIView):
-    queryset = Dish.objects.filter(is_featured=True)
+class FeaturedDishListView(MenuCacheMixin, generics.ListAPIView):
+    queryset = Dish.objects.filter(is_featured=True).select_related('category')
     serializer_class = DishSerializer
     permission_classes = (AllowAny,)
+    read_from_replica = True
+
+    def get_uncached_response(self, request, *args, **kwargs):
+        return Response(serialize_dishes(request, self.get_queryset()))
+
+
+def serialize_dishes(request, queryset):
+    # რჩეული კერძები featured-dishes/-ისთვის და bootstrap/-ისთვის; სურათების ბმულები აბსოლუტურია
+    if compiled_serializers.enabled():
+        return compiled_serializers.CompiledDishSerializer({'request': request}).serialize(queryset)
+    return DishSerializer(queryset, many=True, context={'request': request}).data
 
 # პაროლის შეცვლა
 class ChangePasswordView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
@@ -363,7 +562,7 @@ class ChangePasswordView(APIView):
 # შეფასების დამატება
 class ReviewCreateView(APIView):
 
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
@@ -402,7 +601,7 @@ class ReviewCreateView(APIView):
 
 # კუპონის გამოყენება
 class ApplyCouponView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
@@ -442,12 +641,13 @@ class ApplyCouponView(APIView):
         cart.calculate_total()
         cart.save()
 
+        OrderSerializer.prefetch([cart])
         serializer = OrderSerializer(cart)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 # კუპონის მოშორება
 class RemoveCouponView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
@@ -466,6 +666,7 @@ class RemoveCouponView(APIView):
         cart.calculate_total()
         cart.save()
 
+        OrderSerializer.prefetch([cart])
         serializer = OrderSerializer(cart)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -474,7 +675,7 @@ class RemoveCouponView(APIView):
 
 # ხელმისაწვდომი დროის ჩვენება
 class GetAvailabilityView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     # GET: აბრუნებს თავისუფალ/დაკავებულ სლოტებს
@@ -491,48 +692,60 @@ class GetAvailabilityView(APIView):
         except (ValueError, Table.DoesNotExist):
             return Response({"error": "Invalid date or table ID."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # ვპოულობ ამ დღის სამუშაო საათებს
-        try:
-            hours = OperatingHours.objects.get(weekday=date.weekday())
-            open_time = hours.open_time
-            close_time = hours.close_time
-        except OperatingHours.DoesNotExist:
+        engine = AvailabilityEngine(date, date, tables=[table])
+        if engine.days[0] is None:
             return Response({"error": "Restaurant is closed on this day."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # ვპოულობ ამ მაგიდის ყველა დადასტურებულ ჯავშანს ამ დღეს
-        reservations = Reservation.objects.filter(
-            table=table,
-            status='Confirmed',
-            start_time__date=date
-        ).values_list('start_time', 'end_time')
+        return Response(engine.slots(table.id, 0), status=status.HTTP_200_OK)
 
-        # 30 წუთიანი სლოტების გენერირება
-        slots = []
-        current_time = timezone.make_aware(datetime.datetime.combine(date, open_time))
-        end_datetime = timezone.make_aware(datetime.datetime.combine(date, close_time))
-
-        while current_time < end_datetime:
-            slot_time = current_time.time()
-            is_available = True
+# ხელმისაწვდომობა თარიღების დიაპაზონზე ყველა შესაფერისი მაგიდისთვის
+class AvailabilityRangeView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
 
-            # ვამოწმებ თითოეულ სლოტს, ხომ არ ემთხვევა რომელიმე ჯავშანს
-            for start, end in reservations:
-                # მომწდება თუ სლოტი არსებული ჯავშნის შიგნით ექცევა
-                if current_time >= start and current_time < end:
-                    is_available = False # ეს სლოტი დაკავებულია
-                    break
+    # GET: ?start=YYYY-MM-DD&end=YYYY-MM-DD&party_size=N
+    def get(self, request):
+        start_str = request.query_params.get('start')
+        end_str = request.query_params.get('end', start_str)
+        party_size = request.query_params.get('party_size')
 
-            if date == timezone.now().date() and current_time < timezone.now():
-                is_available = False
+        if not start_str:
+            return Response({"error": "Start date is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-            slots.append({"time": slot_time.strftime('%H:%M'), "available": is_available})
-            current_time += datetime.timedelta(minutes=30)
+        try:
+            start_date = datetime.datetime.strptime(start_str, '%Y-%m-%d').date()
+            end_date = datetime.datetime.strptime(end_str, '%Y-%m-%d').date()
+            party_size = int(party_size) if party_size else None
+        except ValueError:
+            return Response({"error": "Invalid date or party size."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if party_size is not None and party_size < 1:
+            return Response({"error": "Party size must be at least 1."}, status=status.HTTP_400_BAD_REQUEST)
+        if end_date < start_date:
+            return Response({"error": "End date must not be before start date."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end_date - start_date).days >= MAX_RANGE_DAYS:
+            return Response({"error": f"Date range cannot exceed {MAX_RANGE_DAYS} days."},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(slots, status=status.HTTP_200_OK)
+        engine = AvailabilityEngine(start_date, end_date, party_size=party_size)
+        return Response(engine.as_dict(), status=status.HTTP_200_OK)
+
+# ჯავშნის დადასტურების იმეილი outbox-ში (იძახება ჯავშნის ტრანზაქციის შიგნით)
+def queue_reservation_email(user, reservation):
+    OutboundEmail.queue(
+        f'Your Table Reservation is Confirmed! (ID: #{reservation.id})',
+        f'Hi {user.username},\n\nYour reservation is confirmed:\n\n'
+        f'Table: {reservation.table.name}\n'
+        f'Guests: {reservation.party_size}\n'
+        f'Date: {reservation.start_time.strftime("%Y-%m-%d")}\n'
+        f'Time: {reservation.start_time.strftime("%H:%M")} - {reservation.end_time.strftime("%H:%M")}\n\n'
+        f'We look forward to seeing you!',
+        [user.email],
+    )
 
 #  ჯავშნის შექმნა
 class CreateReservationView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     # POST: ქმნის ახალ ჯავშანს
@@ -548,14 +761,10 @@ class CreateReservationView(APIView):
         start_time_obj = data['start_time']  #
         end_time_obj = data['end_time_str']
 
-        # მაგიდის მოძებნა
-        try:
-            table = Table.objects.filter(capacity__gte=party_size, is_active=True).order_by('capacity').first()
-            if not table:
-                return Response({"error": f"Sorry, we do not have a table available for {party_size} guests."},
-                                status=status.HTTP_400_BAD_REQUEST)
-        except Table.DoesNotExist:
-            return Response({"error": "No tables found."}, status=status.HTTP_400_BAD_REQUEST)
+        # არსებობს თუ არა საერთოდ ამდენი სტუმრისთვის მაგიდა
+        if not fitting_tables(party_size).exists():
+            return Response({"error": f"Sorry, we do not have a table available for {party_size} guests."},
+                            status=status.HTTP_400_BAD_REQUEST)
 
         # ვალიდაცია: დროის შემოწმება
         try:
@@ -591,55 +800,28 @@ class CreateReservationView(APIView):
         except ValueError:
             return Response({"error": "Invalid time format."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # საბოლოო შემოწმება
-        conflicting_reservations = Reservation.objects.filter(
-            table=table,
-            status='Confirmed',
-            start_time__lt=end_datetime,
-            end_time__gt=start_datetime
-        ).exists()
+        # საბოლოო შემოწმება და ჯავშნის შექმნა ერთ ტრანზაქციაში, ყველა შესაფერის მაგიდაზე
+        try:
+            reservation = allocate_table(
+                request.user, party_size, start_datetime, end_datetime,
+                on_allocated=lambda reservation: queue_reservation_email(request.user, reservation)
+            )
+        except OperationalError:
+            return Response({"error": "The booking service is busy right now. Please try again."},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
-        if conflicting_reservations:
+        if reservation is None:
             return Response({
-                                "error": "Sorry, one or more time slots in your selected range were just booked by another user. Please refresh and try again."},
+                                "error": f"Sorry, every table for {party_size} guests is already booked during your selected time. Please refresh and choose another time."},
                             status=status.HTTP_409_CONFLICT)
 
-        # ვქმნით ჯავშანს
-        reservation = Reservation.objects.create(
-            user=request.user,
-            table=table,
-            party_size=party_size,
-            start_time=start_datetime,
-            end_time=end_datetime,
-            status='Confirmed'
-        )
-
-        # იმეილის გაგზავნა
-        try:
-            subject = f'Your Table Reservation is Confirmed! (ID: #{reservation.id})'
-            message = f'Hi {request.user.username},\n\nYour reservation is confirmed:\n\n' \
-                      f'Table: {reservation.table.name}\n' \
-                      f'Guests: {reservation.party_size}\n' \
-                      f'Date: {reservation.start_time.strftime("%Y-%m-%d")}\n' \
-                      f'Time: {reservation.start_time.strftime("%H:%M")} - {reservation.end_time.strftime("%H:%M")}\n\n' \
-                      f'We look forward to seeing you!'
-
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [request.user.email],
-                fail_silently=False,
-            )
-        except Exception as e:
-            print(f"Error sending reservation confirmation email: {e}")
-
         return Response(ReservationSerializer(reservation).data, status=status.HTTP_201_CREATED)
 
 # ჯავშნების ისტორია
 class ReservationHistoryView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    read_from_replica = True
 
     def get(self, request):
         now = timezone.now() # ვიღებ ამჟამინდელ დროს
@@ -660,15 +842,22 @@ class ReservationHistoryView(APIView):
             status='Cancelled'
         ).order_by('-start_time')
         # ვაბრუნებ ორ ცალკე სიას
-        data = {
-            "active": ReservationSerializer(active_reservations, many=True).data,
-            "past": ReservationSerializer(past_reservations, many=True).data
-        }
+        if compiled_serializers.enabled():
+            serializer = compiled_serializers.CompiledReservationSerializer()
+            data = {
+                "active": serializer.serialize(active_reservations),
+                "past": serializer.serialize(past_reservations)
+            }
+        else:
+            data = {
+                "active": ReservationSerializer(active_reservations.select_related('table'), many=True).data,
+                "past": ReservationSerializer(past_reservations.select_related('table'), many=True).data
+            }
         return Response(data, status=status.HTTP_200_OK)
 
 # ჯავშნის გაუქმება
 class CancelReservationView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, pk): # pk არის ჯავშნის ID, რომელიც URL-დან მოდის
@@ -689,3 +878,115 @@ class CancelReservationView(APIView):
         reservation.save()
 
         return Response(ReservationSerializer(reservation).data, status=status.HTTP_200_OK)
+
+# მოთხოვნების მეტრიკები view-ების მიხედვით (RequestMetricsMiddleware), მხოლოდ ადმინისთვის
+# მონაცემები ამ პროცესისაა: რამდენიმე worker-ის შემთხვევაში თითოეულს თავისი აქვს
+class MetricsView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response({"views": metrics.snapshot()}, status=status.HTTP_200_OK)
+
+    # DELETE: მთვლელების განულება
+    def delete(self, request, *args, **kwargs):
+        metrics.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# მთავარი და მენიუს გვერდების ყველა საწყისი მონაცემი ერთი მოთხოვნით: კატეგორიები, რჩეული კერძები,
+# კერძების პირველი გვერდი, კალათა და პროფილი (ხუთი ცალკე მოთხოვნისა და ავტორიზაციის ნაცვლად)
+# საჯარო ნაწილი მენიუს ვერსიით ქეშირდება, მომხმარებლის ნაწილები კი thread pool-ში პარალელურად ითვლება
+class BootstrapView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = (AllowAny,)
+    read_from_replica = True
+
+    def get(self, request, *args, **kwargs):
+        user_parts = {}
+        if request.user.is_authenticated:
+            user_parts = {
+                'cart': run_concurrently(request, get_cart_data, request.user),
+                'profile': run_concurrently(request, get_profile_data, request.user),
+            }
+
+        data = {**self.get_public_data(request), 'cart': None, 'profile': None}
+        for name, part in user_parts.items():
+            data[name] = part.result()
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_public_data(self, request):
+        version = get_menu_version()
+        # ჰოსტი საჭიროა, რადგან next და სურათების ბმულები აბსოლუტურია
+        digest = hashlib.md5(request.get_host().encode('utf-8')).hexdigest()
+        cache_key = f"menu:{version}:bootstrap:{digest}"
+        data = cache.get(cache_key)
+        if data is None:
+            if read_alias.get() and not replica_has_caught_up(cache.get(MENU_CHANGED_AT_KEY)):
+                read_alias.set(None)
+            data = {
+                'categories': DishCategorySerializer(DishCategory.objects.all(), many=True).data,
+                'featured_dishes': serialize_dishes(request, FeaturedDishListView.queryset.all()),
+                'dishes': self.get_first_dish_page(request),
+            }
+            cache.set(cache_key, data, settings.MENU_CACHE_TIMEOUT)
+        return data
+
+    def get_first_dish_page(self, request):
+        # იგივე, რასაც GET dishes/ ფილტრების გარეშე აბრუნებს
+        index = get_menu_index()
+        rows = index.search({})
+        page_size = DishPagination.page_size
+        next_url = None
+        if len(rows) > page_size:
+            next_url = replace_query_param(request.build_absolute_uri(reverse('dish-list')), 'page', 2)
+        return {
+            'count': len(rows),
+            'next': next_url,
+            'previous': None,
+            'results': absolute_image_urls(request, rows[:page_size]),
+            'facets': index.facet_counts({}),
+        }
+
+
+def get_profile_data(user):
+    # UserProfileView.get-ისგან განსხვავებით პროფილს არ ვქმნი (GET რეპლიკიდან კითხულობს),
+    # შეუნახავი პროფილი კი იგივე ცარიელ ველებს აბრუნებს
+    profile = UserProfile.objects.select_related('user').filter(user=user).first() or UserProfile(user=user)
+    return UserProfileSerializer(profile).data
+
+
+_bootstrap_executor = None
+_bootstrap_executor_lock = threading.Lock()
+
+
+def get_bootstrap_executor():
+    global _bootstrap_executor
+    if _bootstrap_executor is None:
+        with _bootstrap_executor_lock:
+            if _bootstrap_executor is None:
+                _bootstrap_executor = ThreadPoolExecutor(
+                    max_workers=settings.BOOTSTRAP_WORKERS,
+                    thread_name_prefix='bootstrap',
+                )
+    return _bootstrap_executor
+
+
+def run_concurrently(request, func, *args):
+    # BOOTSTRAP_WORKERS = 0: იმავე ნაკადში (მაგ. TestCase-ის ტრანზაქციაში სხვა ნაკადი მონაცემებს ვერ ხედავს)
+    if not settings.BOOTSTRAP_WORKERS:
+        future = Future()
+        future.set_result(func(*args))
+        return future
+    # contextvars-ის ასლი, რომ ნაკადმაც იგივე რეპლიკა (read_alias) და მეტრიკები გამოიყენოს
+    context = contextvars.copy_context()
+    return get_bootstrap_executor().submit(context.run, run_in_worker, request, func, *args)
+
+
+def run_in_worker(request, func, *args):
+    # query-ები ამ მოთხოვნის მეტრიკებში ითვლება (metrics.current კონტექსტთან ერთად გადმოვიდა);
+    # ბოლოს კავშირს ვხურავ, როგორც მოთხოვნის დასრულებისას
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
@@ -0,0 +1,163 @@
+"""
+Concurrent cart read/write throughput for each database profile (config/database.py).
+
+    python benchmarks/db_profiles.py
+    python benchmarks/db_profiles.py --threads 16 --duration 10 --write-ratio 0.3
+    python benchmarks/db_profiles.py --profiles sqlite postgres   # postgres uses DB_* variables
+
+Every profile runs in its own process on a throwaway database (Django's test database:
+a temporary file for SQLite, test_<DB_NAME> for PostgreSQL). Each thread is one user
+who keeps reading the cart (GET /api/cart/) and sometimes adds a dish (POST /api/cart/).
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def run_profile(options):
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    import django
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from rest_framework.authtoken.models import Token
+
+    from api.models import Dish, DishCategory
+
+    setup_test_environment()
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['TEST']['NAME'] = str(Path(options.tmpdir) / 'benchmark.sqlite3')
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+    try:
+        category = DishCategory.objects.create(name='Benchmark')
+        dishes = [Dish.objects.create(category=category, name=f'Dish {i}', price=5 + i) for i in range(20)]
+        tokens = []
+        for i in range(options.threads):
+            user = User.objects.create(username=f'bench{i}', email=f'bench{i}@example.com')
+            tokens.append(Token.objects.create(user=user).key)
+        connection.close()
+
+        stop = threading.Event()
+        barrier = threading.Barrier(options.threads + 1)
+        lock = threading.Lock()
+        totals = {'reads': 0, 'writes': 0, 'errors': 0}
+        latencies = []
+
+        def worker(token, seed):
+            rng = random.Random(seed)
+            client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+            reads = writes = errors = 0
+            local_latencies = []
+            barrier.wait()
+            try:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        if rng.random() < options.write_ratio:
+                            response = client.post('/api/cart/', {'dish_id': rng.choice(dishes).id},
+                                                   content_type='application/json')
+                            writes += 1
+                        else:
+                            response = client.get('/api/cart/')
+                            reads += 1
+                        if response.status_code >= 500:
+                            errors += 1
+                    except Exception:
+                        errors += 1
+                    local_latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+            with lock:
+                totals['reads'] += reads
+                totals['writes'] += writes
+                totals['errors'] += errors
+                latencies.extend(local_latencies)
+
+        threads = [threading.Thread(target=worker, args=(token, i)) for i, token in enumerate(tokens)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        time.sleep(options.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 2) if latencies else None
+
+        return {
+            'profile': os.environ.get('DB_PROFILE', 'sqlite'),
+            'vendor': connection.vendor,
+            'threads': options.threads,
+            'seconds': round(elapsed, 2),
+            'reads_per_second': round(totals['reads'] / elapsed, 1),
+            'writes_per_second': round(totals['writes'] / elapsed, 1),
+            'errors': totals['errors'],
+            'p50_ms': percentile(0.50),
+            'p99_ms': percentile(0.99),
+        }
+    finally:
+        connection.creation.destroy_test_db(connection.settings_dict['NAME'], verbosity=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=['sqlite-basic', 'sqlite'])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--json', help="Also write the results to this file.")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--tmpdir', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.child:
+        print(json.dumps(run_profile(options)))
+        return
+
+    results = []
+    for profile in options.profiles:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = dict(os.environ, DB_PROFILE=profile)
+            command = [
+                sys.executable, __file__, '--child', '--tmpdir', tmpdir,
+                '--threads', str(options.threads),
+                '--duration', str(options.duration),
+                '--write-ratio', str(options.write_ratio),
+            ]
+            completed = subprocess.run(command, env=env, capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(f"{profile}: failed\n{completed.stderr.strip()}", file=sys.stderr)
+                continue
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    columns = ['profile', 'threads', 'reads_per_second', 'writes_per_second', 'errors', 'p50_ms', 'p99_ms']
+    print('  '.join(f'{column:>17}' for column in columns))
+    for result in results:
+        print('  '.join(f'{str(result[column]):>17}' for column in columns))
+
+    if options.json:
+        Path(options.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
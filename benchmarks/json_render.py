@@ -0,0 +1,129 @@
+"""
+JSON rendering cost and bytes on the wire for the large API payloads.
+
+    python benchmarks/json_render.py
+    python benchmarks/json_render.py --dishes 1000 --orders 500 --repeat 50 --json render.json
+
+Seeds a throwaway test database (manage.py seed_benchmark_data), fetches the menu page,
+the whole menu (the in-memory index rows), the order history and the reservation history,
+and then renders each payload with DRF's JSONRenderer (stdlib json) and with
+api.renderers.FastJSONRenderer (orjson), and parses it back with both parsers. Sizes are
+reported raw, gzip-compressed and, when the brotli package is installed, brotli-compressed
+(what api.middleware.CompressionMiddleware sends).
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def best_of(repeat, function, *args):
+    # ყველაზე სწრაფი გაშვება: ნაკლებად არის დამოკიდებული სხვა პროცესებზე
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) * 1000, 3)
+
+
+def collect_payloads(options):
+    from django.core.management import call_command
+    from django.test import Client
+    from rest_framework.authtoken.models import Token
+
+    from api.menu_index import get_menu_index
+
+    call_command(
+        'seed_benchmark_data', stdout=io.StringIO(),
+        dishes=options.dishes, users=1, orders_per_user=options.orders, reviews=options.dishes // 2,
+        reservations=options.orders,
+    )
+    client = Client(HTTP_AUTHORIZATION=f'Token {Token.objects.get().key}')
+    return {
+        'menu_page': client.get('/api/dishes/?page_size=100').data,
+        'menu_full': get_menu_index().rows,
+        'order_history': client.get('/api/orders/history/').data,
+        'reservation_history': client.get('/api/reservations/history/').data,
+    }
+
+
+def run(options):
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from django.utils.text import compress_string
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from api.middleware import brotli
+    from api.parsers import FastJSONParser
+    from api.renderers import FastJSONRenderer, orjson
+
+    if orjson is None:
+        raise SystemExit("orjson is not installed: FastJSONRenderer falls back to stdlib json.")
+
+    setup_test_environment()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = str(Path(tmpdir) / 'render.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            payloads = collect_payloads(options)
+        finally:
+            connection.creation.destroy_test_db(connection.settings_dict['NAME'], verbosity=0)
+
+    results = []
+    for name, data in payloads.items():
+        stdlib_bytes = JSONRenderer().render(data)
+        fast_bytes = FastJSONRenderer().render(data)
+        if stdlib_bytes != fast_bytes:
+            raise SystemExit(f"{name}: FastJSONRenderer output differs from JSONRenderer.")
+        results.append({
+            'payload': name,
+            'bytes': len(fast_bytes),
+            'gzip_bytes': len(compress_string(fast_bytes)),
+            'brotli_bytes': len(brotli.compress(fast_bytes, quality=5)) if brotli else None,
+            'render_stdlib_ms': best_of(options.repeat, JSONRenderer().render, data),
+            'render_orjson_ms': best_of(options.repeat, FastJSONRenderer().render, data),
+            'parse_stdlib_ms': best_of(options.repeat, lambda: JSONParser().parse(io.BytesIO(fast_bytes))),
+            'parse_orjson_ms': best_of(options.repeat, lambda: FastJSONParser().parse(io.BytesIO(fast_bytes))),
+            'gzip_ms': best_of(options.repeat, compress_string, fast_bytes),
+            'brotli_ms': best_of(options.repeat, lambda: brotli.compress(fast_bytes, quality=5)) if brotli else None,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dishes', type=int, default=500)
+    parser.add_argument('--orders', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', help="Also write the results to this file.")
+    options = parser.parse_args()
+
+    results = run(options)
+
+    columns = ['payload', 'bytes', 'gzip_bytes', 'brotli_bytes', 'render_stdlib_ms', 'render_orjson_ms',
+               'parse_stdlib_ms', 'parse_orjson_ms', 'gzip_ms', 'brotli_ms']
+    print('  '.join(f'{column:>19}' for column in columns))
+    for result in results:
+        print('  '.join(f'{str(result[column]):>19}' for column in columns))
+
+    if options.json:
+        Path(options.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
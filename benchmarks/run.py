@@ -0,0 +1,290 @@
+"""
+Drives the real API endpoints of a running server with concurrent clients.
+
+    python manage.py seed_benchmark_data --flush
+    python manage.py runserver --noreload          # or gunicorn/uvicorn, DEBUG=False
+    python benchmarks/run.py --clients 16 --duration 30 --output results.json
+    python benchmarks/run.py --output new.json --compare results.json
+
+Every client logs in as one of the seeded users (<prefix>_user_<n>) and keeps picking a
+weighted scenario: page bootstrap, menu list with filters/search/cursor, cart add and get, checkout,
+availability and order/reservation history. Latency percentiles (p50/p95/p99) and
+requests per second are reported per scenario and in total; --output writes them as
+JSON so that two releases can be diffed (--compare prints the change in p95 and RPS).
+"""
+import argparse
+import datetime
+import http.client
+import json
+import random
+import subprocess
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    'bootstrap': 10,
+    'menu': 30,
+    'menu_filtered': 15,
+    'menu_search': 5,
+    'menu_cursor': 5,
+    'featured': 5,
+    'cart_add': 10,
+    'cart_get': 10,
+    'checkout': 3,
+    'availability': 7,
+    'order_history': 5,
+    'reservation_history': 5,
+}
+
+
+class Client:
+
+    def __init__(self, base_url, timeout, keep_alive=False):
+        self.keep_alive = keep_alive
+        url = urllib.parse.urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(url.netloc, timeout=timeout)
+        self.prefix = url.path.rstrip('/')
+        self.headers = {'Accept': 'application/json'}
+
+    def request(self, method, path, data=None, compressed=True):
+        # ბრაუზერის მსგავსად შეკუმშულ პასუხს ვითხოვ; ტანს მხოლოდ ვკითხულობ, არ ვშლი
+        body = json.dumps(data) if data is not None else None
+        headers = dict(self.headers)
+        if compressed:
+            headers['Accept-Encoding'] = 'gzip, br'
+        if body:
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+        except (http.client.HTTPException, OSError):
+            # სერვერმა კავშირი დახურა (HTTP/1.0): ერთხელ ვცდი თავიდან
+            self.connection.close()
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+        if not self.keep_alive or response.getheader('Connection', '').lower() == 'close':
+            self.connection.close()
+        return response.status, payload
+
+    def json(self, method, path, data=None):
+        status, payload = self.request(method, path, data, compressed=False)
+        return status, json.loads(payload) if payload else None
+
+
+class Worker(threading.Thread):
+
+    def __init__(self, number, options, catalog, stop, barrier):
+        super().__init__(daemon=True)
+        self.options = options
+        self.catalog = catalog
+        self.stop = stop
+        self.barrier = barrier
+        self.rng = random.Random(options.seed + number)
+        self.client = Client(options.base_url, options.timeout, options.keep_alive)
+        self.email = f'{options.prefix}_user_{number}@example.com'
+        self.samples = {}
+        self.errors = {}
+        self.measuring = False
+
+    def login(self):
+        self.client.headers.pop('Authorization', None)
+        status, body = self.client.json('POST', '/api/login/', {'email': self.email, 'password': self.options.password})
+        if status != 200:
+            raise SystemExit(f"Login failed for {self.email} ({status}). Run `manage.py seed_benchmark_data` first.")
+        self.client.headers['Authorization'] = f"Token {body['token']}"
+
+    def timed(self, name, method, path, data=None):
+        started = time.perf_counter()
+        try:
+            status = self.client.request(method, path, data)[0]
+        except (http.client.HTTPException, OSError):
+            status = None
+        elapsed = time.perf_counter() - started
+        if self.measuring:
+            self.samples.setdefault(name, []).append(elapsed)
+            if status is None or status >= 400:
+                self.errors[name] = self.errors.get(name, 0) + 1
+        return status
+
+    def run(self):
+        self.login()
+        names, weights = zip(*SCENARIOS.items())
+        self.barrier.wait()
+        while not self.stop.is_set():
+            self.measuring = self.catalog['measuring'].is_set()
+            getattr(self, 'scenario_' + self.rng.choices(names, weights)[0])()
+
+    def scenario_bootstrap(self):
+        self.timed('bootstrap', 'GET', '/api/bootstrap/')
+
+    def scenario_menu(self):
+        self.timed('menu', 'GET', '/api/dishes/')
+
+    def scenario_menu_filtered(self):
+        params = {'category': self.rng.choice(self.catalog['categories'])}
+        if self.rng.random() < 0.5:
+            params['spiciness'] = self.rng.randint(0, 4)
+        if self.rng.random() < 0.3:
+            params['is_vegetarian'] = 'true'
+        self.timed('menu_filtered', 'GET', '/api/dishes/?' + urllib.parse.urlencode(params))
+
+    def scenario_menu_search(self):
+        term = self.rng.choice(['salad', 'soup', 'khachapuri', 'chicken', 'spicy', 'garlic'])
+        self.timed('menu_search', 'GET', f'/api/dishes/?search={term}')
+
+    def scenario_menu_cursor(self):
+        self.timed('menu_cursor', 'GET', '/api/dishes/?pagination=cursor')
+
+    def scenario_featured(self):
+        self.timed('featured', 'GET', '/api/featured-dishes/')
+
+    def scenario_cart_add(self):
+        self.timed('cart_add', 'POST', '/api/cart/', {'dish_id': self.rng.choice(self.catalog['dishes'])})
+
+    def scenario_cart_get(self):
+        self.timed('cart_get', 'GET', '/api/cart/')
+
+    def scenario_checkout(self):
+        # შეკვეთას ცარიელი კალათა არ შეიძლება ჰქონდეს: დამატება ცალკე ითვლება cart_add-ში
+        self.timed('cart_add', 'POST', '/api/cart/', {'dish_id': self.rng.choice(self.catalog['dishes'])})
+        self.timed('checkout', 'POST', '/api/orders/place/')
+
+    def scenario_availability(self):
+        start = datetime.date.today() + datetime.timedelta(days=self.rng.randint(0, 7))
+        end = start + datetime.timedelta(days=self.rng.choice([0, 0, 6]))
+        params = {'start': start.isoformat(), 'end': end.isoformat(), 'party_size': self.rng.randint(1, 6)}
+        self.timed('availability', 'GET', '/api/reservations/availability/range/?' + urllib.parse.urlencode(params))
+
+    def scenario_order_history(self):
+        self.timed('order_history', 'GET', '/api/orders/history/')
+
+    def scenario_reservation_history(self):
+        self.timed('reservation_history', 'GET', '/api/reservations/history/')
+
+
+def percentile(values, p):
+    return round(values[min(len(values) - 1, int(len(values) * p))] * 1000, 2)
+
+
+def summarize(samples, errors, elapsed):
+    values = sorted(samples)
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'rps': round(len(values) / elapsed, 1),
+        'mean_ms': round(sum(values) / len(values) * 1000, 2),
+        'p50_ms': percentile(values, 0.50),
+        'p95_ms': percentile(values, 0.95),
+        'p99_ms': percentile(values, 0.99),
+        'max_ms': round(values[-1] * 1000, 2),
+    }
+
+
+def load_catalog(options):
+    client = Client(options.base_url, options.timeout)
+    status, categories = client.json('GET', '/api/categories/')
+    if status != 200:
+        raise SystemExit(f"GET /api/categories/ returned {status}; is the server running at {options.base_url}?")
+    categories = categories['results'] if isinstance(categories, dict) else categories
+    _, dishes = client.json('GET', '/api/dishes/')
+    dishes = dishes['results'] if isinstance(dishes, dict) else dishes
+    return {
+        'categories': [category['slug'] for category in categories],
+        'dishes': [dish['id'] for dish in dishes],
+        'measuring': threading.Event(),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    print(f"\n{'scenario':>20}  {'p95 before':>10}  {'p95 after':>10}  {'change':>8}  {'rps before':>10}  {'rps after':>10}")
+    for name, row in results['scenarios'].items():
+        before = previous['scenarios'].get(name)
+        if not before:
+            continue
+        change = (row['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+        print(f"{name:>20}  {before['p95_ms']:>10}  {row['p95_ms']:>10}  {change:>+7.1f}%  {before['rps']:>10}  {row['rps']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--warmup', type=float, default=3.0, help="Seconds of traffic before measuring starts.")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--keep-alive', action='store_true',
+                        help="Reuse connections. Not with runserver: without TCP_NODELAY every response waits ~40ms.")
+    parser.add_argument('--prefix', default='bench')
+    parser.add_argument('--password', default='benchmark-password')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Write the results to this JSON file.")
+    parser.add_argument('--compare', help="Earlier JSON results to compare against.")
+    options = parser.parse_args()
+
+    catalog = load_catalog(options)
+    if not catalog['dishes']:
+        raise SystemExit("The menu is empty. Run `manage.py seed_benchmark_data` first.")
+
+    stop = threading.Event()
+    barrier = threading.Barrier(options.clients + 1)
+    workers = [Worker(number, options, catalog, stop, barrier) for number in range(options.clients)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    time.sleep(options.warmup)
+    catalog['measuring'].set()
+    started = time.perf_counter()
+    time.sleep(options.duration)
+    stop.set()
+    elapsed = time.perf_counter() - started
+    for worker in workers:
+        worker.join()
+
+    samples, errors = {}, {}
+    for worker in workers:
+        for name, values in worker.samples.items():
+            samples.setdefault(name, []).extend(values)
+        for name, count in worker.errors.items():
+            errors[name] = errors.get(name, 0) + count
+
+    results = {
+        'meta': {
+            'base_url': options.base_url,
+            'clients': options.clients,
+            'keep_alive': options.keep_alive,
+            'duration': round(elapsed, 2),
+            'revision': git_revision(),
+            'started_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        },
+        'scenarios': {name: summarize(samples[name], errors.get(name, 0), elapsed) for name in SCENARIOS if name in samples},
+        'total': summarize([value for values in samples.values() for value in values], sum(errors.values()), elapsed),
+    }
+
+    columns = ['requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+    print(f"{'scenario':>20}  " + '  '.join(f'{column:>9}' for column in columns))
+    for name, row in [*results['scenarios'].items(), ('total', results['total'])]:
+        print(f"{name:>20}  " + '  '.join(f'{str(row[column]):>9}' for column in columns))
+
+    if options.output:
+        Path(options.output).write_text(json.dumps(results, indent=2))
+    if options.compare:
+        compare(results, json.loads(Path(options.compare).read_text()))
+
+
+if __name__ == '__main__':
+    main()
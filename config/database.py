@@ -0,0 +1,103 @@
+import copy
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+# მონაცემთა ბაზის პროფილები settings.DATABASES-ისთვის, გარემოს ცვლადებით (DB_PROFILE და ა.შ.)
+#
+#   sqlite        - ნაგულისხმევი: WAL, synchronous=NORMAL, busy timeout, mmap, მუდმივი კავშირები
+#   sqlite-basic  - Django-ს სტანდარტული SQLite (შედარებისთვის, benchmarks/db_profiles.py)
+#   postgres      - PostgreSQL კავშირების pool-ით (საჭიროა psycopg[pool])
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def sqlite_basic(base_dir):
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DB_NAME') or base_dir / 'db.sqlite3',
+    }
+
+
+def sqlite(base_dir):
+    # WAL-ში მკითხველები მწერალს არ ელოდებიან; synchronous=NORMAL WAL-თან უსაფრთხოა
+    # (ელექტროობის გათიშვისას შეიძლება დაიკარგოს მხოლოდ ბოლო commit-ები, ბაზა არ ზიანდება)
+    pragmas = [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f"PRAGMA mmap_size={env_int('SQLITE_MMAP_SIZE', 128 * 1024 * 1024)}",
+        f"PRAGMA cache_size=-{env_int('SQLITE_CACHE_SIZE_KB', 20000)}",
+        'PRAGMA temp_store=MEMORY',
+    ]
+    config = sqlite_basic(base_dir)
+    config.update({
+        'CONN_MAX_AGE': env_int('DB_CONN_MAX_AGE', 600),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(pragmas),
+            # busy timeout წამებში: ჩაწერის ბლოკის მოლოდინი, სანამ "database is locked" შეცდომა ამოვარდება
+            'timeout': env_int('SQLITE_TIMEOUT', 20),
+            # ჩაწერის ბლოკს ტრანზაქციის დასაწყისშივე ვიღებ, რომ SHARED -> RESERVED გადასვლაზე
+            # ორი ტრანზაქცია ერთმანეთს არ დაეჯახოს (ასეთ დროს busy timeout არ მუშაობს)
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+    return config
+
+
+def postgres(base_dir):
+    # Django-ს ჩაშენებული pool (psycopg 3); pool-თან ერთად CONN_MAX_AGE უნდა იყოს 0
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('DB_NAME', 'step_ordering'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pool': {
+                'min_size': env_int('DB_POOL_MIN_SIZE', 2),
+                'max_size': env_int('DB_POOL_MAX_SIZE', 10),
+                'timeout': env_int('DB_POOL_TIMEOUT', 10),
+            },
+        },
+    }
+
+
+PROFILES = {
+    'sqlite': sqlite,
+    'sqlite-basic': sqlite_basic,
+    'postgres': postgres,
+}
+
+
+def database_config(base_dir, profile=None):
+    profile = profile or os.environ.get('DB_PROFILE', 'sqlite')
+    try:
+        return PROFILES[profile](base_dir)
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown DB_PROFILE '{profile}'. Choose one of: {', '.join(PROFILES)}.")
+
+
+# read replica-ები DB_REPLICAS-იდან (მძიმით გამოყოფილი): SQLite-ისთვის ფაილის ბილიკები,
+# PostgreSQL-ისთვის host[:port]. დანარჩენი პარამეტრები primary-სგან მემკვიდრეობით მოდის.
+# ტესტებში რეპლიკა primary-ის სატესტო ბაზის სარკეა (TEST MIRROR).
+def replica_databases(primary):
+    entries = [entry.strip() for entry in os.environ.get('DB_REPLICAS', '').split(',') if entry.strip()]
+    replicas = {}
+    for number, entry in enumerate(entries, start=1):
+        config = copy.deepcopy(primary)
+        if config['ENGINE'] == 'django.db.backends.sqlite3':
+            config['NAME'] = entry
+        else:
+            host, _, port = entry.partition(':')
+            config['HOST'] = host
+            config['PORT'] = port or config.get('PORT', '')
+        config['TEST'] = {'MIRROR': 'default'}
+        replicas[f'replica{number}'] = config
+    return replicas
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from .database import database_config, replica_databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,10 +47,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.RequestMetricsMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -76,11 +81,22 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# პროფილი აირჩევა DB_PROFILE გარემოს ცვლადით (sqlite / sqlite-basic / postgres), იხ. config/database.py
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(BASE_DIR),
+}
+DATABASES.update(replica_databases(DATABASES['default']))
+
+# read_from_replica = True view-ების GET მოთხოვნები რეპლიკებზე (api/routers.py, api/middleware.py)
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+READ_REPLICAS = {
+    'ALIASES': [alias for alias in DATABASES if alias != 'default'],
+    # რეპლიკაზე heartbeat-ის მაქსიმალური ასაკი წამებში; უფრო ძველი = ჩამორჩება, ვკითხულობ primary-დან
+    'MAX_LAG': 10,
+    'HEALTH_CHECK_INTERVAL': 5,
+    # ცვლილების შემდეგ რამდენი წამი რჩება კლიენტი primary-ზე (read-your-writes)
+    'STICKY_SECONDS': 15,
 }
 
 
@@ -134,5 +150,88 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# რამდენი პროცესი ამზადებს კერძების სურათების შემცირებულ ვარიანტებს
+IMAGE_DERIVATIVE_WORKERS = 2
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# LocMemCache თითო პროცესისთვის ცალკეა. რამდენიმე worker-ის შემთხვევაში აქ უნდა მიეთითოს
+# საერთო backend (Redis/Memcached), რომ მენიუს ვერსია ყველა პროცესმა ერთნაირად დაინახოს.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'step-ordering',
+    }
+}
+
+# მენიუს ქეშირებული გვერდების სიცოცხლის ხანგრძლივობა (წამებში)
+MENU_CACHE_TIMEOUT = 60 * 60 * 24
+
+# მენიუს ინდექსი, რჩეული კერძები და ისტორიები .values()-ზე აგებული სერიალიზატორებით (api/compiled_serializers.py)
+# False აბრუნებს DRF-ის სერიალიზატორებს; პასუხი ორივე შემთხვევაში ერთნაირია
+COMPILED_SERIALIZERS = True
+
+# Token -> User ქეში (api/authentication.py)
+# BACKEND: None - თითო პროცესის LRU; ან CACHES-ის alias, რომ რამდენიმე worker-მა ერთი ქეში გამოიყენოს.
+# რამდენიმე worker-ით გაშვებისას საერთო alias (მაგ. Redis) აუცილებელია: BACKEND=None-ისას გასვლა, პაროლის შეცვლა
+# და დეაქტივაცია ქეშს მხოლოდ იმ worker-ში ასუფთავებს, რომელმაც მოთხოვნა დაამუშავა, სხვებში კი ტოკენი
+# TTL-მდე მოქმედებს.
+# ქეში სიგნალებით უქმდება (api/signals.py): User.save()/delete() და Token.delete(). QuerySet.update()
+# (მაგ. User.objects.filter(...).update(is_active=False)) სიგნალებს არ იძახებს, ამიტომ ასეთი
+# ცვლილება ქეშირებულ მომხმარებლებზე TTL წამამდე არ აისახება; ამის შემდეგ token_cache.invalidate_user()
+# ხელით უნდა გამოიძახოთ.
+TOKEN_AUTH_CACHE = {
+    'BACKEND': None,
+    'MAX_SIZE': 1024,
+    'TTL': 300,
+}
+
+# GET /api/bootstrap/: კალათის და პროფილის პარალელურად წაკითხვის thread pool-ის ზომა (0 - იმავე ნაკადში)
+BOOTSTRAP_WORKERS = 4
+
+# async ლოგინის/რეგისტრაციისას პაროლის ჰეშირების thread pool-ის ზომა
+PASSWORD_HASHER_WORKERS = 4
+
+# მოთხოვნების მეტრიკები (api/middleware.py): Server-Timing ჰედერი და GET /api/metrics/ (მხოლოდ ადმინისთვის)
+# QUERY_BUDGETS: view-ის (ან "View.METHOD") query-ების მაქსიმუმი ერთ მოთხოვნაზე, ავტორიზაციის ჩათვლით.
+# გადაჭარბება ლოგში warning-ია, STRICT_BUDGETS-ით კი შეცდომა (ტესტები მას override_settings-ით რთავენ).
+API_METRICS = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'STRICT_BUDGETS': False,
+    'QUERY_BUDGETS': {
+        'DishCategoryListAPIView': 2,
+        'DishListAPIView': 3,
+        'FeaturedDishListView': 3,
+        'CartView.GET': 5,
+        'OrderHistoryView': 5,
+        'ReservationHistoryView': 5,
+        'GetAvailabilityView': 5,
+        'AvailabilityRangeView': 5,
+        'UserProfileView.GET': 4,
+        'BootstrapView': 9,
+    },
+}
+
+# API-ს JSON orjson-ით (api/renderers.py, api/parsers.py); orjson-ის გარეშე DRF-ის სტანდარტული json
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# პასუხების შეკუმშვა (api/middleware.py): brotli, თუ დაყენებულია, თორემ gzip; MIN_SIZE ბაიტზე პატარა პასუხები არ იკუმშება
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'BROTLI_QUALITY': 5,
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'no-reply@stepordering.com'
\ No newline at end of file
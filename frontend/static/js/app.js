@@ -16,6 +16,15 @@ document.addEventListener('DOMContentLoaded', () => {
     }
     const csrftoken = getCookie('csrftoken');
 
+    // კერძის სურათის ტეგი: თუ სერვერმა შემცირებული ვარიანტები დააბრუნა, ბრაუზერი თავად ირჩევს
+    // საჭირო ზომას (srcset/sizes) და WebP-ს, თუ მას უჭერს მხარს
+    window.dishImageTag = function(imageUrl, imageSrcset, sizes, attributes) {
+        const srcsetAttributes = imageSrcset ? ` srcset="${imageSrcset.srcset}" sizes="${sizes}"` : '';
+        const img = `<img src="${imageUrl}" ${attributes}${srcsetAttributes}>`;
+        if (!imageSrcset) return img;
+        return `<picture style="display: contents"><source type="image/webp" srcset="${imageSrcset.webp}" sizes="${sizes}">${img}</picture>`;
+    }
+
 
     const alertModalElement = document.getElementById('globalAlertModal');
     const bsAlertModal = new bootstrap.Modal(alertModalElement);
@@ -36,6 +45,25 @@ document.addEventListener('DOMContentLoaded', () => {
         userLinks.forEach(link => link.style.display = 'none');
     }
 
+    // მთავარი და მენიუს გვერდების საწყისი მონაცემები ერთი მოთხოვნით: კატეგორიები, რჩეული კერძები,
+    // კერძების პირველი გვერდი, კალათა და პროფილი. პასუხი ერთხელ მოდის და ყველა სკრიპტი მას იზიარებს
+    let bootstrapPromise = null;
+    window.fetchBootstrap = function() {
+        if (!bootstrapPromise) {
+            const headers = token ? { 'Authorization': `Token ${token}` } : {};
+            bootstrapPromise = fetch('/api/bootstrap/', { headers })
+                .then(response => {
+                    if (!response.ok) throw new Error('Network response was not ok');
+                    return response.json();
+                })
+                .then(data => {
+                    if (data.profile) localStorage.setItem('username', data.profile.username);
+                    return data;
+                });
+        }
+        return bootstrapPromise;
+    }
+
     // ლოგაუთის ლოგიკა
     const logoutButton = document.getElementById('logout-button');
     if (logoutButton) {
@@ -148,7 +148,7 @@ document.addEventListener('DOMContentLoaded', () => {
         row.innerHTML = `
             <div class="cart-col product">
                 <button class="btn-remove-item" title="Remove item">&times;</button>
-                <img src="${imageUrl}" alt="${item.dish_name}">
+                ${dishImageTag(imageUrl, item.dish_image_srcset, '60px', `alt="${item.dish_name}"`)}
                 <span>${item.dish_name}</span>
             </div>
             <div class="cart-col qty">
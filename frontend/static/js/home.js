@@ -16,19 +16,34 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     const featuredContainer = document.getElementById('featured-dishes-container');
+    const cartCountElement = document.getElementById('cart-count');
     const API_FEATURED_URL = '/api/featured-dishes/';
 
     const csrftoken = getCookie('csrftoken');
 
+    // რჩეული კერძები bootstrap-იდან (იქვე მოდის კალათაც); თუ ის ვერ ჩაიტვირთა, ცალკე მოთხოვნით
+    async function loadFeaturedDishes() {
+        try {
+            const data = await fetchBootstrap();
+            if (data.cart && cartCountElement) {
+                cartCountElement.textContent = data.cart.items.reduce((sum, item) => sum + item.quantity, 0);
+            }
+            return data.featured_dishes;
+        } catch (error) {
+            console.error('Error fetching bootstrap data:', error);
+        }
+
+        const response = await fetch(API_FEATURED_URL);
+        if (!response.ok) throw new Error('Network response was not ok');
+        return await response.json();
+    }
+
     // რჩეული კერძების წამოღება
     async function fetchFeaturedDishes() {
             if (!featuredContainer) return;
 
             try {
-                const response = await fetch(API_FEATURED_URL);
-                if (!response.ok) throw new Error('Network response was not ok');
-
-                let dishes = await response.json();
+                let dishes = await loadFeaturedDishes();
 
                 renderFeaturedDishes(dishes);
 
@@ -98,7 +113,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
         col.innerHTML = `
             <div class="dish-card">
-                <img src="${imageUrl}" class="dish-card-img-top" alt="${dish.name}">
+                ${dishImageTag(imageUrl, dish.image_srcset, '(min-width: 992px) 33vw, (min-width: 768px) 50vw, 100vw', `class="dish-card-img-top" alt="${dish.name}"`)}
                 <div class="dish-card-body">
                     <h5 class="dish-card-title">${dish.name}</h5>
                     <div class="dish-rating mb-2">
@@ -123,8 +138,6 @@ document.addEventListener('DOMContentLoaded', () => {
         return col;
     }
 
-    const cartCountElement = document.getElementById('cart-count');
-
     featuredContainer.addEventListener('click', async (e) => {
         if (e.target.classList.contains('btn-add-to-cart')) {
             e.preventDefault();
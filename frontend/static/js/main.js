@@ -110,10 +110,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
             const data = await response.json();
 
-            allDishes = data.results;
-            renderDishes(data.results);
-
-            renderPagination(data, baseUrlForPagination);
+            showDishesPage(data, baseUrlForPagination);
 
         } catch (error) {
             console.error('Error fetching dishes:', error);
@@ -121,6 +118,13 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    function showDishesPage(data, baseUrlForPagination) {
+        allDishes = data.results;
+        renderDishes(data.results);
+
+        renderPagination(data, baseUrlForPagination);
+    }
+
     function renderDishes(dishes) {
         dishesContainer.innerHTML = '';
         if (dishes.length === 0) {
@@ -142,7 +146,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
         col.innerHTML = `
             <div class="dish-card">
-                <img src="${imageUrl}" class="dish-card-img-top" alt="${dish.name}">
+                ${dishImageTag(imageUrl, dish.image_srcset, '(min-width: 992px) 33vw, (min-width: 576px) 50vw, 100vw', `class="dish-card-img-top" alt="${dish.name}"`)}
                 <div class="dish-card-body">
                     <h5 class="dish-card-title">${dish.name}</h5>
                     <div class="dish-rating mb-2">
@@ -227,21 +231,18 @@ document.addEventListener('DOMContentLoaded', () => {
                 }
             });
 
-            if (response.ok) {
-                const cartData = await response.json();
-                const totalItems = cartData.items.reduce((sum, item) => sum + item.quantity, 0);
-                if (cartCountElement) {
-                    cartCountElement.textContent = totalItems;
-                }
-            } else {
-                if (cartCountElement) cartCountElement.textContent = '0';
-            }
+            showCartCount(response.ok ? await response.json() : null);
         } catch (error) {
             console.error('Error fetching cart count:', error);
-            if (cartCountElement) cartCountElement.textContent = '0';
+            showCartCount(null);
         }
     }
 
+    function showCartCount(cartData) {
+        if (!cartCountElement) return;
+        cartCountElement.textContent = cartData ? cartData.items.reduce((sum, item) => sum + item.quantity, 0) : '0';
+    }
+
     dishesContainer.addEventListener('click', async (e) => {
         if (e.target.classList.contains('btn-add-to-cart')) {
             e.preventDefault();
@@ -289,9 +290,25 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
 
-    fetchCategories();
-    fetchDishes();
-    updateCartCounter();
+    // პირველი ჩატვირთვა: კატეგორიები, კერძების პირველი გვერდი და კალათა ერთი bootstrap მოთხოვნით
+    async function loadInitialData() {
+        let data;
+        try {
+            data = await fetchBootstrap();
+        } catch (error) {
+            // მაგ. ვადაგასული ტოკენი: ძველებურად ცალ-ცალკე მოთხოვნებით
+            console.error('Error fetching bootstrap data:', error);
+            fetchCategories();
+            fetchDishes();
+            updateCartCounter();
+            return;
+        }
+        renderCategories(data.categories);
+        showDishesPage(data.dishes, `${API_DISHES_URL}?`);
+        showCartCount(data.cart);
+    }
+
+    loadInitialData();
 
     function renderPagination(data, baseUrl) {
         const paginationContainer = document.getElementById('pagination-container');